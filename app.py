@@ -1,7 +1,15 @@
 import streamlit as st
 import requests
+import json
 import uuid
 import time
+from streaming import parse_sse
+
+try:
+    from websockets.exceptions import WebSocketException
+    from websockets.sync.client import connect as websocket_connect
+except ImportError:
+    websocket_connect = None
 
 st.set_page_config(
     page_title="FoodieSpot AI",
@@ -11,6 +19,7 @@ st.set_page_config(
 )
 
 BACKEND_URL = "http://localhost:8000"
+WEBSOCKET_URL = BACKEND_URL.replace("http", "ws", 1) + "/ws"
 
 def initialize_session():
     if "session_id" not in st.session_state:
@@ -29,6 +38,9 @@ def initialize_session():
     
     if "last_message_time" not in st.session_state:
         st.session_state.last_message_time = 0
+    
+    if "message_id" not in st.session_state:
+        st.session_state.message_id = 0
 
 def send_message_to_backend(message: str):
     try:
@@ -54,6 +66,119 @@ def send_message_to_backend(message: str):
     except Exception as e:
         return f"Sorry, an unexpected error occurred: {str(e)}"
 
+def stream_message_from_backend(message: str):
+    # Yields the reply piece by piece from /chat/stream so it can be drawn as
+    # it arrives; falls back to /chat when the backend has no stream endpoint.
+    try:
+        with requests.post(
+            f"{BACKEND_URL}/chat/stream",
+            json={
+                "message": message,
+                "session_id": st.session_state.session_id
+            },
+            stream=True,
+            timeout=(3, 10)
+        ) as response:
+            if response.status_code == 404:
+                yield send_message_to_backend(message)
+                return
+            if response.status_code != 200:
+                yield f"Sorry, I encountered an error (Status: {response.status_code}). Please try again."
+                return
+            
+            response.encoding = "utf-8"
+            for event, data in parse_sse(response.iter_lines(decode_unicode=True)):
+                if event == "delta":
+                    yield data["text"]
+                elif event == "error":
+                    yield f"Sorry, I encountered an error (Status: {data.get('status')}). Please try again."
+                    return
+                elif event == "done":
+                    return
+                    
+    except requests.exceptions.Timeout:
+        yield "Sorry, the request timed out. Please try again."
+    except requests.exceptions.ConnectionError:
+        yield "Sorry, I can't connect to the server. Please make sure the backend is running on port 8000."
+    except Exception as e:
+        yield f"Sorry, an unexpected error occurred: {str(e)}"
+
+def get_websocket():
+    # The connection lives in session_state, so it survives Streamlit reruns
+    # and stays bound to this browser session's session_id.
+    websocket = st.session_state.get("websocket")
+    if websocket is None:
+        websocket = websocket_connect(
+            f"{WEBSOCKET_URL}?session_id={st.session_state.session_id}", open_timeout=3
+        )
+        hello = json.loads(websocket.recv(timeout=3))
+        if hello.get("type") != "session":
+            websocket.close()
+            raise WebSocketException(f"unexpected handshake frame: {hello}")
+        st.session_state.websocket = websocket
+    return websocket
+
+def close_websocket():
+    websocket = st.session_state.pop("websocket", None)
+    if websocket is not None:
+        try:
+            websocket.close()
+        except Exception:
+            pass
+
+def stream_message_over_websocket(message: str):
+    # Yields the reply piece by piece from the WebSocket's "delta" frames and
+    # returns False, before yielding anything, when the WebSocket cannot be
+    # used, so the caller can fall back to HTTP. A dropped connection is
+    # reopened once and the message is re-sent with the same id; the server
+    # answers a message it already processed from its reply cache instead of
+    # running it twice, and only text not shown yet is yielded again.
+    st.session_state.message_id += 1
+    message_id = st.session_state.message_id
+    frame = json.dumps({"type": "message", "id": message_id, "message": message})
+    received = ""
+    
+    for attempt in range(2):
+        try:
+            websocket = get_websocket()
+            websocket.send(frame)
+            streamed = ""
+            while True:
+                reply = json.loads(websocket.recv(timeout=10))
+                if reply.get("id") != message_id:
+                    continue
+                if reply["type"] == "delta":
+                    streamed += reply["text"]
+                    if len(streamed) > len(received):
+                        fresh = streamed[len(received):]
+                        received = streamed
+                        yield fresh
+                    continue
+                if reply["type"] == "reply":
+                    if len(reply["response"]) > len(received):
+                        yield reply["response"][len(received):]
+                else:
+                    yield f"Sorry, I encountered an error (Status: {reply.get('status')}). Please try again."
+                return True
+        except TimeoutError:
+            close_websocket()
+            yield "Sorry, the request timed out. Please try again."
+            return True
+        except (WebSocketException, OSError):
+            close_websocket()
+    
+    if received:
+        yield "\n\nSorry, the connection was lost. Please try again."
+        return True
+    return False
+
+def get_reply_chunks(message: str):
+    if websocket_connect is not None:
+        answered = yield from stream_message_over_websocket(message)
+        if answered:
+            return
+    yield from stream_message_from_backend(message)
+
 def display_message(role: str, content: str):
     if role == "user":
         with st.chat_message("user"):
@@ -87,9 +212,13 @@ def main():
                     st.write(prompt)
                 
                 with st.chat_message("assistant"):
-                    with st.spinner("Thinking..."):
-                        response = send_message_to_backend(prompt)
-                    st.markdown(response)
+                    placeholder = st.empty()
+                    placeholder.markdown("Thinking...")
+                    response = ""
+                    for chunk in get_reply_chunks(prompt):
+                        response += chunk
+                        placeholder.markdown(response + "▌")
+                    placeholder.markdown(response)
                 
                 st.session_state.messages.append({"role": "assistant", "content": response})
                 st.session_state.processing = False
@@ -0,0 +1,109 @@
+import argparse
+import logging
+import sys
+import time
+
+from models import BookingRequest, BookingState, ConversationContext
+from services import ContextSwitchChatService
+
+SIZES = (1_000, 4_000, 16_000, 64_000, 256_000, 1_000_000)
+
+# Fixed families: digit and whitespace runs (quadratic for unanchored \d+ and
+# \s+), near-miss booking phrases, clock and number soup, non-ASCII text.
+FIXED_UNITS = {
+    "digits": "1",
+    "digits_spaced": "1 ",
+    "whitespace": " \t",
+    "clock_soup": "12:30 ",
+    "table_for": "table for ",
+    "party_of": "party of ",
+    "emoji": "🍣🍕🌮 ",
+    "letters": "a",
+    "newlines": "book\n",
+}
+
+
+def intent_units(service: ContextSwitchChatService) -> dict:
+    # One family per ".*" rule: its words repeated without the final one
+    # ("let make let make ..."), the input that makes a backtracking search
+    # try every combination of positions.
+    detector = service.intent_detector
+    units = {}
+    for matcher in (detector.intent_matcher, detector.contextual_matcher):
+        for label, pattern in matcher.rules:
+            for alternative in pattern.split("|"):
+                words = alternative.split(".*")
+                if len(words) > 1 and all(word.isalpha() for word in words):
+                    units[f"near_miss:{alternative}"] = " ".join(words[:-1]) + " "
+    return units
+
+
+def build_inputs(service: ContextSwitchChatService, size: int) -> dict:
+    units = {**FIXED_UNITS, **intent_units(service)}
+    return {name: (unit * (size // len(unit) + 1))[:size] for name, unit in units.items()}
+
+
+def timed(function, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=SIZES, budget_ms: float = 50.0, verbose: bool = False) -> int:
+    logging.disable(logging.CRITICAL)
+    service = ContextSwitchChatService()
+    detector = service.intent_detector
+    # Every call must do the work: no memoized answers.
+    detector.cache.max_entries = 0
+
+    gathering = ConversationContext()
+    gathering.booking_state = BookingState.GATHERING_INFO
+    operations = {
+        "detect_intent": lambda message: detector.detect_intent_with_context(message, ConversationContext(), BookingRequest()),
+        "detect_intent.contextual": lambda message: detector.detect_intent_with_context(message, gathering, BookingRequest()),
+        "extract_comprehensive_info": detector.extract_comprehensive_info,
+        "extract_modification_info": detector.extract_modification_info,
+        "process_message": lambda message: service.process_message(message, "adversarial"),
+    }
+
+    print(f"{'operation':<28}" + "".join(f"{size:>12,}" for size in sizes) + "   worst input (largest size)")
+    failures = []
+    for operation, function in operations.items():
+        row = f"{operation:<28}"
+        worst_input = None
+        for size in sizes:
+            worst = 0.0
+            for name, message in build_inputs(service, size).items():
+                elapsed = timed(lambda: function(message))
+                if verbose:
+                    print(f"  {operation} {name} n={size}: {elapsed * 1e3:.2f} ms")
+                if elapsed > worst:
+                    worst, worst_input = elapsed, name
+            row += f"{worst * 1e3:>10.2f}ms"
+            if worst * 1e3 > budget_ms:
+                failures.append(f"{operation} at {size:,} characters: {worst * 1e3:.1f} ms ({worst_input})")
+        print(f"{row}   {worst_input}")
+
+    if failures:
+        print(f"{len(failures)} case(s) over the {budget_ms:g} ms budget:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print(f"worst case stays under {budget_ms:g} ms at every size")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worst-case latency of intent detection and extraction on hostile input")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="message lengths in characters")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="fail when any operation takes longer than this")
+    parser.add_argument("--verbose", action="store_true", help="print every input family")
+    args = parser.parse_args()
+    sys.exit(run(tuple(args.sizes), args.budget_ms, args.verbose))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from booking_store import DurableBookingStore
+from models import Booking
+
+
+def make_booking(index: int) -> Booking:
+    return Booking(
+        id=f"B{index:08d}", restaurant_name="Ocean View", date="tomorrow", time="19:00",
+        party_size=2, status="confirmed", created_at=datetime.now()
+    )
+
+
+def write_concurrently(store: DurableBookingStore, writers: int, per_writer: int) -> float:
+    def writer(offset: int):
+        for index in range(per_writer):
+            store.add(make_booking(offset + index))
+
+    threads = [threading.Thread(target=writer, args=(number * per_writer,)) for number in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run(writers: int = 32, per_writer: int = 100, recovery_sizes=(10_000, 100_000)):
+    total = writers * per_writer
+    for label, max_batch in (("fsync per write", 1), ("group commit", 1024)):
+        with tempfile.TemporaryDirectory() as directory:
+            store = DurableBookingStore(directory, max_batch=max_batch)
+            elapsed = write_concurrently(store, writers, per_writer)
+            store.close()
+            print(f"{label:<16} writers={writers} bookings={total} {total / elapsed:8.0f} bookings/s "
+                  f"fsyncs={store.fsyncs} avg batch={store.commits / store.fsyncs:6.1f}")
+
+    for size in recovery_sizes:
+        for label, snapshot_every in (("log only", size * 2), ("snapshot", size // 10)):
+            with tempfile.TemporaryDirectory() as directory:
+                store = DurableBookingStore(directory, snapshot_every=snapshot_every)
+                write_concurrently(store, writers, size // writers)
+                store.close()
+
+                start = time.perf_counter()
+                recovered = DurableBookingStore(directory, snapshot_every=snapshot_every)
+                elapsed = time.perf_counter() - start
+                recovered.close()
+                print(f"recovery {label:<9} bookings={len(recovered):<7} {elapsed * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:3]))
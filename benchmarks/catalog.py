@@ -0,0 +1,83 @@
+import random
+import sys
+import time
+
+from data import RestaurantCatalog
+from models import Restaurant
+
+CUISINES = ["Italian", "French", "Indian", "Seafood", "Mexican", "Japanese", "Mediterranean",
+            "American", "Chinese", "Thai", "Korean", "Greek", "Spanish", "Vietnamese", "Lebanese"]
+LOCATIONS = [f"District {index}" for index in range(200)]
+PRICE_RANGES = ["$", "$$", "$$$", "$$$$"]
+TIMES = ["12:00", "13:00", "18:00", "19:00", "20:00"]
+
+
+def build_restaurants(size: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    return [
+        Restaurant.model_construct(
+            id=index,
+            name=f"Restaurant {index}",
+            cuisine=rng.choice(CUISINES),
+            location=rng.choice(LOCATIONS),
+            price_range=rng.choice(PRICE_RANGES),
+            rating=round(rng.uniform(3.0, 5.0), 1),
+            capacity=rng.randint(20, 120),
+            available_times=TIMES,
+            features=[],
+        )
+        for index in range(size)
+    ]
+
+
+def linear_find(restaurants: list, name: str):
+    for restaurant in restaurants:
+        if restaurant.name.lower() == name.lower():
+            return restaurant
+    return None
+
+
+def linear_search(restaurants: list, cuisine=None, location=None, price_range=None):
+    results = restaurants
+    if cuisine:
+        results = [r for r in results if r.cuisine.lower() == cuisine.lower()]
+    if location:
+        results = [r for r in results if r.location.lower() == location.lower()]
+    if price_range:
+        results = [r for r in results if r.price_range == price_range]
+    return results
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(sizes=(10, 1_000, 100_000, 1_000_000)):
+    for size in sizes:
+        restaurants = build_restaurants(size)
+
+        start = time.perf_counter()
+        catalog = RestaurantCatalog(list(restaurants))
+        catalog.find_in_text("")
+        build_elapsed = time.perf_counter() - start
+
+        name = f"restaurant {size // 2}"
+        repeat = max(3, 100_000 // size)
+        query = {"cuisine": "thai", "location": "District 7", "price_range": "$$"}
+
+        linear_find_us = timed(lambda: linear_find(restaurants, name), repeat)
+        indexed_find_us = timed(lambda: catalog.find_by_name(name), 1000)
+        linear_search_us = timed(lambda: linear_search(restaurants, **query), repeat)
+        indexed_search_us = timed(lambda: catalog.search(**query), 1000)
+
+        assert [r.id for r in linear_search(restaurants, **query)] == [r.id for r in catalog.search(**query)]
+        print(f"catalog={size:<8} build={build_elapsed:7.2f}s "
+              f"find: linear={linear_find_us:11.1f}us indexed={indexed_find_us:5.2f}us  "
+              f"search: linear={linear_search_us:11.1f}us indexed={indexed_search_us:7.2f}us")
+
+
+if __name__ == "__main__":
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (10, 1_000, 100_000, 1_000_000))
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import random
+import sys
+import tempfile
+import time
+
+from booking_store import DurableBookingStore
+from executor import BoundedExecutor, ExecutorOverloaded
+from services import ContextSwitchChatService
+
+MESSAGES = [
+    "Book a table for 4 at Ocean View tomorrow 7pm",
+    "Can you recommend some Italian restaurants downtown?",
+    "What are the hours for Sakura Sushi?",
+    "Actually make it 6 people",
+    "Show me cheap Mexican places",
+    "Hello",
+]
+
+# Roughly one message in twenty is a long paste (a review, an itinerary).
+# Extraction stops at its first 2000 characters, but the paste still costs
+# far more than a short message to normalize, match and keep in history.
+SLOW_MESSAGE = "We are planning a birthday dinner, somewhere quiet with a view. " * 400
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def chat_client(handle, client: int, requests: int, seed: int, latencies: list, rejections: list):
+    rng = random.Random(seed * 1000 + client)
+    for number in range(requests):
+        # Latency is measured from when the request should have arrived, so
+        # time spent waiting for a blocked event loop counts against it.
+        think = rng.expovariate(1 / 0.02)
+        start = time.perf_counter() + think
+        await asyncio.sleep(think)
+        message = SLOW_MESSAGE if rng.random() < 0.05 else rng.choice(MESSAGES)
+        try:
+            await handle(message, f"client-{client}-{number % 3}")
+        except ExecutorOverloaded:
+            rejections.append(1)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def health_prober(stop: asyncio.Event, interval: float, latencies: list):
+    # A health check costs nothing, so its latency is however long it waited
+    # for the event loop: the time between when its timer should have fired
+    # and when it actually ran.
+    while not stop.is_set():
+        scheduled = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        latencies.append(time.perf_counter() - scheduled)
+
+
+async def run_scenario(handle, clients: int, requests: int, seed: int) -> tuple:
+    chat_latencies, health_latencies, rejections = [], [], []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(health_prober(stop, 0.005, health_latencies))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        chat_client(handle, client, requests, seed, chat_latencies, rejections) for client in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await prober
+    return chat_latencies, health_latencies, len(rejections), elapsed
+
+
+def report(label: str, chat: list, health: list, rejected: int, elapsed: float):
+    print(f"{label:<24} chat p50={percentile(chat, 0.5) * 1000:7.2f}ms p99={percentile(chat, 0.99) * 1000:7.2f}ms  "
+          f"health p50={percentile(health, 0.5) * 1000:6.2f}ms p99={percentile(health, 0.99) * 1000:6.2f}ms  "
+          f"rejected={rejected:<4} {len(chat) / elapsed:6.0f} msg/s")
+
+
+async def main(clients: int, requests: int):
+    logging.disable(logging.CRITICAL)
+
+    # Confirmed bookings go through the durable store, so the mix includes
+    # turns that wait on an fsync as well as CPU-bound ones.
+    directory = tempfile.TemporaryDirectory()
+    service = ContextSwitchChatService(booking_store=DurableBookingStore(directory.name))
+
+    async def inline(message, session_id):
+        return service.process_message(message, session_id)
+
+    await run_scenario(inline, clients, requests // 4, seed=1)
+    report("inline", *await run_scenario(inline, clients, requests, seed=2))
+
+    for workers, queue in ((4, 64), (2, 4)):
+        executor = BoundedExecutor(workers, queue)
+
+        async def offloaded(message, session_id):
+            return await executor.run(service.process_message, message, session_id)
+
+        report(f"executor {workers}+{queue} queued", *await run_scenario(offloaded, clients, requests, seed=2))
+        executor.shutdown()
+
+    service.booking_service.bookings.close()
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:3])) if len(sys.argv) > 1 else main(16, 100))
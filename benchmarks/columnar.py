@@ -0,0 +1,43 @@
+import sys
+import time
+
+from benchmarks.catalog import build_restaurants
+from columnar import PRICE_TIERS, ColumnarRestaurantStore
+
+
+def python_query(restaurants: list, cuisine: str, min_rating: float, max_price_tier: int, limit: int) -> list:
+    matches = [
+        r for r in restaurants
+        if r.cuisine.lower() == cuisine and r.rating >= min_rating and PRICE_TIERS.get(r.price_range, 0) <= max_price_tier
+    ]
+    return sorted(matches, key=lambda r: -r.rating)[:limit]
+
+
+def run(sizes=(1_000, 100_000, 1_000_000), repeat: int = 5):
+    query = {"cuisine": "thai", "min_rating": 4.0, "max_price_tier": 2}
+
+    for size in sizes:
+        restaurants = build_restaurants(size)
+
+        start = time.perf_counter()
+        store = ColumnarRestaurantStore(restaurants)
+        build_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            expected = python_query(restaurants, limit=10, **query)
+        python_ms = (time.perf_counter() - start) / repeat * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            actual = store.query(sort_by="rating", limit=10, **query)
+        columnar_ms = (time.perf_counter() - start) / repeat * 1000
+
+        assert [r.rating for r in actual] == [r.rating for r in expected]
+        print(f"catalog={size:<8} build={build_elapsed:6.2f}s "
+              f"filter+top10: python={python_ms:9.2f}ms columnar={columnar_ms:7.2f}ms "
+              f"speedup={python_ms / columnar_ms:6.1f}x")
+
+
+if __name__ == "__main__":
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (1_000, 100_000, 1_000_000))
@@ -0,0 +1,98 @@
+import random
+import re
+import sys
+import time
+
+from data import get_all_restaurants
+from services import AdvancedIntentDetector
+
+TEMPLATES = [
+    "Book a table for {size} at {restaurant} tomorrow at {hour}pm",
+    "I want to make a reservation",
+    "{restaurant} for {size} people",
+    "Tomorrow at {hour}:00",
+    "Actually, make it {size} people",
+    "And change the time to {hour}PM",
+    "Recommend {cuisine} restaurants in {location}",
+    "Is {restaurant} available tonight?",
+    "yes please",
+    "Hello there",
+    "what restaurant has the best seafood around here",
+    "We are {size} guests, can we get a table at {hour}:30",
+    "ok",
+    "Looking for food near {location}, something {cuisine} maybe",
+]
+
+
+def build_corpus(size: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    restaurants = get_all_restaurants()
+    corpus = []
+    for _ in range(size):
+        restaurant = rng.choice(restaurants)
+        message = rng.choice(TEMPLATES).format(
+            size=rng.randint(1, 12),
+            hour=rng.randint(1, 12),
+            restaurant=restaurant.name,
+            cuisine=restaurant.cuisine,
+            location=restaurant.location,
+        )
+        corpus.append(message.lower().strip())
+    return corpus
+
+
+def legacy_detect(detector: AdvancedIntentDetector, message: str, contextual: bool) -> str:
+    restaurant_names = [r.name.lower() for r in get_all_restaurants()]
+
+    for pattern in detector.modification_indicators:
+        if re.search(pattern, message):
+            return "modify_booking"
+
+    if contextual:
+        if re.search(r'yes|yeah|yep|confirm|correct|ok|okay', message):
+            return "confirm_booking"
+        elif any(name in message for name in restaurant_names):
+            return "provide_info"
+        elif re.search(r'\d+\s*(?:people|person|guest|pax)', message):
+            return "provide_info"
+        elif re.search(r'\d+\s*(?:am|pm|:|AM|PM)', message):
+            return "provide_info"
+        elif re.search(r'today|tomorrow|tonight|\d+/\d+', message):
+            return "provide_info"
+        return "continue_booking"
+
+    for intent, patterns in detector.patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, message):
+                return intent
+
+    if any(name in message for name in restaurant_names):
+        return "provide_info"
+
+    if re.search(r'\d', message):
+        return "provide_info"
+
+    return "general_inquiry"
+
+
+def run(size: int = 200_000):
+    detector = AdvancedIntentDetector()
+    corpus = build_corpus(size)
+
+    for contextual in (False, True):
+        start = time.perf_counter()
+        legacy = [legacy_detect(detector, message, contextual) for message in corpus]
+        legacy_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compiled = [detector.classify(message, contextual)[0] for message in corpus]
+        compiled_elapsed = time.perf_counter() - start
+
+        mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+        label = "contextual" if contextual else "initial"
+        print(f"{label:<10} messages={size} legacy={legacy_elapsed:.3f}s compiled={compiled_elapsed:.3f}s "
+              f"speedup={legacy_elapsed / compiled_elapsed:.2f}x mismatches={mismatches}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,71 @@
+import random
+import string
+import sys
+import time
+
+from matchers import RestaurantNameMatcher
+
+WORDS = ["golden", "spoon", "bistro", "garden", "ocean", "view", "taco", "libre", "zen", "breeze",
+         "steakhouse", "noodle", "express", "farm", "table", "grill", "kitchen", "house", "cafe", "bar"]
+
+
+def build_catalog(size: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < size:
+        suffix = "".join(rng.choice(string.ascii_lowercase) for _ in range(4))
+        names.add(f"The {rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {suffix}")
+    return sorted(names)
+
+
+def build_messages(names: list, count: int, seed: int = 13) -> list:
+    rng = random.Random(seed)
+    messages = []
+    for index in range(count):
+        if index % 2:
+            messages.append(f"book a table for 4 at {rng.choice(names)} tomorrow at 7pm".lower())
+        else:
+            messages.append("can we get a table for two tomorrow evening around 8pm please")
+    return messages
+
+
+def scan_catalog(names: list, message: str):
+    for name in names:
+        if name.lower() in message:
+            return name
+    return None
+
+
+def run(sizes=(10, 1_000, 10_000, 50_000), messages_per_size: int = 200):
+    for size in sizes:
+        names = build_catalog(size)
+        messages = build_messages(names, messages_per_size)
+
+        start = time.perf_counter()
+        matcher = RestaurantNameMatcher(names)
+        matcher.longest_match("")
+        build_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scanned = [scan_catalog(names, message) for message in messages]
+        scan_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matched = [matcher.longest_match(message) for message in messages]
+        match_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        extra = f"The Brand New Place {size}"
+        matcher.add(extra)
+        matcher.longest_match(extra)
+        update_elapsed = time.perf_counter() - start
+
+        mismatches = sum(1 for a, b in zip(scanned, matched) if a != b)
+        print(f"catalog={size:<6} build={build_elapsed * 1000:8.1f}ms "
+              f"scan={scan_elapsed / len(messages) * 1e6:9.1f}us/msg "
+              f"automaton={match_elapsed / len(messages) * 1e6:7.1f}us/msg "
+              f"add+relink={update_elapsed * 1000:7.1f}ms mismatches={mismatches}")
+
+
+if __name__ == "__main__":
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (10, 1_000, 10_000, 50_000))
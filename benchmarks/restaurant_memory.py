@@ -0,0 +1,93 @@
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from benchmarks.catalog import CUISINES, LOCATIONS, PRICE_RANGES
+from models import Restaurant
+from restaurant_record import RestaurantRecord, to_minutes
+
+SCHEDULES = [
+    ["12:00", "13:00", "14:00", "18:00", "19:00", "20:00"],
+    ["17:00", "18:00", "19:00", "20:00", "21:00"],
+    ["11:00", "12:00", "13:00", "17:00", "18:00", "19:00", "20:00"],
+    ["18:00", "19:00", "20:00", "21:00", "22:00"],
+]
+FEATURES = [[], ["Outdoor seating"], ["Vegan options", "Wine bar"], ["Family friendly", "Takeout"]]
+
+
+def rows(size: int, seed: int = 11):
+    # What a loader hands over per restaurant: fresh lists, as parsed from
+    # JSON or a database row.
+    rng = random.Random(seed)
+    for index in range(size):
+        yield dict(
+            id=index,
+            name=f"Restaurant {index}",
+            cuisine=rng.choice(CUISINES),
+            location=rng.choice(LOCATIONS),
+            price_range=rng.choice(PRICE_RANGES),
+            rating=round(rng.uniform(3.0, 5.0), 1),
+            capacity=rng.randint(20, 120),
+            available_times=list(rng.choice(SCHEDULES)),
+            features=list(rng.choice(FEATURES)),
+        )
+
+
+def build_models(size: int) -> list:
+    return [Restaurant(**row) for row in rows(size)]
+
+
+def build_records(size: int) -> list:
+    records = []
+    for row in rows(size):
+        times = row.pop("available_times")
+        records.append(RestaurantRecord(**row, slots=[to_minutes(time) for time in times]))
+    return records
+
+
+def measure(build, size: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    restaurants = build(size)
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return restaurants, allocated, elapsed
+
+
+def lookup_us(restaurants: list, check, repeat: int = 200_000) -> float:
+    sample = [restaurants[index % len(restaurants)] for index in range(0, repeat * 7919, 7919)]
+    start = time.perf_counter()
+    for restaurant in sample:
+        check(restaurant)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(size: int = 1_000_000):
+    results = {}
+    for label, build, check in (
+        ("pydantic Restaurant", build_models, lambda restaurant: "19:30" in restaurant.available_times),
+        ("RestaurantRecord", build_records, lambda restaurant: restaurant.has_slot("19:30")),
+    ):
+        restaurants, allocated, elapsed = measure(build, size)
+        results[label] = allocated / size
+        print(f"{label:<20} n={size:<9,} {allocated / size:8.1f} B/restaurant  total={allocated / 2**20:8.1f} MiB  "
+              f"build={elapsed:6.2f}s  slot check={lookup_us(restaurants, check):5.3f}us")
+        del restaurants
+
+    model, record = results["pydantic Restaurant"], results["RestaurantRecord"]
+    print(f"records use {record / model:.1%} of the memory of pydantic models ({model - record:,.0f} B less per restaurant)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per restaurant: pydantic models vs slotted catalog records")
+    parser.add_argument("--size", type=int, default=1_000_000, help="restaurants to build")
+    args = parser.parse_args()
+    run(args.size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import logging
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from benchmarks.catalog import build_restaurants
+from data import RestaurantCatalog
+from models import BatchChatResponse, BatchChatResult, ChatResponse
+from restaurant_listing import RestaurantListing
+from serialization import compress, dumps, orjson, supported_encodings
+from services import ContextSwitchChatService
+
+
+def per_call_us(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def chat_payloads() -> dict:
+    service = ContextSwitchChatService()
+    booking = service.process_message("Book a table for 4 at Ocean View tomorrow 7pm", "bench-booking")
+    recommendations = service.process_message("Can you recommend some Italian restaurants?", "bench-recs")
+    batch = [dict(booking, session_id=f"bench-{index}") for index in range(100)]
+    return {"chat booking": booking, "chat recommend": recommendations, "chat batch x100": batch}
+
+
+def report(label: str, default_us: float, fast_us: float, body: bytes, repeat: int):
+    line = f"{label:<22} default={default_us:8.1f}us fast={fast_us:8.1f}us raw={len(body):>9}B"
+    for encoding in supported_encodings():
+        compressed = compress(body, encoding)
+        cost = per_call_us(lambda: compress(body, encoding), max(1, repeat // 10))
+        line += f" {encoding}={len(compressed):>8}B ({cost:7.1f}us)"
+    print(line)
+
+
+def run(catalog_sizes=(10, 1_000, 10_000), repeat: int = 200):
+    logging.disable(logging.CRITICAL)
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+
+    # The default path is what FastAPI does for a response_model: build the
+    # model, turn it into JSON-compatible data, then json.dumps it.
+    for label, payload in chat_payloads().items():
+        if isinstance(payload, list):
+            def default():
+                model = BatchChatResponse(results=[BatchChatResult(**item) for item in payload])
+                return JSONResponse(jsonable_encoder(model)).body
+            fast_payload = {"results": payload}
+        else:
+            def default():
+                return JSONResponse(jsonable_encoder(ChatResponse(**payload))).body
+            fast_payload = payload
+        body = dumps(fast_payload)
+        report(label, per_call_us(default, repeat), per_call_us(lambda: dumps(fast_payload), repeat), body, repeat)
+
+    # /restaurants: the old handler's dict() + JSONResponse per request against
+    # the precomputed listing, timed on a cold render (no body cache).
+    for size in catalog_sizes:
+        catalog = RestaurantCatalog(build_restaurants(size))
+        listing = RestaurantListing(catalog)
+        query = listing.query()
+        iterations = max(1, repeat * 10 // size)
+
+        def default():
+            return JSONResponse({"restaurants": [r.to_model().model_dump() for r in catalog.restaurants],
+                                 "count": len(catalog.restaurants)}).body
+
+        report(f"restaurants n={size}", per_call_us(default, iterations),
+               per_call_us(lambda: listing._render(query), iterations), listing.body(query), iterations)
+
+
+if __name__ == "__main__":
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (10, 1_000, 10_000))
@@ -0,0 +1,63 @@
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from services import SessionManager
+from session_store import InMemorySessionBackend, SQLiteSessionBackend
+
+
+def run_turns(backend, turns: int, sessions: int, seed: int) -> list:
+    manager = SessionManager(backend)
+    rng = random.Random(seed)
+    latencies = []
+
+    for turn in range(turns):
+        session_id = f"session-{rng.randrange(sessions)}"
+        start = time.perf_counter()
+        session = manager.pin(session_id)
+        try:
+            manager.add_message(session_id, "user", f"table for {turn % 8 + 1} people tomorrow at 7pm")
+            session["current_booking"].party_size = turn % 8 + 1
+            session["last_intent"] = "provide_info"
+        finally:
+            manager.release(session_id)
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def _worker(arguments) -> list:
+    path, turns, sessions, seed = arguments
+    return run_turns(SQLiteSessionBackend(path), turns, sessions, seed)
+
+
+def report(label: str, latencies: list, elapsed: float):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"{label:<18} turns={len(latencies):<6} p50={p50:8.1f}us p99={p99:8.1f}us "
+          f"mean={statistics.fmean(latencies) * 1e6:8.1f}us throughput={len(latencies) / elapsed:9.0f} turns/s")
+
+
+def run(worker_counts=(1, 2, 4, 8), turns: int = 2000, sessions: int = 200):
+    start = time.perf_counter()
+    latencies = run_turns(InMemorySessionBackend(), turns, sessions, seed=0)
+    report("in-memory", latencies, time.perf_counter() - start)
+
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sessions.db")
+            SQLiteSessionBackend(path).close()
+            with multiprocessing.get_context("spawn").Pool(workers) as pool:
+                start = time.perf_counter()
+                results = pool.map(_worker, [(path, turns, sessions, seed) for seed in range(workers)])
+                elapsed = time.perf_counter() - start
+            report(f"sqlite workers={workers}", [latency for result in results for latency in result], elapsed)
+
+
+if __name__ == "__main__":
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (1, 2, 4, 8))
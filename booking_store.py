@@ -0,0 +1,331 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from models import Booking
+
+
+class BookingStoreUnavailable(OSError):
+    pass
+
+
+class BookingStore:
+    def add(self, booking: Booking):
+        raise NotImplementedError
+
+    def get(self, booking_id: str) -> Optional[Booking]:
+        raise NotImplementedError
+
+    def values(self) -> List[Booking]:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return len(self.values())
+
+    def __contains__(self, booking_id: str) -> bool:
+        return self.get(booking_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([booking.id for booking in self.values()])
+
+    def close(self):
+        pass
+
+
+class InMemoryBookingStore(BookingStore):
+    def __init__(self):
+        self.bookings: Dict[str, Booking] = {}
+
+    def add(self, booking: Booking):
+        self.bookings[booking.id] = booking
+
+    def get(self, booking_id: str) -> Optional[Booking]:
+        return self.bookings.get(booking_id)
+
+    def values(self) -> List[Booking]:
+        return list(self.bookings.values())
+
+    def __len__(self) -> int:
+        return len(self.bookings)
+
+
+def _to_row(booking: Booking) -> tuple:
+    return (booking.id, booking.restaurant_name, booking.date, booking.time, booking.party_size,
+            booking.status, booking.created_at.isoformat())
+
+
+def _from_row(row) -> Booking:
+    booking_id, restaurant_name, date, time_, party_size, status, created_at = row
+    return Booking(
+        id=booking_id, restaurant_name=restaurant_name, date=date, time=time_, party_size=party_size,
+        status=status, created_at=datetime.fromisoformat(created_at)
+    )
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class _PendingWrite:
+    __slots__ = ("row", "record", "done", "error")
+
+    def __init__(self, booking: Booking):
+        self.row = _to_row(booking)
+        self.record = _encode(self.row) + b"\n"
+        self.done = threading.Event()
+        self.error = None
+
+
+class DurableBookingStore(BookingStore):
+    # Bookings are appended as JSON lines to bookings.log. A single committer
+    # thread drains every write queued while the previous fsync was running and
+    # commits them with one write and one fsync (group commit); add() returns
+    # once its booking is durable. Every snapshot_every records the committer
+    # writes the full index to bookings.snapshot and starts a fresh log, so
+    # startup only loads the snapshot plus a bounded log tail. Both files hold
+    # compact JSON rows, and the index keeps those rows and only builds Booking
+    # models on access, so recovery never pays for model validation.
+    #
+    # A failed snapshot leaves the log in place and is retried after another
+    # snapshot_every records. One process owns a directory at a time: the
+    # store holds an exclusive lock on bookings.lock, and a second store on
+    # the same directory fails to open instead of truncating the first one's
+    # log.
+    LOG_NAME = "bookings.log"
+    SNAPSHOT_NAME = "bookings.snapshot"
+    LOCK_NAME = "bookings.lock"
+    log = logging.getLogger(f"{__name__}.DurableBookingStore")
+
+    def __init__(self, directory: str, snapshot_every: int = 10000, max_batch: int = 1024):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.max_batch = max_batch
+        self.log_path = os.path.join(directory, self.LOG_NAME)
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_NAME)
+
+        self.rows: Dict[str, tuple] = {}
+        self.commits = 0
+        self.fsyncs = 0
+        self.snapshots = 0
+        self.snapshot_failures = 0
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = self._acquire_directory_lock()
+        self._records_since_snapshot = self._recover()
+        self._snapshot_due = self.snapshot_every
+        self._log = open(self.log_path, "ab")
+        self._queue: "queue.Queue[Optional[_PendingWrite]]" = queue.Queue()
+        self._committer = threading.Thread(target=self._run, name="booking-store-committer", daemon=True)
+        self._committer.start()
+
+    def add(self, booking: Booking):
+        if self._closed or not self._committer.is_alive():
+            raise BookingStoreUnavailable(f"Booking store in {self.directory} is closed")
+        pending = _PendingWrite(booking)
+        self._queue.put(pending)
+        # The committer may stop (close() or a crash) after the check above;
+        # a write it will never pick up must not wait forever.
+        while not pending.done.wait(0.5):
+            if not self._committer.is_alive():
+                raise BookingStoreUnavailable(f"Booking store in {self.directory} stopped before committing")
+        if pending.error is not None:
+            raise pending.error
+
+    def get(self, booking_id: str) -> Optional[Booking]:
+        row = self.rows.get(booking_id)
+        return _from_row(row) if row is not None else None
+
+    def values(self) -> List[Booking]:
+        return [_from_row(row) for row in list(self.rows.values())]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, booking_id: str) -> bool:
+        return booking_id in self.rows
+
+    def close(self):
+        self._closed = True
+        if self._committer.is_alive():
+            self._queue.put(None)
+            self._committer.join()
+        self._log.close()
+        self._lock_file.close()
+
+    def _acquire_directory_lock(self):
+        lock_file = open(os.path.join(self.directory, self.LOCK_NAME), "ab")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                raise BookingStoreUnavailable(
+                    f"Another process is writing bookings in {self.directory}; "
+                    "each booking directory must have a single writer"
+                ) from None
+        return lock_file
+
+    def _recover(self) -> int:
+        if os.path.exists(self.snapshot_path):
+            self._load_snapshot()
+        if not os.path.exists(self.log_path):
+            return 0
+        return self._load_log(self.log_path, truncate_torn_tail=True)
+
+    def _load_snapshot(self):
+        with open(self.snapshot_path, "rb") as file:
+            for row in json.loads(file.read()):
+                self.rows[row[0]] = tuple(row)
+
+    def _load_log(self, path: str, truncate_torn_tail: bool = False) -> int:
+        loaded = 0
+        valid_length = 0
+        with open(path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    row = tuple(json.loads(line))
+                except ValueError:
+                    break
+                self.rows[row[0]] = row
+                valid_length += len(line)
+                loaded += 1
+
+        if truncate_torn_tail and valid_length != os.path.getsize(path):
+            with open(path, "r+b") as file:
+                file.truncate(valid_length)
+                os.fsync(file.fileno())
+        return loaded
+
+    def _run(self):
+        running = True
+        try:
+            while running:
+                first = self._queue.get()
+                if first is None:
+                    break
+
+                batch = [first]
+                while len(batch) < self.max_batch:
+                    try:
+                        pending = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if pending is None:
+                        running = False
+                        break
+                    batch.append(pending)
+
+                self._commit(batch)
+        finally:
+            self._closed = True
+
+    def _commit(self, batch: List[_PendingWrite]):
+        error = None
+        try:
+            self._log.write(b"".join(pending.record for pending in batch))
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self.fsyncs += 1
+            self.commits += len(batch)
+            for pending in batch:
+                self.rows[pending.row[0]] = pending.row
+        except OSError as exc:
+            error = exc
+
+        for pending in batch:
+            pending.error = error
+            pending.done.set()
+
+        if error is None:
+            self._records_since_snapshot += len(batch)
+            if self._records_since_snapshot >= self._snapshot_due:
+                try:
+                    self._snapshot()
+                except OSError:
+                    # Every booking is still in the log, so nothing is lost;
+                    # try again once another snapshot_every records arrive.
+                    self.snapshot_failures += 1
+                    self._snapshot_due = self._records_since_snapshot + self.snapshot_every
+                    self.log.warning("Booking snapshot failed, keeping the log and retrying later", exc_info=True)
+
+    def _snapshot(self):
+        temporary_path = self.snapshot_path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(_encode(list(self.rows.values())))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.snapshot_path)
+        self._fsync_directory()
+
+        # The snapshot now holds every logged booking; replaying a log that
+        # survives a crash at this point is harmless because ids are unique.
+        self._log.truncate(0)
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._records_since_snapshot = 0
+        self._snapshot_due = self.snapshot_every
+        self.snapshots += 1
+
+    def _fsync_directory(self):
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        descriptor = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+class SQLiteBookingStore(BookingStore):
+    # Bookings in a SQLite table, shared by worker processes on one host (the
+    # session database can hold it too). Rows are the same compact JSON as the
+    # log store's, keyed by booking id, so re-adding a booking updates it.
+    # synchronous=FULL makes every add durable once it returns.
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute("CREATE TABLE IF NOT EXISTS bookings (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=FULL")
+            self._local.connection = connection
+        return connection
+
+    def add(self, booking: Booking):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO bookings (id, data) VALUES (?, ?)",
+            (booking.id, _encode(_to_row(booking)).decode("utf-8"))
+        )
+
+    def get(self, booking_id: str) -> Optional[Booking]:
+        row = self._connection().execute("SELECT data FROM bookings WHERE id = ?", (booking_id,)).fetchone()
+        return _from_row(json.loads(row[0])) if row is not None else None
+
+    def values(self) -> List[Booking]:
+        return [_from_row(json.loads(data)) for data, in self._connection().execute("SELECT data FROM bookings")]
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -0,0 +1,112 @@
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from data import CATALOG, PRICE_RANGES, RestaurantCatalog
+from restaurant_record import RestaurantRecord
+
+PRICE_TIERS = {price_range: tier for tier, price_range in enumerate(PRICE_RANGES, 1)}
+SORT_COLUMNS = ("rating", "capacity", "price_tier")
+
+
+def _encode(values: List[str]) -> Tuple[Dict[str, int], "np.ndarray"]:
+    codes = {}
+    encoded = np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int32, count=len(values))
+    return codes, encoded
+
+
+class ColumnarRestaurantStore:
+    def __init__(self, restaurants: List[RestaurantRecord], version: int = 0):
+        if np is None:
+            raise ImportError("ColumnarRestaurantStore requires numpy")
+
+        self.restaurants = list(restaurants)
+        self.version = version
+        count = len(self.restaurants)
+
+        self.rating = np.fromiter((r.rating for r in self.restaurants), dtype=np.float64, count=count)
+        self.capacity = np.fromiter((r.capacity for r in self.restaurants), dtype=np.int32, count=count)
+        self.price_tier = np.fromiter(
+            (PRICE_TIERS.get(r.price_range, 0) for r in self.restaurants), dtype=np.int8, count=count
+        )
+        self.cuisine_codes, self.cuisine = _encode([r.cuisine.lower() for r in self.restaurants])
+        self.location_codes, self.location = _encode([r.location.lower() for r in self.restaurants])
+
+    @classmethod
+    def from_catalog(cls, catalog: RestaurantCatalog = CATALOG) -> "ColumnarRestaurantStore":
+        return cls(catalog.restaurants, version=catalog.version)
+
+    def __len__(self) -> int:
+        return len(self.restaurants)
+
+    def mask(self, cuisine: Optional[str] = None, location: Optional[str] = None, price_range: Optional[str] = None,
+             min_rating: Optional[float] = None, min_capacity: Optional[int] = None,
+             max_price_tier: Optional[int] = None) -> "np.ndarray":
+        mask = np.ones(len(self.restaurants), dtype=bool)
+
+        if cuisine:
+            mask &= self.cuisine == self.cuisine_codes.get(cuisine.lower(), -1)
+        if location:
+            mask &= self.location == self.location_codes.get(location.lower(), -1)
+        if price_range:
+            mask &= self.price_tier == PRICE_TIERS.get(price_range, -1)
+        if min_rating is not None:
+            mask &= self.rating >= min_rating
+        if min_capacity is not None:
+            mask &= self.capacity >= min_capacity
+        if max_price_tier is not None:
+            mask &= self.price_tier <= max_price_tier
+
+        return mask
+
+    def order(self, indices: "np.ndarray", sort_by: str = "rating", descending: bool = True,
+              limit: Optional[int] = None) -> "np.ndarray":
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by '{sort_by}', expected one of {', '.join(SORT_COLUMNS)}")
+
+        keys = getattr(self, sort_by)[indices].astype(np.float64)
+        if descending:
+            keys = -keys
+
+        if limit is not None and limit < len(indices):
+            # argpartition picks arbitrarily among rows tied with the limit-th
+            # key, so every row up to and including that key is kept and the
+            # row index breaks the ties: the result is the full order cut at
+            # limit.
+            cutoff = np.partition(keys, limit - 1)[limit - 1]
+            candidates = np.flatnonzero(keys <= cutoff)
+            candidates = candidates[np.lexsort((indices[candidates], keys[candidates]))][:limit]
+            return indices[candidates]
+
+        return indices[np.lexsort((indices, keys))]
+
+    def take(self, indices: "np.ndarray") -> List[RestaurantRecord]:
+        restaurants = self.restaurants
+        return [restaurants[index] for index in indices.tolist()]
+
+    def query(self, sort_by: Optional[str] = None, descending: bool = True, limit: Optional[int] = None,
+              **filters) -> List[RestaurantRecord]:
+        indices = np.flatnonzero(self.mask(**filters))
+        if sort_by:
+            indices = self.order(indices, sort_by=sort_by, descending=descending, limit=limit)
+        elif limit is not None:
+            indices = indices[:limit]
+        return self.take(indices)
+
+
+_stores: "weakref.WeakKeyDictionary[RestaurantCatalog, ColumnarRestaurantStore]" = weakref.WeakKeyDictionary()
+
+
+def get_columnar_store(catalog: RestaurantCatalog = CATALOG) -> Optional[ColumnarRestaurantStore]:
+    # One store per catalog, rebuilt on the first query after the catalog
+    # changes. None without numpy, so callers fall back to the catalog.
+    if np is None:
+        return None
+    store = _stores.get(catalog)
+    if store is None or store.version != catalog.version:
+        store = _stores[catalog] = ColumnarRestaurantStore.from_catalog(catalog)
+    return store
@@ -1,4 +1,9 @@
+from typing import Dict, Iterable, List, Optional, Union
 from models import Restaurant
+from matchers import RestaurantNameMatcher
+from restaurant_record import RestaurantRecord
+
+PRICE_RANGES = ["$", "$$", "$$$", "$$$$"]
 
 RESTAURANTS = [
     Restaurant(
@@ -113,25 +118,122 @@ RESTAURANTS = [
     )
 ]
 
-def get_all_restaurants():
-    return RESTAURANTS
-
-def find_restaurant_by_name(name):
-    for restaurant in RESTAURANTS:
-        if restaurant.name.lower() == name.lower():
+class RestaurantCatalog:
+    INDEXED_FIELDS = ("name", "cuisine", "location", "price_range")
+    
+    def __init__(self, restaurants: Iterable[Union[Restaurant, RestaurantRecord]] = ()):
+        self.restaurants: List[RestaurantRecord] = []
+        self.version = 0
+        self._by_id: Dict[int, RestaurantRecord] = {}
+        self._indexes: Dict[str, Dict[str, Dict[int, RestaurantRecord]]] = {field: {} for field in self.INDEXED_FIELDS}
+        self._name_matcher = RestaurantNameMatcher()
+        
+        for restaurant in restaurants:
+            restaurant = self._record(restaurant)
+            self._index(restaurant)
+            self.restaurants.append(restaurant)
+    
+    @staticmethod
+    def _record(restaurant: Union[Restaurant, RestaurantRecord]) -> RestaurantRecord:
+        if isinstance(restaurant, RestaurantRecord):
             return restaurant
-    return None
-
-def search_restaurants(cuisine=None, location=None, price_range=None):
-    results = RESTAURANTS
+        return RestaurantRecord.from_model(restaurant)
+    
+    def _keys(self, restaurant: RestaurantRecord) -> Dict[str, str]:
+        return {
+            "name": restaurant.name.lower(),
+            "cuisine": restaurant.cuisine.lower(),
+            "location": restaurant.location.lower(),
+            "price_range": restaurant.price_range
+        }
+    
+    def _index(self, restaurant: RestaurantRecord):
+        if restaurant.id in self._by_id:
+            raise ValueError(f"Restaurant id {restaurant.id} is already in the catalog")
+        
+        self._by_id[restaurant.id] = restaurant
+        for field, key in self._keys(restaurant).items():
+            self._indexes[field].setdefault(key, {})[restaurant.id] = restaurant
+        
+        if len(self._indexes["name"][restaurant.name.lower()]) == 1:
+            self._name_matcher.add(restaurant.name)
+    
+    def add(self, restaurant: Union[Restaurant, RestaurantRecord]) -> RestaurantRecord:
+        restaurant = self._record(restaurant)
+        self._index(restaurant)
+        self.restaurants.append(restaurant)
+        self.version += 1
+        return restaurant
+    
+    def remove(self, name: str) -> Optional[RestaurantRecord]:
+        restaurant = self.find_by_name(name)
+        if not restaurant:
+            return None
+        
+        self.restaurants.remove(restaurant)
+        del self._by_id[restaurant.id]
+        for field, key in self._keys(restaurant).items():
+            postings = self._indexes[field][key]
+            del postings[restaurant.id]
+            if not postings:
+                del self._indexes[field][key]
+        
+        remaining = self.find_by_name(name)
+        if remaining:
+            self._name_matcher.add(remaining.name)
+        else:
+            self._name_matcher.remove(restaurant.name)
+        self.version += 1
+        return restaurant
     
-    if cuisine:
-        results = [r for r in results if r.cuisine.lower() == cuisine.lower()]
+    def values(self, field: str) -> List[str]:
+        return list(self._indexes[field])
     
-    if location:
-        results = [r for r in results if r.location.lower() == location.lower()]
+    def get(self, restaurant_id: int) -> Optional[RestaurantRecord]:
+        return self._by_id.get(restaurant_id)
     
-    if price_range:
-        results = [r for r in results if r.price_range == price_range]
+    def find_by_name(self, name: str) -> Optional[RestaurantRecord]:
+        postings = self._indexes["name"].get(name.lower())
+        return next(iter(postings.values())) if postings else None
     
-    return results
\ No newline at end of file
+    def find_in_text(self, text: str) -> Optional[str]:
+        return self._name_matcher.longest_match(text)
+    
+    def search(self, cuisine=None, location=None, price_range=None) -> List[RestaurantRecord]:
+        criteria = {
+            "cuisine": cuisine.lower() if cuisine else None,
+            "location": location.lower() if location else None,
+            "price_range": price_range or None
+        }
+        postings = [self._indexes[field].get(key, {}) for field, key in criteria.items() if key is not None]
+        if not postings:
+            return self.restaurants
+        
+        postings.sort(key=len)
+        smallest, *others = postings
+        return [r for restaurant_id, r in smallest.items() if all(restaurant_id in other for other in others)]
+
+CATALOG = RestaurantCatalog(RESTAURANTS)
+
+def get_all_restaurants():
+    return CATALOG.restaurants
+
+def add_restaurant(restaurant):
+    return CATALOG.add(restaurant)
+
+def remove_restaurant(name):
+    return CATALOG.remove(name)
+
+def find_restaurant_in_text(text):
+    return CATALOG.find_in_text(text)
+
+def find_restaurant_by_name(name):
+    return CATALOG.find_by_name(name)
+
+def search_restaurants(cuisine=None, location=None, price_range=None):
+    # columnar imports this module, so it is only imported on first use.
+    from columnar import get_columnar_store
+    store = get_columnar_store(CATALOG)
+    if store is not None:
+        return store.query(cuisine=cuisine, location=location, price_range=price_range)
+    return CATALOG.search(cuisine=cuisine, location=location, price_range=price_range)
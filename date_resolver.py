@@ -0,0 +1,120 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional
+
+HORIZON_DAYS = 90
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MONTHS = ("january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december")
+MONTH_ABBREVIATIONS = {"sep": 9, "sept": 9}
+RELATIVE_DAYS = {"today": 0, "tonight": 0, "this evening": 0, "tomorrow": 1, "day after tomorrow": 2}
+
+
+def _ordinal(day: int) -> str:
+    suffix = "th" if 10 <= day % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix}"
+
+
+def _month_names() -> Dict[int, list]:
+    names = {month: [name, name[:3]] for month, name in enumerate(MONTHS, 1)}
+    for abbreviation, month in MONTH_ABBREVIATIONS.items():
+        names[month].append(abbreviation)
+    return {month: sorted(set(values)) for month, values in names.items()}
+
+
+def build_table(today: date, horizon_days: int = HORIZON_DAYS) -> Dict[str, str]:
+    # Every phrase the extractor can hand over, for every day from today to
+    # the horizon, mapped to its ISO date. Phrases naming a past day or one
+    # beyond the horizon are simply absent.
+    table = {}
+    month_names = _month_names()
+
+    def add(phrase: str, day: date):
+        table.setdefault(phrase, day.isoformat())
+
+    for phrase, offset in RELATIVE_DAYS.items():
+        add(phrase, today + timedelta(days=offset))
+
+    for offset in range(horizon_days):
+        day = today + timedelta(days=offset)
+        add(f"in {offset} days", day)
+        if offset % 7 == 0 and offset:
+            weeks = offset // 7
+            add(f"in {weeks} weeks", day)
+        if 0 < offset <= 7:
+            # "friday" and "this friday" mean the coming one, today included;
+            # "next friday" is the first one after today.
+            weekday = WEEKDAYS[day.weekday()]
+            add(f"next {weekday}", day)
+        if offset < 7:
+            weekday = WEEKDAYS[day.weekday()]
+            add(weekday, day)
+            add(f"this {weekday}", day)
+
+        iso = day.isoformat()
+        add(iso, day)
+        for month in (str(day.month), f"{day.month:02d}"):
+            for day_of_month in (str(day.day), f"{day.day:02d}"):
+                add(f"{month}/{day_of_month}", day)
+                add(f"{month}/{day_of_month}/{day.year}", day)
+                add(f"{month}/{day_of_month}/{day.year % 100:02d}", day)
+        for name in month_names[day.month]:
+            for day_of_month in (str(day.day), _ordinal(day.day)):
+                add(f"{name} {day_of_month}", day)
+            add(f"{_ordinal(day.day)} {name}", day)
+            add(f"{_ordinal(day.day)} of {name}", day)
+
+    add("in 1 day", today + timedelta(days=1))
+    add("in a day", today + timedelta(days=1))
+    if horizon_days > 7:
+        add("in 1 week", today + timedelta(days=7))
+        add("in a week", today + timedelta(days=7))
+    return table
+
+
+class DateResolver:
+    # Resolves date phrases ("friday", "next friday", "in 3 days", "10/24",
+    # "2026-10-24", "october 24th") to ISO dates with one dict lookup. The
+    # table covers a rolling horizon and is rebuilt on the first lookup after
+    # local midnight; the clock is a time.time()-style callable.
+    def __init__(self, horizon_days: int = HORIZON_DAYS, clock: Callable[[], float] = time.time):
+        self.horizon_days = horizon_days
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._expires = float("-inf")
+        self._today: Optional[date] = None
+        self._table: Dict[str, str] = {}
+        self.rebuilds = 0
+
+    def current_day(self) -> date:
+        if self._clock() >= self._expires:
+            self._rebuild()
+        return self._today
+
+    def resolve(self, phrase: str) -> Optional[str]:
+        if self._clock() >= self._expires:
+            self._rebuild()
+        return self._table.get(" ".join(phrase.lower().split()))
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def _rebuild(self):
+        with self._lock:
+            now = self._clock()
+            if now < self._expires:
+                return
+            today = datetime.fromtimestamp(now).date()
+            table = build_table(today, self.horizon_days)
+            midnight = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+            self._table, self._today, self._expires = table, today, midnight
+            self.rebuilds += 1
+
+
+RESOLVER = DateResolver()
+
+
+def resolve_date(phrase: str) -> Optional[str]:
+    return RESOLVER.resolve(phrase)
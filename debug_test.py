@@ -1,4 +1,5 @@
 from services import ContextSwitchChatService
+from log_config import configure_logging
 
 def test_context_switching():
     service = ContextSwitchChatService()
@@ -45,4 +46,5 @@ def test_context_switching():
     print(f"Context string: {context}")
 
 if __name__ == "__main__":
+    configure_logging(level="DEBUG")
     test_context_switching()
\ No newline at end of file
@@ -0,0 +1,240 @@
+import re
+from typing import List, NamedTuple, Optional
+
+from data import find_restaurant_in_text
+from date_resolver import MONTH_ABBREVIATIONS, MONTHS, WEEKDAYS, resolve_date
+from matchers import word_trie
+
+# When several dates appear the lowest rank wins: the four original date
+# words in this order, then any other date phrase, first one first.
+DATE_RANKS = {"today": 0, "tomorrow": 1, "tonight": 2, "this evening": 3}
+OTHER_DATE_RANK = len(DATE_RANKS)
+CUE_WORDS = {"actually", "instead", "rather", "make it"}
+# A value right after one of these is the one being changed away from:
+# "make it 8pm not 7pm", "instead of 7pm".
+NEGATION_WORDS = {"not", "instead of"}
+CHANGE_VERBS = {"change", "switch", "update", "modify", "alter"}
+# How far (in characters) a "to" may trail a change verb: "change the time to".
+CHANGE_VERB_REACH = 20
+
+MIN_PARTY_SIZE = 1
+MAX_PARTY_SIZE = 20
+
+_ORDINAL = r"(?:st|nd|rd|th)"
+_MONTHS = set(MONTHS) | {month[:3] for month in MONTHS} | set(MONTH_ABBREVIATIONS)
+_NOT_TIME_OR_PARTY = r"(?![\d:]|\s*(?:am|pm|people|persons?|guests?|pax)\b)"
+# Date phrases the resolver knows, by the word that starts them: relative
+# words, "(next|this) friday", "in 3 days", "october 24th". A month name is
+# only a date when the number after it is not a time or a party size
+# ("may 4 people join").
+DATE_WORDS = {
+    **{word: "" for word in DATE_RANKS},
+    "day after tomorrow": "",
+    **{weekday: "" for weekday in WEEKDAYS},
+    **{f"{prefix} {weekday}": "" for prefix in ("next", "this") for weekday in WEEKDAYS},
+    "in": r"\s+(?:\d{1,2}|a)\s+(?:days?|weeks?)",
+    **{month: rf"\s+\d{{1,2}}(?:{_ORDINAL}\b|{_NOT_TIME_OR_PARTY})" for month in _MONTHS},
+}
+# What may follow a number to make it a date: "-10-24" (ISO), "/24" or
+# "/24/2026", "th of october".
+DATE_TAIL = (
+    r"-\d\d-\d\d(?![\d-])|/\d{1,2}(?:/(?:\d{4}|\d\d))?(?![\d/])"
+    rf"|{_ORDINAL}\s+(?:of\s+)?{word_trie(dict.fromkeys(_MONTHS, ''))}\b"
+)
+DATE_PATTERN = rf"\d+(?:{DATE_TAIL})|\b{word_trie(DATE_WORDS)}\b"
+CONTEXT_WORDS = CUE_WORDS | NEGATION_WORDS | CHANGE_VERBS | {"to", "for", "table", "party", "of"}
+
+# One scan of the message yields every token the extractor needs: a digit
+# run with what follows it, either a date tail or an optional ":mm" and a
+# directly following am/pm or people word ("10/24", "7pm", "8:30 pm",
+# "19:30", "4 guests"), or a word from the date and context vocabularies.
+# Everything else is skipped by the regex engine, and no alternative
+# contains an unbounded wildcard, so the scan is linear in the message
+# length. The words form a single prefix trie, so each position costs one
+# branch per distinct first letter. Any word starting with "book" or
+# "reservation" counts as a booking word.
+TOKEN_PATTERN = re.compile(
+    rf"(\d+)(?:({DATE_TAIL})|(?::(\d\d)(?!\d))?(?:\s*(am|pm|people|persons?|guests?|pax)\b)?)"
+    r"|\b("
+    + word_trie({**DATE_WORDS, **dict.fromkeys(CONTEXT_WORDS, ""), "book": r"\w*", "reservation": r"\w*"})
+    + r")\b"
+)
+MERIDIEMS = {"am", "pm"}
+
+# Party size ranks: "table for 4 people", "book ... for 4", "4 people",
+# "party of 4". Time ranks: with am/pm, then 24-hour clock.
+PARTY_FOR_NOUN, PARTY_FOR, PARTY_NOUN, PARTY_OF = range(4)
+TIME_MERIDIEM, TIME_CLOCK = range(2)
+
+
+class Span(NamedTuple):
+    kind: str  # "time", "party_size", "date", "restaurant_name", "cue" or "negation"
+    value: object
+    start: int
+    end: int
+    rank: int = 0
+
+
+def _to_24_hour(hour: int, minute: int, meridiem: Optional[str]) -> Optional[str]:
+    if meridiem is None:
+        if hour > 23:
+            return None
+    elif not 1 <= hour <= 12:
+        return None
+    elif meridiem == "pm" and hour != 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    if minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def extract_spans(message: str) -> List[Span]:
+    # Walks the tokens once, left to right, emitting a span for every time,
+    # party size, date word and modification cue, then adds the longest
+    # catalog restaurant name found by the name automaton.
+    text = message.lower()
+    spans = []
+
+    booking_word_seen = False
+    party_seen = False
+    party_of = False
+    previous_word = None
+    previous_end = -1
+    for_end = None
+    change_verb_end = None
+
+    for match in TOKEN_PATTERN.finditer(text):
+        digits, date_tail, minutes, suffix, word = match.groups()
+        start, end = match.span()
+
+        if word is not None and not word.isalpha():
+            word = " ".join(word.split())
+        if date_tail is not None or (word is not None and word not in CONTEXT_WORDS
+                                     and not word.startswith(("book", "reservation"))):
+            value = resolve_date(match.group())
+            if value:
+                spans.append(Span("date", value, start, end, DATE_RANKS.get(word, OTHER_DATE_RANK)))
+            for_end = None
+            previous_word = None
+            continue
+
+        if digits is not None:
+            # "for 4" only counts when the number directly follows an eligible "for".
+            after_for = for_end is not None and (for_end == start or text[for_end:start].isspace())
+            for_end = None
+            if suffix in MERIDIEMS and len(digits) <= 2:
+                value = _to_24_hour(int(digits), int(minutes or 0), suffix)
+                if value:
+                    spans.append(Span("time", value, start, end, TIME_MERIDIEM))
+            elif minutes is not None and len(digits) <= 2:
+                value = _to_24_hour(int(digits), int(minutes), None)
+                if value:
+                    spans.append(Span("time", value, start, end, TIME_CLOCK))
+            elif suffix is not None and suffix not in MERIDIEMS:
+                spans.append(Span("party_size", int(digits), start, end, PARTY_FOR_NOUN if after_for else PARTY_NOUN))
+            elif after_for:
+                spans.append(Span("party_size", int(digits), start, end, PARTY_FOR))
+            elif party_of:
+                spans.append(Span("party_size", int(digits), start, end, PARTY_OF))
+                party_of = False
+            previous_word = None
+            continue
+
+        if word == "for":
+            if booking_word_seen or (previous_word == "table" and text[previous_end:start].isspace()):
+                for_end = end
+        elif word in CUE_WORDS:
+            spans.append(Span("cue", word, start, end))
+        elif word in NEGATION_WORDS:
+            if word == "instead of":
+                spans.append(Span("cue", word, start, end))
+            spans.append(Span("negation", word, start, end))
+        elif word in CHANGE_VERBS:
+            change_verb_end = end
+        elif word == "to":
+            if change_verb_end is not None and start - change_verb_end <= CHANGE_VERB_REACH:
+                spans.append(Span("cue", word, start, end))
+        elif word == "party":
+            party_seen = True
+        elif word == "of":
+            party_of = party_seen
+        elif word != "table":
+            booking_word_seen = True
+        previous_word = word
+        previous_end = end
+
+    restaurant = find_restaurant_in_text(text)
+    if restaurant:
+        start = text.find(restaurant.lower())
+        spans.append(Span("restaurant_name", restaurant, start, start + len(restaurant)))
+    return spans
+
+
+def _best(spans: List[Span], kind: str) -> Optional[Span]:
+    best = None
+    for span in spans:
+        if span.kind == kind and (best is None or span.rank < best.rank):
+            best = span
+    return best
+
+
+def booking_time(spans: List[Span]) -> Optional[str]:
+    span = _best(spans, "time")
+    return span.value if span else None
+
+
+def booking_date(spans: List[Span]) -> Optional[str]:
+    span = _best(spans, "date")
+    return span.value if span else None
+
+
+def booking_party_size(spans: List[Span], bounded: bool = True) -> Optional[int]:
+    # The first span of the best rank decides; if it is out of range the next
+    # rank gets a chance, as with the old ordered pattern list.
+    for rank in (PARTY_FOR_NOUN, PARTY_FOR, PARTY_NOUN, PARTY_OF):
+        span = next((span for span in spans if span.kind == "party_size" and span.rank == rank), None)
+        if span and (not bounded or MIN_PARTY_SIZE <= span.value <= MAX_PARTY_SIZE):
+            return span.value
+    return None
+
+
+def booking_info(spans: List[Span]) -> dict:
+    info = {}
+    restaurant = _best(spans, "restaurant_name")
+    if restaurant:
+        info["restaurant_name"] = restaurant.value
+    time = booking_time(spans)
+    if time:
+        info["time"] = time
+    party_size = booking_party_size(spans)
+    if party_size:
+        info["party_size"] = party_size
+    date = booking_date(spans)
+    if date:
+        info["date"] = date
+    return info
+
+
+def modification_info(spans: List[Span]) -> dict:
+    # Everything a booking message would yield, except that the time, party
+    # size and date the user is changing to win: the last ones after the
+    # first cue ("actually", "make it", "change ... to", "instead"), skipping
+    # values negated by a directly preceding "not" or "instead of". Party
+    # sizes named in a change are not range-checked here; create_booking
+    # reports sizes a restaurant cannot seat.
+    info = booking_info(spans)
+    party_size = booking_party_size(spans, bounded=False)
+    if party_size and "party_size" not in info:
+        info["party_size"] = party_size
+
+    cue = next((span for span in spans if span.kind == "cue"), None)
+    if cue is not None:
+        previous = None
+        for span in spans:
+            if (span.start > cue.start and span.kind in ("time", "party_size", "date")
+                    and (previous is None or previous.kind != "negation")):
+                info[span.kind] = span.value
+            previous = span
+    return info
@@ -0,0 +1,100 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class ExecutorOverloaded(RuntimeError):
+    pass
+
+
+class BoundedExecutor:
+    # Runs blocking calls on a fixed pool of worker threads so the event loop
+    # stays free for other requests. At most max_workers calls run at once and
+    # at most max_queue more wait for a worker; anything beyond that is
+    # rejected immediately with ExecutorOverloaded instead of piling up and
+    # dragging every queued request past its deadline.
+    def __init__(self, max_workers: int = 4, max_queue: int = 64, thread_name_prefix: str = "chat-worker"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix=thread_name_prefix)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, function: Callable[..., T], *args, **kwargs) -> T:
+        # The counter is only touched on the event loop thread, so it needs no
+        # lock. A slot is freed when the worker finishes, not when the awaiting
+        # request goes away, so cancelled requests cannot over-admit work.
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise ExecutorOverloaded(f"{self.in_flight} calls already running or queued")
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(functools.partial(function, *args, **kwargs))
+        self.in_flight += 1
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _release(self):
+        self.in_flight -= 1
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+class SessionSerializer:
+    # Turns for one session run one at a time in arrival order (asyncio.Lock
+    # wakes waiters FIFO), while different sessions never wait on each other.
+    # A message identical to one already queued or running for the same
+    # session shares that turn's result instead of running again, which
+    # absorbs client retries and double submits. The shared turn is shielded,
+    # so a caller going away never cancels work another caller is waiting on.
+    def __init__(self):
+        self.coalesced = 0
+        self._locks: Dict[str, list] = {}
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def submit(self, session_id: str, message: str, turn: Callable[[], Awaitable[T]]) -> T:
+        key = (session_id, message)
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        pending = self._pending[key] = asyncio.ensure_future(self.in_order(session_id, turn))
+        pending.add_done_callback(lambda task: self._finished(key, task))
+        return await asyncio.shield(pending)
+
+    def active_sessions(self) -> int:
+        return len(self._locks)
+
+    async def in_order(self, session_id: str, turn: Callable[[], Awaitable[T]]) -> T:
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await turn()
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[session_id]
+
+    def _finished(self, key: Tuple[str, str], task: asyncio.Future):
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        # Every caller may have gone away; retrieve the error so asyncio does
+        # not report it as never retrieved.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import data
+import date_resolver
+
+
+def normalize_message(message: str) -> str:
+    # Case and runs of spaces never change what the extractors find, so
+    # "Yes", "yes " and "YES" share one cache entry. Line breaks are kept
+    # (blank lines dropped): intent rules like "book.*table" do not match
+    # across lines.
+    return "\n".join(" ".join(line.split()) for line in message.lower().splitlines() if line.strip())
+
+
+class ExtractionCache:
+    # Bounded LRU of extraction and intent results keyed on normalized message
+    # text. Results depend on the restaurant catalog (name matching) and on
+    # the current day (relative dates), so the cache empties itself whenever
+    # data.CATALOG is replaced or changes version and when the day changes.
+    # Values are computed outside the lock; two threads missing on the same key
+    # both compute it and the second store wins, which is harmless for pure
+    # functions of the key.
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._catalog = data.CATALOG
+        self._catalog_version = data.CATALOG.version
+        self._day = date_resolver.RESOLVER.current_day()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: Hashable, compute: Callable[[], object]):
+        if self.max_entries <= 0:
+            return compute()
+
+        with self._lock:
+            self._check_sources()
+            generation = self.invalidations
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = compute()
+        with self._lock:
+            # A value computed while the catalog or day changed may be stale;
+            # serve it to this caller but do not keep it.
+            self._check_sources()
+            if self.invalidations == generation:
+                self._entries[key] = value
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "invalidations": self.invalidations,
+        }
+
+    def _check_sources(self):
+        catalog = data.CATALOG
+        day = date_resolver.RESOLVER.current_day()
+        if catalog is not self._catalog or catalog.version != self._catalog_version or day != self._day:
+            self._entries.clear()
+            self._catalog = catalog
+            self._catalog_version = catalog.version
+            self._day = day
+            self.invalidations += 1
@@ -0,0 +1,174 @@
+import sqlite3
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from restaurant_record import RestaurantRecord
+
+
+class SeatInventory:
+    # Remaining seats per slot, one compact array per (restaurant, date) with
+    # one counter per available time. Grids are created on first use, so an
+    # availability check is a bisect over the restaurant's slots plus an
+    # array index regardless of how many bookings exist.
+    def __init__(self):
+        self._grids: Dict[Tuple[int, str], array] = {}
+        self._lock = threading.Lock()
+
+    def _grid(self, restaurant: RestaurantRecord, date: str) -> array:
+        key = (restaurant.id, date)
+        grid = self._grids.get(key)
+        if grid is None:
+            grid = array("H", [min(restaurant.capacity, 0xFFFF)]) * len(restaurant.slots)
+            self._grids[key] = grid
+        return grid
+
+    def remaining(self, restaurant: RestaurantRecord, date: str, time: str) -> int:
+        index = restaurant.slot_index(time)
+        if index is None:
+            return 0
+        grid = self._grids.get((restaurant.id, date))
+        return grid[index] if grid is not None else min(restaurant.capacity, 0xFFFF)
+
+    def reserve(self, restaurant: RestaurantRecord, date: str, time: str, party_size: int) -> bool:
+        with self._lock:
+            return self._reserve(restaurant, date, time, party_size)
+
+    def release(self, restaurant: RestaurantRecord, date: str, time: str, party_size: int):
+        with self._lock:
+            self._release(restaurant, date, time, party_size)
+
+    def exchange(self, previous: Tuple[RestaurantRecord, str, str, int],
+                 restaurant: RestaurantRecord, date: str, time: str, party_size: int) -> bool:
+        # Moves a reservation: the previous seats are given back first, so a
+        # booking can grow within its own slot, and are taken again if the
+        # new ones do not fit. Both happen under one lock, so no other booking
+        # can take the freed seats in between.
+        with self._lock:
+            self._release(*previous)
+            if self._reserve(restaurant, date, time, party_size):
+                return True
+            self._reserve(*previous)
+            return False
+
+    def _reserve(self, restaurant: RestaurantRecord, date: str, time: str, party_size: int) -> bool:
+        index = restaurant.slot_index(time)
+        if index is None or party_size <= 0:
+            return False
+        grid = self._grid(restaurant, date)
+        if grid[index] < party_size:
+            return False
+        grid[index] -= party_size
+        return True
+
+    def _release(self, restaurant: RestaurantRecord, date: str, time: str, party_size: int):
+        index = restaurant.slot_index(time)
+        if index is None:
+            return
+        grid = self._grid(restaurant, date)
+        grid[index] = min(grid[index] + party_size, restaurant.capacity, 0xFFFF)
+
+    def close(self):
+        pass
+
+
+class SQLiteSeatInventory:
+    # The same interface backed by a SQLite table, so worker processes on one
+    # host sell seats from a single ledger. Each change is one IMMEDIATE
+    # transaction: the first writer takes the database lock and the check and
+    # the decrement cannot interleave with another worker's. Rows are created
+    # with the full capacity on first use, like the in-memory grids. The table
+    # is persistent, so it is never rebuilt from the bookings.
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS seats (restaurant_id INTEGER NOT NULL, date TEXT NOT NULL, "
+                "slot INTEGER NOT NULL, remaining INTEGER NOT NULL, PRIMARY KEY (restaurant_id, date, slot)) WITHOUT ROWID"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=FULL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def remaining(self, restaurant: RestaurantRecord, date: str, time: str) -> int:
+        index = restaurant.slot_index(time)
+        if index is None:
+            return 0
+        row = self._connection().execute(
+            "SELECT remaining FROM seats WHERE restaurant_id = ? AND date = ? AND slot = ?",
+            (restaurant.id, date, restaurant.slots[index])
+        ).fetchone()
+        return row[0] if row is not None else restaurant.capacity
+
+    def reserve(self, restaurant: RestaurantRecord, date: str, time: str, party_size: int) -> bool:
+        with self._transaction() as connection:
+            return self._reserve(connection, restaurant, date, time, party_size)
+
+    def release(self, restaurant: RestaurantRecord, date: str, time: str, party_size: int):
+        with self._transaction() as connection:
+            self._release(connection, restaurant, date, time, party_size)
+
+    def exchange(self, previous: Tuple[RestaurantRecord, str, str, int],
+                 restaurant: RestaurantRecord, date: str, time: str, party_size: int) -> bool:
+        with self._transaction() as connection:
+            self._release(connection, *previous)
+            if self._reserve(connection, restaurant, date, time, party_size):
+                return True
+            self._reserve(connection, *previous)
+            return False
+
+    def _slot(self, connection: sqlite3.Connection, restaurant: RestaurantRecord, date: str, time: str):
+        index = restaurant.slot_index(time)
+        if index is None:
+            return None
+        key = (restaurant.id, date, restaurant.slots[index])
+        connection.execute(
+            "INSERT OR IGNORE INTO seats (restaurant_id, date, slot, remaining) VALUES (?, ?, ?, ?)",
+            (*key, restaurant.capacity)
+        )
+        return key
+
+    def _reserve(self, connection: sqlite3.Connection, restaurant: RestaurantRecord, date: str, time: str,
+                 party_size: int) -> bool:
+        key = self._slot(connection, restaurant, date, time)
+        if key is None or party_size <= 0:
+            return False
+        return connection.execute(
+            "UPDATE seats SET remaining = remaining - ? WHERE restaurant_id = ? AND date = ? AND slot = ? AND remaining >= ?",
+            (party_size, *key, party_size)
+        ).rowcount == 1
+
+    def _release(self, connection: sqlite3.Connection, restaurant: RestaurantRecord, date: str, time: str,
+                 party_size: int):
+        key = self._slot(connection, restaurant, date, time)
+        if key is None:
+            return
+        connection.execute(
+            "UPDATE seats SET remaining = MIN(remaining + ?, ?) WHERE restaurant_id = ? AND date = ? AND slot = ?",
+            (party_size, restaurant.capacity, *key)
+        )
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+DEFAULT_TRACE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "traces", "conversations.jsonl")
+TRACKED_METRICS = ("process_resident_memory_bytes", "foodiespot_live_sessions", "foodiespot_chat_rejected_total")
+
+
+def load_trace(path: str) -> List[dict]:
+    # One conversation per line: {"name": ..., "turns": [{"message": ...,
+    # "think_ms": ...}, ...]}. think_ms is the pause before that turn is sent.
+    with open(path, encoding="utf-8") as file:
+        conversations = [json.loads(line) for line in file if line.strip()]
+    if not conversations:
+        raise ValueError(f"No conversations in {path}")
+    return conversations
+
+
+def scrape_metrics(base_url: str) -> Dict[str, float]:
+    try:
+        text = requests.get(f"{base_url}/metrics", timeout=5).text
+    except requests.RequestException:
+        return {}
+    values = {}
+    for name in TRACKED_METRICS:
+        match = re.search(rf"^{name} (\S+)$", text, re.MULTILINE)
+        if match:
+            values[name] = float(match.group(1))
+    return values
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class LoadTest:
+    def __init__(self, base_url: str, conversations: List[dict], concurrency: int, rate: float,
+                 total: int, think_scale: float, timeout: float, seed: int):
+        self.base_url = base_url
+        self.conversations = conversations
+        self.concurrency = concurrency
+        self.rate = rate
+        self.total = total
+        self.think_scale = think_scale
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.run_id = uuid.uuid4().hex[:8]
+
+        self.samples: List[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _http(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _record(self, sample: dict):
+        with self._lock:
+            self.samples.append(sample)
+
+    def replay(self, index: int, conversation: dict, scheduled: Optional[float] = None):
+        # Latency is measured from when a turn was due, not from when it was
+        # sent: the first turn is due think_ms after the conversation's
+        # scheduled arrival, later turns think_ms after the previous reply. A
+        # conversation that waited for a free worker, or a turn sent late,
+        # counts that wait (no coordinated omission). service_latency is the
+        # time from send alone.
+        session_id = f"load-{self.run_id}-{index}"
+        due = scheduled if scheduled is not None else time.perf_counter()
+        for turn in conversation["turns"]:
+            due += turn.get("think_ms", 0) / 1000 * self.think_scale
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            start = time.perf_counter()
+            sample = {"conversation": conversation.get("name", "unnamed"), "intent": "error", "status": None}
+            try:
+                response = self._http().post(
+                    f"{self.base_url}/chat", json={"message": turn["message"], "session_id": session_id},
+                    timeout=self.timeout
+                )
+                sample["status"] = response.status_code
+                if response.status_code == 200:
+                    sample["intent"] = response.json()["intent"]
+            except requests.RequestException as e:
+                sample["error"] = type(e).__name__
+            finished = time.perf_counter()
+            sample["latency"] = finished - due
+            sample["service_latency"] = finished - start
+            self._record(sample)
+            due = finished
+
+    def run(self) -> dict:
+        before = scrape_metrics(self.base_url)
+        started = time.perf_counter()
+
+        # Open-loop arrivals: conversations are scheduled on a Poisson process
+        # at `rate` per second whether or not earlier ones have finished, and
+        # at most `concurrency` are replayed at once; the rest wait for a
+        # worker, and that wait is part of their latency. With rate 0 the test
+        # is closed-loop: conversations start back to back as workers free up.
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="load") as pool:
+            next_arrival = time.perf_counter()
+            for index in range(self.total):
+                scheduled = None
+                if self.rate > 0:
+                    next_arrival += self.rng.expovariate(self.rate)
+                    scheduled = next_arrival
+                    delay = next_arrival - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                pool.submit(self.replay, index, self.conversations[index % len(self.conversations)], scheduled)
+
+        elapsed = time.perf_counter() - started
+        after = scrape_metrics(self.base_url)
+        return self.summarize(elapsed, before, after)
+
+    def summarize(self, elapsed: float, before: dict, after: dict) -> dict:
+        by_intent = defaultdict(list)
+        for sample in self.samples:
+            by_intent[sample["intent"]].append(sample["latency"])
+
+        def latency_stats(latencies: List[float]) -> dict:
+            return {
+                "count": len(latencies),
+                "mean_ms": statistics.fmean(latencies) * 1000 if latencies else None,
+                **{f"p{int(q * 100)}_ms": (percentile(latencies, q) or 0) * 1000 for q in (0.5, 0.95, 0.99)},
+            }
+
+        errors = [sample for sample in self.samples if sample["status"] != 200]
+        memory_before = before.get("process_resident_memory_bytes")
+        memory_after = after.get("process_resident_memory_bytes")
+        return {
+            "run_id": self.run_id,
+            "config": {
+                "base_url": self.base_url, "concurrency": self.concurrency, "rate": self.rate,
+                "conversations": self.total, "think_scale": self.think_scale
+            },
+            "elapsed_s": elapsed,
+            "turns": len(self.samples),
+            "throughput_rps": len(self.samples) / elapsed if elapsed else 0.0,
+            "errors": len(errors),
+            "error_rate": len(errors) / len(self.samples) if self.samples else 0.0,
+            "errors_by_status": dict(sorted(
+                (str(status), sum(1 for sample in errors if sample["status"] == status))
+                for status in {sample["status"] for sample in errors}
+            )),
+            "latency": latency_stats([sample["latency"] for sample in self.samples]),
+            "service_latency": latency_stats([sample["service_latency"] for sample in self.samples]),
+            "latency_by_intent": {intent: latency_stats(values) for intent, values in sorted(by_intent.items())},
+            "server": {
+                "before": before,
+                "after": after,
+                "memory_growth_bytes": memory_after - memory_before
+                if memory_before is not None and memory_after is not None else None
+            }
+        }
+
+
+def print_report(result: dict, baseline: Optional[dict] = None):
+    def delta(path: List[str], current: Optional[float]) -> str:
+        if baseline is None or current is None:
+            return ""
+        previous = baseline
+        for key in path:
+            previous = previous.get(key) if isinstance(previous, dict) else None
+        if not previous:
+            return ""
+        return f" ({(current - previous) / previous * 100:+.1f}%)"
+
+    print(f"turns={result['turns']} elapsed={result['elapsed_s']:.1f}s "
+          f"throughput={result['throughput_rps']:.1f}/s{delta(['throughput_rps'], result['throughput_rps'])} "
+          f"errors={result['errors']} ({result['error_rate'] * 100:.2f}%)")
+
+    print(f"{'intent':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = [
+        ("all", result["latency"], ["latency"]),
+        ("all, from send", result["service_latency"], ["service_latency"]),
+    ] + [
+        (intent, stats, ["latency_by_intent", intent]) for intent, stats in result["latency_by_intent"].items()
+    ]
+    for label, stats, path in rows:
+        print(f"{label:<22}{stats['count']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['p99_ms']:>10.1f}{delta(path + ['p99_ms'], stats['p99_ms'])}")
+
+    growth = result["server"]["memory_growth_bytes"]
+    if growth is not None:
+        print(f"server memory growth: {growth / 1e6:+.1f} MB "
+              f"(now {result['server']['after']['process_resident_memory_bytes'] / 1e6:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay conversation traces against a running FoodieSpot server")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--trace", default=DEFAULT_TRACE, help="JSONL file with one conversation per line")
+    parser.add_argument("--conversations", type=int, default=200, help="conversations to replay, cycling the trace")
+    parser.add_argument("--concurrency", type=int, default=16, help="conversations replayed at once")
+    parser.add_argument("--rate", type=float, default=0.0, help="conversation arrivals per second (0: back to back)")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="multiplier for think_ms pauses (0 disables)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="results JSON from an earlier run to diff against")
+    args = parser.parse_args()
+
+    test = LoadTest(args.url, load_trace(args.trace), args.concurrency, args.rate, args.conversations,
+                    args.think_scale, args.timeout, args.seed)
+    result = test.run()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Optional, TextIO
+
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class StructuredFormatter(logging.Formatter):
+    # logfmt-style lines: fixed fields first, then anything passed via extra=.
+    def format(self, record: logging.LogRecord) -> str:
+        fields = [
+            ("ts", self.formatTime(record, "%Y-%m-%dT%H:%M:%S")),
+            ("level", record.levelname.lower()),
+            ("logger", record.name),
+            ("msg", record.getMessage())
+        ]
+        fields.extend((key, value) for key, value in record.__dict__.items() if key not in _STANDARD_ATTRIBUTES)
+
+        line = " ".join(f"{key}={self._quote(value)}" for key, value in fields)
+        if record.exc_info:
+            line = f"{line}\n{self.formatException(record.exc_info)}"
+        return line
+
+    def _quote(self, value) -> str:
+        text = str(value)
+        if not text or any(char in text for char in ' "=\n'):
+            return '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        return text
+
+
+def stop_async_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_async_logging)
+
+
+def configure_logging(level: Optional[str] = None, async_handler: Optional[bool] = None,
+                      stream: Optional[TextIO] = None) -> logging.Logger:
+    global _listener
+
+    level = (level or os.environ.get("FOODIESPOT_LOG_LEVEL", "INFO")).upper()
+    if async_handler is None:
+        async_handler = os.environ.get("FOODIESPOT_LOG_ASYNC", "").lower() in ("1", "true", "yes")
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(StructuredFormatter())
+
+    stop_async_logging()
+
+    if async_handler:
+        # Records are formatted and written by a background thread, so a slow
+        # stream never blocks the request that logged them.
+        records: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+        handler = logging.handlers.QueueHandler(records)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    return root
@@ -0,0 +1,311 @@
+import re
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def split_alternatives(pattern: str) -> List[str]:
+    alternatives = []
+    current = []
+    depth = 0
+    in_class = False
+    escaped = False
+
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            alternatives.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+
+    alternatives.append("".join(current))
+    return alternatives
+
+
+class MatchTimeout(RuntimeError):
+    pass
+
+
+def split_wildcards(alternative: str) -> List[str]:
+    # Splits one alternative on its top-level ".*" into the pieces that must
+    # appear in order: "let.*make.*it" -> ["let", "make", "it"].
+    pieces = []
+    current = []
+    depth = 0
+    in_class = False
+    escaped = False
+
+    index = 0
+    while index < len(alternative):
+        char = alternative[index]
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "." and depth == 0 and alternative.startswith(".*", index):
+            pieces.append("".join(current))
+            current = []
+            index += 2
+            continue
+        current.append(char)
+        index += 1
+
+    pieces.append("".join(current))
+    return pieces
+
+
+def word_trie(words: Dict[str, str]) -> str:
+    # Alternation over words (spaces match any whitespace), factored on
+    # shared prefixes: "to|today|tomorrow" -> "to(?:day|morrow|)". The engine
+    # then tries one branch per distinct first letter instead of one per word.
+    # Each word maps to a regex that must follow it ("" for none). Longer
+    # words are tried before their prefixes.
+    tree: dict = {}
+    for word, suffix in words.items():
+        node = tree
+        for char in word:
+            node = node.setdefault(char, {})
+        node[None] = suffix
+
+    def emit(node: dict) -> str:
+        branches = [(r"\s+" if char == " " else re.escape(char)) + emit(child)
+                    for char, child in sorted((char, child) for char, child in node.items() if char is not None)]
+        if None in node:
+            branches.append(node[None])
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    return emit(tree)
+
+
+_LITERAL = re.compile(r"[\w ]*")
+_NESTED_WILDCARD = re.compile(r"(?<!\\)\.[*+]")
+_LEADING_RUN = re.compile(r"(\\[dsw]|\[(?:\\.|[^\]\\])*\])[+*]")
+
+
+def _anchor_leading_run(pattern: str) -> str:
+    # "\d+..." searched from every position re-scans a digit run once per
+    # digit it contains, which is quadratic on long runs. A match can always
+    # be extended back to the start of the run, so only trying there finds the
+    # same messages in linear time. A "+" run keeps its first character in
+    # front of the lookbehind, so the engine still skips positions that cannot
+    # start the branch.
+    match = _LEADING_RUN.match(pattern)
+    if not match:
+        return pattern
+    run = match.group(1)
+    rest = pattern[match.end():]
+    if match.group(0).endswith("+"):
+        return f"{run}(?<!{run}{run}){run}*{rest}"
+    return f"(?<!{run}){pattern}"
+
+
+class CompiledIntentMatcher:
+    # Rules are matched in linear time, whatever the message. Alternatives
+    # without ".*" become branches of a single alternation, tagged with an
+    # empty named group at their end; branches keep their leading literal, so
+    # the regex engine can skip non-starting branches at each position.
+    #
+    # A search returns the leftmost position where any rule matches. Only rules
+    # with a higher priority than the winner can still override it, and none of
+    # them matched at or before that position, so the search resumes just past
+    # it with the prebuilt alternation of those rules.
+    #
+    # Alternatives with ".*" ("book.*table", "let.*make.*it") are never handed
+    # to the regex engine: backtracking over every combination of positions is
+    # cubic on messages that repeat the words. They are checked afterwards,
+    # only for rules that would outrank the winner, by finding each piece in
+    # turn after the previous one on the same line. That is exact as long as
+    # every piece before the last is a literal, which the constructor enforces.
+    #
+    # The result is exactly "first rule in order that re.search would find".
+    # With a deadline (a time.thread_time() value) the search raises
+    # MatchTimeout once it is passed. Thread CPU time is used so that waiting
+    # for the GIL behind other turns does not count against the budget.
+    def __init__(self, rules: Iterable[Tuple[str, str]], default: str):
+        self.rules: List[Tuple[str, str]] = [(label, pattern) for label, pattern in rules if pattern]
+        self.default = default
+        self._groups = {}
+        self._sequences: List[Tuple[int, str, List[str], object]] = []
+
+        branches = []
+        self._prefixes = []
+        for index, (_, pattern) in enumerate(self.rules):
+            for position, alternative in enumerate(split_alternatives(pattern)):
+                pieces = [piece for piece in split_wildcards(alternative) if piece]
+                if any(_NESTED_WILDCARD.search(piece) for piece in pieces):
+                    raise ValueError(f"Wildcards inside groups are not supported: {alternative!r}")
+                if len(pieces) > 1 or alternative.startswith(".*") or alternative.endswith(".*"):
+                    *literals, last = pieces or [""]
+                    for literal in literals:
+                        if not _LITERAL.fullmatch(literal):
+                            raise ValueError(f"Only the last piece of {alternative!r} may be a regular expression")
+                    tail = last if _LITERAL.fullmatch(last) else re.compile(_anchor_leading_run(last))
+                    words = literals + [tail] if isinstance(tail, str) else literals
+                    self._sequences.append((index, max(words, key=len, default=""), literals, tail))
+                    continue
+
+                group = f"r{index}_{position}"
+                self._groups[group] = index
+                branches.append(f"{_anchor_leading_run(alternative)}(?P<{group}>)")
+            self._prefixes.append(re.compile("|".join(branches)) if branches else None)
+
+    def match(self, message: str, deadline: Optional[float] = None) -> Optional[Tuple[str, str]]:
+        winner = None
+        limit = len(self._prefixes)
+        position = 0
+
+        while limit and position <= len(message):
+            prefix = self._prefixes[limit - 1]
+            match = prefix.search(message, position) if prefix is not None else None
+            if match is None:
+                break
+            winner = self._groups[match.lastgroup]
+            limit = winner
+            position = match.start() + 1
+            if deadline is not None and time.thread_time() > deadline:
+                raise MatchTimeout(f"Intent matching passed its deadline after {len(message)} characters")
+
+        if deadline is not None and time.thread_time() > deadline:
+            raise MatchTimeout(f"Intent matching passed its deadline after {len(message)} characters")
+
+        # Most messages lack the longest word of most sequences, so a single
+        # membership test rules them out before any ordered search.
+        lines = None
+        for index, key, literals, tail in self._sequences:
+            if winner is not None and index >= winner:
+                break
+            if key not in message:
+                continue
+            if deadline is not None and time.thread_time() > deadline:
+                raise MatchTimeout(f"Intent matching passed its deadline after {len(message)} characters")
+            if lines is None:
+                lines = message.split("\n") if "\n" in message else (message,)
+            if any(_contains_in_order(line, literals, tail) for line in lines):
+                winner = index
+                break
+
+        return self.rules[winner] if winner is not None else None
+
+    def detect(self, message: str, deadline: Optional[float] = None) -> str:
+        rule = self.match(message, deadline)
+        return rule[0] if rule else self.default
+
+
+def _contains_in_order(line: str, literals: List[str], tail) -> bool:
+    position = 0
+    for literal in literals:
+        found = line.find(literal, position)
+        if found < 0:
+            return False
+        position = found + len(literal)
+    if isinstance(tail, str):
+        return line.find(tail, position) >= 0
+    return tail.search(line, position) is not None
+
+
+class RestaurantNameMatcher:
+    # Aho-Corasick automaton over lowercased restaurant names. Adding or
+    # removing a name only touches its own trie path; failure links are
+    # recomputed lazily on the next search, so a batch of catalog changes
+    # costs a single relink.
+    def __init__(self, names: Iterable[str] = ()):
+        self._goto: List[dict] = [{}]
+        self._names: List[Optional[str]] = [None]
+        self._depth: List[int] = [0]
+        self._fail: List[int] = [0]
+        self._suffix_output: List[int] = [0]
+        self._dirty = False
+
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str):
+        node = 0
+        for char in name.lower():
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._names.append(None)
+                self._depth.append(self._depth[node] + 1)
+                self._goto[node][char] = child
+            node = child
+        self._names[node] = name
+        self._dirty = True
+
+    def remove(self, name: str):
+        node = 0
+        for char in name.lower():
+            node = self._goto[node].get(char)
+            if node is None:
+                return
+        self._names[node] = None
+        self._dirty = True
+
+    def longest_match(self, text: str) -> Optional[str]:
+        if self._dirty:
+            self._link()
+
+        goto = self._goto
+        fail = self._fail
+        names = self._names
+        depth = self._depth
+        suffix_output = self._suffix_output
+
+        node = 0
+        best = None
+        best_length = 0
+
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            hit = node if names[node] is not None else suffix_output[node]
+            if hit and depth[hit] > best_length:
+                best_length = depth[hit]
+                best = names[hit]
+
+        return best
+
+    def _link(self):
+        goto = self._goto
+        names = self._names
+        fail = [0] * len(goto)
+        suffix_output = [0] * len(goto)
+
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(char, 0)
+                fail[child] = target
+                suffix_output[child] = target if names[target] is not None else suffix_output[target]
+                queue.append(child)
+
+        self._fail = fail
+        self._suffix_output = suffix_output
+        self._dirty = False
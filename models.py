@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
+from enum import Enum
 
 class Restaurant(BaseModel):
     id: int
@@ -22,6 +23,19 @@ class ChatResponse(BaseModel):
     intent: str
     data: Optional[dict] = None
 
+class BatchChatRequest(BaseModel):
+    messages: List[ChatRequest] = Field(..., min_length=1, max_length=1000)
+
+class BatchChatResult(BaseModel):
+    session_id: str
+    response: Optional[str] = None
+    intent: Optional[str] = None
+    data: Optional[dict] = None
+    error: Optional[str] = None
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatResult]
+
 class BookingRequest(BaseModel):
     restaurant_name: Optional[str] = None
     date: Optional[str] = None
@@ -35,4 +49,19 @@ class Booking(BaseModel):
     time: str
     party_size: int
     status: str
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+class BookingState(Enum):
+    INITIAL = "initial"
+    GATHERING_INFO = "gathering_info"
+    MODIFYING = "modifying"
+    CONFIRMING = "confirming"
+    COMPLETED = "completed"
+
+class ConversationContext:
+    def __init__(self):
+        self.booking_state = BookingState.INITIAL
+        self.last_intent = None
+        self.conversation_history = []
+        self.last_modification_type = None
+        self.modification_count = 0
\ No newline at end of file
@@ -0,0 +1,144 @@
+import heapq
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from columnar import get_columnar_store
+from data import CATALOG, PRICE_RANGES, RestaurantCatalog
+from restaurant_record import RestaurantRecord
+
+DEFAULT_WEIGHTS = {"rating": 0.5, "price": 0.3, "features": 0.2}
+
+PRICE_KEYWORDS = {
+    "cheap": "$", "budget": "$", "affordable": "$", "inexpensive": "$",
+    "moderate": "$$", "mid-range": "$$", "reasonable": "$$",
+    "upscale": "$$$", "fancy": "$$$", "fine dining": "$$$$", "expensive": "$$$$", "luxury": "$$$$"
+}
+
+FEATURE_STOPWORDS = {"options", "available", "service", "selection", "menu", "bar", "dining", "plates"}
+
+
+class RecommendationConstraints:
+    def __init__(self, cuisine: Optional[str] = None, location: Optional[str] = None,
+                 price_range: Optional[str] = None, features: Optional[Set[str]] = None):
+        self.cuisine = cuisine
+        self.location = location
+        self.price_range = price_range
+        self.features = features or set()
+
+    def is_empty(self) -> bool:
+        return not (self.cuisine or self.location or self.price_range or self.features)
+
+    def to_dict(self) -> dict:
+        return {
+            "cuisine": self.cuisine,
+            "location": self.location,
+            "price_range": self.price_range,
+            "features": sorted(self.features)
+        }
+
+
+class RecommendationEngine:
+    def __init__(self, catalog: RestaurantCatalog = CATALOG, weights: Optional[Dict[str, float]] = None, top_k: int = 3):
+        self.catalog = catalog
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.top_k = top_k
+        self._version = None
+
+    def _refresh(self):
+        if self._version == self.catalog.version:
+            return
+
+        # Per-restaurant score components only depend on the catalog, so they
+        # are computed once per catalog version and just combined per request.
+        self._profiles: Dict[int, Tuple[float, Tuple[float, ...], frozenset]] = {}
+        self._feature_keywords: Dict[str, Set[str]] = {}
+        for restaurant in self.catalog.restaurants:
+            tier = PRICE_RANGES.index(restaurant.price_range) if restaurant.price_range in PRICE_RANGES else None
+            price_match = tuple(
+                0.0 if tier is None else 1.0 - abs(tier - wanted) / (len(PRICE_RANGES) - 1)
+                for wanted in range(len(PRICE_RANGES))
+            )
+            features = frozenset(feature.lower() for feature in restaurant.features)
+            self._profiles[restaurant.id] = (restaurant.rating / 5.0, price_match, features)
+
+            for feature in features:
+                for word in re.findall(r"[a-z]+", feature):
+                    if len(word) > 3 and word not in FEATURE_STOPWORDS:
+                        self._feature_keywords.setdefault(word, set()).add(feature)
+
+        self._cuisine_regex = self._vocabulary_regex(self.catalog.values("cuisine"))
+        self._location_regex = self._vocabulary_regex(self.catalog.values("location"))
+        self._price_regex = self._vocabulary_regex(PRICE_KEYWORDS)
+        self._feature_regex = self._vocabulary_regex(self._feature_keywords)
+        self._version = self.catalog.version
+
+    def _vocabulary_regex(self, words) -> Optional[re.Pattern]:
+        words = sorted(words, key=len, reverse=True)
+        if not words:
+            return None
+        return re.compile(r"\b(?:" + "|".join(re.escape(word) for word in words) + r")\b")
+
+    def _find(self, regex: Optional[re.Pattern], message: str) -> Optional[str]:
+        match = regex.search(message) if regex else None
+        return match.group(0) if match else None
+
+    def extract_constraints(self, message: str) -> RecommendationConstraints:
+        self._refresh()
+        message_lower = message.lower()
+
+        price_range = None
+        symbols = re.search(r"\${1,4}", message)
+        if symbols:
+            price_range = symbols.group(0)
+        else:
+            keyword = self._find(self._price_regex, message_lower)
+            price_range = PRICE_KEYWORDS[keyword] if keyword else None
+
+        features = set()
+        if self._feature_regex:
+            for word in self._feature_regex.findall(message_lower):
+                features |= self._feature_keywords[word]
+
+        return RecommendationConstraints(
+            cuisine=self._find(self._cuisine_regex, message_lower),
+            location=self._find(self._location_regex, message_lower),
+            price_range=price_range,
+            features=features
+        )
+
+    def _candidates(self, constraints: RecommendationConstraints) -> Tuple[RecommendationConstraints, List[RestaurantRecord]]:
+        # Location is dropped first, then cuisine, until something matches;
+        # the constraints returned are the ones the candidates actually meet.
+        # Filtering runs on the NumPy column store when numpy is installed.
+        store = get_columnar_store(self.catalog)
+        for cuisine, location in ((constraints.cuisine, constraints.location), (constraints.cuisine, None), (None, None)):
+            if store is not None:
+                candidates = store.query(cuisine=cuisine, location=location)
+            else:
+                candidates = self.catalog.search(cuisine=cuisine, location=location)
+            if candidates:
+                applied = RecommendationConstraints(cuisine, location, constraints.price_range, constraints.features)
+                return applied, candidates
+        return constraints, []
+
+    def score(self, restaurant: RestaurantRecord, constraints: RecommendationConstraints) -> float:
+        rating, price_match, features = self._profiles[restaurant.id]
+        score = self.weights["rating"] * rating
+
+        if constraints.price_range in PRICE_RANGES:
+            score += self.weights["price"] * price_match[PRICE_RANGES.index(constraints.price_range)]
+        if constraints.features:
+            score += self.weights["features"] * len(constraints.features & features) / len(constraints.features)
+
+        return score
+
+    def recommend(self, constraints: RecommendationConstraints, top_k: Optional[int] = None) -> List[Tuple[float, RestaurantRecord]]:
+        return self.recommend_with_constraints(constraints, top_k)[1]
+
+    def recommend_with_constraints(self, constraints: RecommendationConstraints, top_k: Optional[int] = None
+                                   ) -> Tuple[RecommendationConstraints, List[Tuple[float, RestaurantRecord]]]:
+        self._refresh()
+        applied, candidates = self._candidates(constraints)
+        scored = ((self.score(r, applied), -position, r) for position, r in enumerate(candidates))
+        top = heapq.nlargest(top_k or self.top_k, scored, key=lambda item: (item[0], item[1]))
+        return applied, [(score, restaurant) for score, _, restaurant in top]
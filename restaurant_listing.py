@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import json
+from bisect import bisect_right
+from collections import OrderedDict
+from json.encoder import encode_basestring
+from typing import Dict, List, Optional, Tuple
+
+from data import CATALOG, RestaurantCatalog
+from models import Restaurant
+from serialization import compress
+
+FIELDS = tuple(Restaurant.model_fields)
+MAX_PAGE_SIZE = 1000
+
+ListingQuery = Tuple[Tuple[str, ...], Optional[int], Optional[int]]
+BodyKey = Tuple[ListingQuery, Optional[str]]
+
+
+class InvalidListingQuery(ValueError):
+    pass
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _encode_value(value) -> bytes:
+    # Fast paths for the scalar fields; json.dumps is only needed for lists.
+    if isinstance(value, str):
+        return encode_basestring(value).encode("utf-8")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value).encode("ascii")
+    return _encode(value)
+
+
+def encode_cursor(restaurant_id: int) -> str:
+    return base64.urlsafe_b64encode(str(restaurant_id).encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii"))
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidListingQuery(f"Invalid cursor: {cursor!r}") from None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+class RestaurantListing:
+    # Serialized views of one catalog version. Every field of every restaurant
+    # is encoded to a JSON fragment once, in id order, so any page with any
+    # projection is a concatenation of precomputed bytes; finished bodies are
+    # also kept in a small LRU, per content encoding, so a compressed listing
+    # is compressed once per catalog version rather than per request. Cursors carry the last id of the previous
+    # page, so paging stays consistent when restaurants are added or removed.
+    # ETags hash the catalog content together with the query: answering
+    # If-None-Match needs no body, and workers holding the same catalog agree.
+    def __init__(self, catalog: RestaurantCatalog, cache_size: int = 256):
+        self.version = catalog.version
+        self.cache_size = cache_size
+
+        restaurants = sorted(catalog.restaurants, key=lambda restaurant: restaurant.id)
+        self.ids = [restaurant.id for restaurant in restaurants]
+        prefixes = {field: _encode(field) + b":" for field in FIELDS}
+        self._fragments: List[Dict[str, bytes]] = [
+            {field: prefixes[field] + _encode_value(getattr(restaurant, field)) for field in FIELDS}
+            for restaurant in restaurants
+        ]
+        self._bodies: "OrderedDict[BodyKey, bytes]" = OrderedDict()
+
+        full = self.query()
+        self.fingerprint = hashlib.blake2b(self.body(full), digest_size=16).hexdigest()
+
+    def query(self, fields: Optional[str] = None, cursor: Optional[str] = None,
+              limit: Optional[int] = None) -> ListingQuery:
+        if fields:
+            selected = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+            unknown = [field for field in selected if field not in FIELDS]
+            if unknown:
+                raise InvalidListingQuery(f"Unknown fields: {', '.join(unknown)}. Valid fields: {', '.join(FIELDS)}")
+        else:
+            selected = FIELDS
+
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            raise InvalidListingQuery(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        return selected, decode_cursor(cursor) if cursor else None, limit
+
+    def etag(self, query: ListingQuery, encoding: Optional[str] = None) -> str:
+        key = _encode([self.fingerprint, *query])
+        tag = hashlib.blake2b(key, digest_size=12).hexdigest()
+        return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+    def body(self, query: ListingQuery, encoding: Optional[str] = None) -> bytes:
+        key = (query, encoding)
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+            return body
+
+        body = self._render(query) if encoding is None else compress(self.body(query), encoding)
+        self._bodies[key] = body
+        if len(self._bodies) > self.cache_size:
+            self._bodies.popitem(last=False)
+        return body
+
+    def _render(self, query: ListingQuery) -> bytes:
+        fields, after, limit = query
+        start = bisect_right(self.ids, after) if after is not None else 0
+        end = len(self.ids) if limit is None else min(len(self.ids), start + limit)
+
+        items = b",".join(
+            b"{" + b",".join([fragments[field] for field in fields]) + b"}"
+            for fragments in self._fragments[start:end]
+        )
+        next_cursor = encode_cursor(self.ids[end - 1]) if end < len(self.ids) else None
+        return b"".join([
+            b'{"restaurants":[', items,
+            b'],"count":', str(end - start).encode("ascii"),
+            b',"total":', str(len(self.ids)).encode("ascii"),
+            b',"next_cursor":', _encode(next_cursor), b"}"
+        ])
+
+
+_listing: Optional[RestaurantListing] = None
+
+
+def get_restaurant_listing() -> RestaurantListing:
+    global _listing
+    if _listing is None or _listing.version != CATALOG.version:
+        _listing = RestaurantListing(CATALOG)
+    return _listing
@@ -0,0 +1,98 @@
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from models import Restaurant
+
+# Values many restaurants have in common (cuisines, locations, price ranges,
+# ratings, opening schedules, feature lists) are stored once and shared.
+_SHARED: dict = {}
+
+
+def _shared(value):
+    return _SHARED.setdefault((type(value), value), value)
+
+
+@lru_cache(maxsize=4096)
+def to_minutes(time: str) -> Optional[int]:
+    # "19:30" -> 1170; None for anything that is not a valid "HH:MM". Cached:
+    # there are only 1440 valid times.
+    hours, separator, minutes = time.partition(":")
+    if not separator or len(hours) != 2 or len(minutes) != 2 or not (hours + minutes).isdigit():
+        return None
+    hour, minute = int(hours), int(minutes)
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class RestaurantRecord:
+    # Catalog entry used everywhere inside the service: a slotted object
+    # instead of a pydantic model, with the available times as a sorted tuple
+    # of minutes since midnight, so slot lookups are a bisect. The pydantic
+    # Restaurant is only built at the API edge (to_model), and listings read
+    # the same attribute names, available_times included.
+    __slots__ = ("id", "name", "cuisine", "location", "price_range", "rating", "capacity", "slots", "features")
+
+    def __init__(self, id: int, name: str, cuisine: str, location: str, price_range: str, rating: float,
+                 capacity: int, slots: Iterable[int], features: Iterable[str] = ()):
+        self.id = id
+        self.name = name
+        self.cuisine = _shared(cuisine)
+        self.location = _shared(location)
+        self.price_range = _shared(price_range)
+        self.rating = _shared(float(rating))
+        self.capacity = capacity
+        self.slots: Tuple[int, ...] = _shared(tuple(sorted(set(slots))))
+        self.features: Tuple[str, ...] = _shared(tuple(features))
+
+    @classmethod
+    def from_model(cls, restaurant: Restaurant) -> "RestaurantRecord":
+        slots = []
+        for time in restaurant.available_times:
+            minutes = to_minutes(time)
+            if minutes is None:
+                raise ValueError(f"Invalid time {time!r} for restaurant {restaurant.name!r}")
+            slots.append(minutes)
+        return cls(restaurant.id, restaurant.name, restaurant.cuisine, restaurant.location, restaurant.price_range,
+                   restaurant.rating, restaurant.capacity, slots, restaurant.features)
+
+    def to_model(self) -> Restaurant:
+        return Restaurant(
+            id=self.id, name=self.name, cuisine=self.cuisine, location=self.location,
+            price_range=self.price_range, rating=self.rating, capacity=self.capacity,
+            available_times=self.available_times, features=list(self.features)
+        )
+
+    @property
+    def available_times(self) -> List[str]:
+        return [format_minutes(minutes) for minutes in self.slots]
+
+    def slot_index(self, time: str) -> Optional[int]:
+        minutes = to_minutes(time)
+        if minutes is None:
+            return None
+        index = bisect_left(self.slots, minutes)
+        if index < len(self.slots) and self.slots[index] == minutes:
+            return index
+        return None
+
+    def has_slot(self, time: str) -> bool:
+        return self.slot_index(time) is not None
+
+    def nearest_slot(self, time: str) -> Optional[str]:
+        # The available time closest to the requested one; the earlier one
+        # wins a tie.
+        minutes = to_minutes(time)
+        if minutes is None or not self.slots:
+            return None
+        index = bisect_left(self.slots, minutes)
+        candidates = self.slots[max(index - 1, 0):index + 1]
+        return format_minutes(min(candidates, key=lambda slot: (abs(slot - minutes), slot)))
+
+    def __repr__(self) -> str:
+        return f"RestaurantRecord(id={self.id}, name={self.name!r})"
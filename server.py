@@ -1,16 +1,44 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from models import ChatRequest, ChatResponse
+from models import BatchChatRequest, BatchChatResponse, BatchChatResult, ChatRequest, ChatResponse
 from services import ContextSwitchChatService
+from session_store import InMemorySessionBackend, SQLiteSessionBackend
+from booking_store import BookingStoreUnavailable, DurableBookingStore, InMemoryBookingStore, SQLiteBookingStore
+from inventory import SQLiteSeatInventory
+from log_config import configure_logging
+from metrics import REGISTRY, process_resident_memory_bytes
+from executor import BoundedExecutor, ExecutorOverloaded, SessionSerializer
+from streaming import chunk_text, sse_event
+from serialization import CompressionMiddleware, FastJSONResponse, negotiate_encoding
+from restaurant_listing import InvalidListingQuery, etag_matches, get_restaurant_listing
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional
+import asyncio
+import json
 import logging
+import os
+import uuid
 
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Let queued turns finish before the stores they write to are closed.
+    chat_executor.shutdown()
+    chat_service.booking_service.bookings.close()
+    chat_service.booking_service.inventory.close()
+    chat_service.session_manager.backend.close()
+
 app = FastAPI(
     title="FoodieSpot AI",
     description="Restaurant reservation and recommendation system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -21,31 +49,314 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-chat_service = ContextSwitchChatService()
+SESSION_DB_PATH = os.environ.get("FOODIESPOT_SESSION_DB")
+BOOKING_DIR = os.environ.get("FOODIESPOT_BOOKING_DIR")
+CHAT_WORKERS = int(os.environ.get("FOODIESPOT_CHAT_WORKERS", "4"))
+CHAT_QUEUE = int(os.environ.get("FOODIESPOT_CHAT_QUEUE", "64"))
+WS_IDLE_TIMEOUT = float(os.environ.get("FOODIESPOT_WS_IDLE_TIMEOUT", "300"))
+WS_REPLY_CACHE_SIZE = 10000
+COMPRESS_MIN_BYTES = int(os.environ.get("FOODIESPOT_COMPRESS_MIN_BYTES", "1024"))
+EXTRACTION_CACHE_SIZE = int(os.environ.get("FOODIESPOT_EXTRACTION_CACHE_SIZE", "4096"))
+
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+
+def build_chat_service() -> ContextSwitchChatService:
+    # With FOODIESPOT_SESSION_DB, sessions, bookings and the seat inventory all
+    # live in that SQLite database, so any number of workers can share them.
+    # Otherwise bookings and seats are per process and only one worker may
+    # run: FOODIESPOT_BOOKING_DIR is locked by its first process.
+    if SESSION_DB_PATH and BOOKING_DIR:
+        raise RuntimeError(
+            "FOODIESPOT_SESSION_DB already stores bookings for all workers; unset FOODIESPOT_BOOKING_DIR"
+        )
+    if SESSION_DB_PATH:
+        return ContextSwitchChatService(
+            SQLiteSessionBackend(SESSION_DB_PATH), SQLiteBookingStore(SESSION_DB_PATH),
+            inventory=SQLiteSeatInventory(SESSION_DB_PATH), cache_size=EXTRACTION_CACHE_SIZE
+        )
+    if BOOKING_DIR:
+        try:
+            store = DurableBookingStore(BOOKING_DIR)
+        except BookingStoreUnavailable as e:
+            raise RuntimeError(
+                f"{e}. Bookings and seat inventory in FOODIESPOT_BOOKING_DIR belong to one process, so run a single "
+                "worker, or set FOODIESPOT_SESSION_DB instead to share them between workers"
+            ) from None
+        return ContextSwitchChatService(InMemorySessionBackend(), store, cache_size=EXTRACTION_CACHE_SIZE)
+    return ContextSwitchChatService(InMemorySessionBackend(), InMemoryBookingStore(), cache_size=EXTRACTION_CACHE_SIZE)
+
+chat_service = build_chat_service()
+
+REGISTRY.gauge(
+    "foodiespot_live_sessions", "Sessions currently held by the session backend.",
+    lambda: chat_service.session_manager.backend.stats().get("live_sessions", 0)
+)
+
+# Message processing is CPU-bound and may wait on an fsync, so it runs on a
+# bounded worker pool; the event loop only parses requests and writes replies.
+chat_executor = BoundedExecutor(CHAT_WORKERS, CHAT_QUEUE)
+# Keeps turns of one session in order and merges duplicate submits.
+session_turns = SessionSerializer()
+
+REGISTRY.gauge("process_resident_memory_bytes", "Resident memory size in bytes.", process_resident_memory_bytes)
+REGISTRY.gauge("foodiespot_chat_in_flight", "Chat messages running or queued on the worker pool.",
+               lambda: chat_executor.in_flight)
+REGISTRY.gauge("foodiespot_chat_coalesced", "Chat messages answered by an identical in-flight turn since start.",
+               lambda: session_turns.coalesced)
+extraction_cache = chat_service.intent_detector.cache
+REGISTRY.callback_counter("foodiespot_extraction_cache_hits_total", "Intent and entity extractions answered from the cache.",
+                          lambda: extraction_cache.hits)
+REGISTRY.callback_counter("foodiespot_extraction_cache_misses_total", "Intent and entity extractions computed.",
+                          lambda: extraction_cache.misses)
+REGISTRY.gauge("foodiespot_extraction_cache_hit_ratio", "Fraction of extraction lookups answered from the cache.",
+               lambda: extraction_cache.hit_rate)
+REGISTRY.gauge("foodiespot_extraction_cache_entries", "Entries held by the extraction cache.",
+               lambda: len(extraction_cache))
+REGISTRY.callback_counter("foodiespot_intent_budget_exhausted_total",
+                          "Messages whose intent matching ran out of time and fell back to the default intent.",
+                          lambda: chat_service.intent_detector.budget_exhausted)
+chat_rejections = REGISTRY.counter(
+    "foodiespot_chat_rejected_total", "Chat messages rejected because the worker pool queue was full."
+)
+
+async def run_chat_turn(request: ChatRequest, on_intent: Optional[Callable[[str], None]] = None) -> dict:
+    # on_intent is called from the worker thread once the intent is known.
+    # A message coalesced into a turn that is already running never calls it.
+    logger.info("Received message: %s...", request.message[:50], extra={"session_id": request.session_id})
+    
+    result = await session_turns.submit(
+        request.session_id, request.message,
+        lambda: chat_executor.run(chat_service.process_message, request.message, request.session_id, on_intent)
+    )
+    
+    logger.info("Sending response with intent: %s", result["intent"], extra={"session_id": request.session_id})
+    return result
+
+def busy_response(error: ExecutorOverloaded, request: ChatRequest) -> JSONResponse:
+    chat_rejections.inc()
+    logger.warning("Rejecting message: %s", error, extra={"session_id": request.session_id})
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "FoodieSpot is busy right now. Please try again in a moment."},
+        headers={"Retry-After": "1"}
+    )
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     try:
-        logger.info(f"Received message: {request.message[:50]}...")
+        result = await run_chat_turn(request)
         
-        result = chat_service.process_message(request.message, request.session_id)
-        
-        response = ChatResponse(
-            response=result["response"],
-            intent=result["intent"],
-            data=result["data"]
-        )
-        
-        logger.info(f"Sending response with intent: {result['intent']}")
-        return response
+        # Already the ChatResponse shape; encoding it directly skips building
+        # and re-validating a model just to serialize it again.
+        return FastJSONResponse({
+            "response": result["response"],
+            "intent": result["intent"],
+            "data": result["data"]
+        })
         
+    except ExecutorOverloaded as e:
+        return busy_response(e, request)
     except Exception as e:
-        logger.error(f"Error processing chat: {str(e)}")
+        logger.exception("Error processing chat: %s", e, extra={"session_id": request.session_id})
         raise HTTPException(
             status_code=500, 
             detail="Sorry, I encountered an error processing your request. Please try again."
         )
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    # Server-Sent Events: a "meta" event with the detected intent as soon as
+    # it is known, while the reply is still being built. Once the turn is
+    # done a second "meta" carries the reply's intent and data payload ahead
+    # of the reply text, which follows as "delta" events, then "done".
+    # Failures before the first "meta" are reported with the same status
+    # codes as /chat; a failure after it ends the stream with an "error" event.
+    loop = asyncio.get_running_loop()
+    intent_known = loop.create_future()
+    
+    def announce(intent: str):
+        if not intent_known.done():
+            intent_known.set_result(intent)
+    
+    turn = asyncio.ensure_future(run_chat_turn(request, lambda intent: loop.call_soon_threadsafe(announce, intent)))
+    await asyncio.wait((intent_known, turn), return_when=asyncio.FIRST_COMPLETED)
+    if turn.done():
+        try:
+            turn.result()
+        except ExecutorOverloaded as e:
+            return busy_response(e, request)
+        except Exception as e:
+            logger.exception("Error processing chat: %s", e, extra={"session_id": request.session_id})
+            raise HTTPException(
+                status_code=500, 
+                detail="Sorry, I encountered an error processing your request. Please try again."
+            )
+    
+    async def events():
+        yield sse_event("meta", {"intent": intent_known.result() if intent_known.done() else turn.result()["intent"]})
+        try:
+            result = await turn
+        except Exception as e:
+            logger.exception("Error processing chat: %s", e, extra={"session_id": request.session_id})
+            yield sse_event("error", {"status": 500, "detail": "Sorry, I encountered an error processing your request. Please try again."})
+            return
+        yield sse_event("meta", {"intent": result["intent"], "data": result["data"]})
+        for chunk in chunk_text(result["response"]):
+            yield sse_event("delta", {"text": chunk})
+        yield sse_event("done", {})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+BATCH_ERROR = "Sorry, I encountered an error processing this message."
+BATCH_BUSY = "FoodieSpot is busy right now. Please try again in a moment."
+
+def process_session_batch(session_id: str, messages: List[str]) -> List[dict]:
+    # Runs on a worker thread, so a session's whole share of a batch costs a
+    # single executor hop. A failing message does not stop the ones after it,
+    # just as separate /chat calls would not.
+    results = []
+    for message in messages:
+        try:
+            results.append(chat_service.process_message(message, session_id))
+        except Exception as e:
+            logger.exception("Error processing batched chat: %s", e, extra={"session_id": session_id})
+            results.append({"error": BATCH_ERROR})
+    return results
+
+@app.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch_endpoint(request: BatchChatRequest):
+    by_session: Dict[str, List[int]] = {}
+    for index, item in enumerate(request.messages):
+        by_session.setdefault(item.session_id, []).append(index)
+    logger.info("Received batch: %d messages across %d sessions", len(request.messages), len(by_session))
+    
+    results: List[BatchChatResult] = [None] * len(request.messages)
+    # A batch never uses more than the pool's workers, so it queues behind
+    # itself rather than filling the executor queue and starving /chat.
+    slots = asyncio.Semaphore(chat_executor.max_workers)
+    
+    async def run_session(session_id: str, indexes: List[int]):
+        messages = [request.messages[index].message for index in indexes]
+        
+        async def turn():
+            async with slots:
+                return await chat_executor.run(process_session_batch, session_id, messages)
+        
+        try:
+            outcomes = await session_turns.in_order(session_id, turn)
+        except ExecutorOverloaded:
+            chat_rejections.inc(len(indexes))
+            outcomes = [{"error": BATCH_BUSY}] * len(indexes)
+        for index, outcome in zip(indexes, outcomes):
+            results[index] = BatchChatResult(session_id=session_id, **outcome)
+    
+    await asyncio.gather(*(run_session(session_id, indexes) for session_id, indexes in by_session.items()))
+    return BatchChatResponse(results=results)
+
+# Last reply sent to each WebSocket session, keyed by session id. A client
+# that loses its connection mid-turn reconnects and re-sends the message with
+# the same id; if that turn already finished, the cached reply is sent again
+# instead of processing the message twice.
+ws_replies: "OrderedDict[str, tuple]" = OrderedDict()
+
+def remember_ws_reply(session_id: str, message_id, reply: dict):
+    ws_replies[session_id] = (message_id, reply)
+    ws_replies.move_to_end(session_id)
+    if len(ws_replies) > WS_REPLY_CACHE_SIZE:
+        ws_replies.popitem(last=False)
+
+async def handle_ws_message(websocket: WebSocket, session_id: str, frame: dict):
+    message_id = frame.get("id")
+    message = frame.get("message")
+    if not isinstance(message, str) or not message.strip():
+        await websocket.send_json({"type": "error", "id": message_id, "status": 422, "detail": "message must be a non-empty string"})
+        return
+    
+    cached = ws_replies.get(session_id)
+    if message_id is not None and cached is not None and cached[0] == message_id:
+        await websocket.send_json(cached[1])
+        return
+    
+    try:
+        result = await run_chat_turn(ChatRequest(message=message, session_id=session_id))
+    except ExecutorOverloaded as e:
+        chat_rejections.inc()
+        logger.warning("Rejecting message: %s", e, extra={"session_id": session_id})
+        await websocket.send_json({"type": "error", "id": message_id, "status": 503,
+                                   "detail": "FoodieSpot is busy right now. Please try again in a moment."})
+        return
+    except Exception as e:
+        logger.exception("Error processing chat: %s", e, extra={"session_id": session_id})
+        await websocket.send_json({"type": "error", "id": message_id, "status": 500,
+                                   "detail": "Sorry, I encountered an error processing your request. Please try again."})
+        return
+    
+    reply = {"type": "reply", "id": message_id, "response": result["response"], "intent": result["intent"], "data": result["data"]}
+    if message_id is not None:
+        remember_ws_reply(session_id, message_id, reply)
+    for chunk in chunk_text(result["response"]):
+        await websocket.send_json({"type": "delta", "id": message_id, "text": chunk})
+    await websocket.send_json(reply)
+
+@app.websocket("/ws")
+async def chat_websocket(websocket: WebSocket, session_id: Optional[str] = None):
+    # One connection serves one session, which stays pinned in the session
+    # manager until the connection closes, so turns skip the backend lookup.
+    # Frames are JSON: {"type": "message", "id": ..., "message": ...} gets the
+    # reply text as "delta" frames, then a "reply" (or "error") with the same
+    # id that also carries the whole text; a reply served from the reply cache
+    # comes without deltas. {"type": "ping"} gets a "pong". Transport-level
+    # pings are handled by uvicorn; a connection that sends nothing for
+    # FOODIESPOT_WS_IDLE_TIMEOUT seconds is closed so its pin is not held
+    # forever. Reconnecting with the same session_id resumes the conversation.
+    await websocket.accept()
+    session_id = session_id or str(uuid.uuid4())
+    
+    try:
+        session = await chat_executor.run(chat_service.session_manager.pin, session_id)
+    except ExecutorOverloaded:
+        chat_rejections.inc()
+        await websocket.close(code=1013, reason="busy")
+        return
+    
+    try:
+        cached = ws_replies.get(session_id)
+        await websocket.send_json({
+            "type": "session",
+            "session_id": session_id,
+            "resumed": bool(session["conversation_history"]),
+            "last_message_id": cached[0] if cached else None
+        })
+        
+        while True:
+            text = await asyncio.wait_for(websocket.receive_text(), WS_IDLE_TIMEOUT)
+            try:
+                frame = json.loads(text)
+            except ValueError:
+                await websocket.send_json({"type": "error", "status": 400, "detail": "frame is not valid JSON"})
+                continue
+            kind = frame.get("type") if isinstance(frame, dict) else None
+            if kind == "message":
+                await handle_ws_message(websocket, session_id, frame)
+            elif kind == "ping":
+                await websocket.send_json({"type": "pong"})
+            elif kind != "pong":
+                await websocket.send_json({"type": "error", "status": 400, "detail": f"unknown frame type: {kind}"})
+                
+    except asyncio.TimeoutError:
+        logger.info("Closing idle WebSocket", extra={"session_id": session_id})
+        await websocket.close(code=1000, reason="idle")
+    except WebSocketDisconnect:
+        logger.info("WebSocket disconnected", extra={"session_id": session_id})
+    finally:
+        # Not routed through the bounded pool: a full queue must never keep
+        # a session pinned after its connection is gone.
+        await asyncio.get_running_loop().run_in_executor(None, chat_service.session_manager.release, session_id)
+
 @app.get("/health")
 async def health_check():
     return {
@@ -55,13 +366,33 @@ async def health_check():
     }
 
 @app.get("/restaurants")
-async def get_restaurants():
-    from data import get_all_restaurants
-    restaurants = get_all_restaurants()
-    return {
-        "restaurants": [r.dict() for r in restaurants],
-        "count": len(restaurants)
-    }
+async def get_restaurants(request: Request, fields: Optional[str] = None, cursor: Optional[str] = None,
+                          limit: Optional[int] = None):
+    # Without parameters this is the whole catalog; fields=name,cuisine,rating
+    # projects, limit pages and cursor continues from a previous next_cursor.
+    listing = get_restaurant_listing()
+    try:
+        query = listing.query(fields, cursor, limit)
+    except InvalidListingQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Large listings are served from precompressed bytes; the compression
+    # middleware leaves responses that already carry Content-Encoding alone.
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding and len(listing.body(query)) < COMPRESS_MIN_BYTES:
+        encoding = None
+    
+    etag = listing.etag(query, encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(listing.body(query, encoding), media_type="application/json", headers=headers)
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
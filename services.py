@@ -1,41 +1,82 @@
-import re
+import logging
+import threading
+import time
 import uuid
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-from enum import Enum
-from models import BookingRequest, Booking
-from data import get_all_restaurants, find_restaurant_by_name, search_restaurants
-
-class BookingState(Enum):
-    INITIAL = "initial"
-    GATHERING_INFO = "gathering_info"
-    MODIFYING = "modifying"
-    CONFIRMING = "confirming"
-    COMPLETED = "completed"
-
-class ConversationContext:
-    def __init__(self):
-        self.booking_state = BookingState.INITIAL
-        self.last_intent = None
-        self.conversation_history = []
-        self.last_modification_type = None
-        self.modification_count = 0
+from collections import deque
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from models import BookingRequest, Booking, BookingState, ConversationContext
+from data import get_all_restaurants, find_restaurant_by_name, find_restaurant_in_text
+from matchers import CompiledIntentMatcher, MatchTimeout
+from recommendations import RecommendationEngine
+from inventory import SeatInventory
+from booking_store import BookingStore, InMemoryBookingStore
+from metrics import ChatMetrics
+from extraction_cache import ExtractionCache, normalize_message
+from entity_extractor import DATE_PATTERN, booking_date, booking_info, booking_party_size, booking_time, extract_spans, modification_info
+from session_store import MAX_HISTORY, MESSAGE_OVERHEAD_BYTES, InMemorySessionBackend, SessionBackend
 
 class SessionManager:
-    def __init__(self):
-        self.sessions = {}
+    log = logging.getLogger(f"{__name__}.SessionManager")
+    MAX_HISTORY = MAX_HISTORY
+    
+    def __init__(self, backend: Optional[SessionBackend] = None):
+        self.backend = backend if backend is not None else InMemorySessionBackend()
+        self._pinned = {}
+        # Turns run on executor threads, so the pin bookkeeping is shared.
+        # _pin_lock only guards the _pinned dict; loading and saving a pinned
+        # session happens under that session's own lock, so backend I/O for
+        # one session never blocks turns of the others.
+        self._pin_lock = threading.Lock()
+    
+    def pin(self, session_id: str) -> dict:
+        with self._pin_lock:
+            pinned = self._pinned.get(session_id)
+            if pinned is None:
+                pinned = self._pinned[session_id] = [None, 0, threading.Lock()]
+            pinned[1] += 1
+        
+        with pinned[2]:
+            if pinned[0] is None:
+                pinned[0] = self._load_session(session_id)
+            return pinned[0]
+    
+    def release(self, session_id: str):
+        with self._pin_lock:
+            pinned = self._pinned.get(session_id)
+        if pinned is None:
+            return
+        
+        # The session is saved before the pin is dropped, so a turn that pins
+        # it again afterwards loads the saved state.
+        with pinned[2]:
+            if pinned[0] is not None:
+                self.backend.put(session_id, pinned[0])
+        with self._pin_lock:
+            pinned[1] -= 1
+            if pinned[1] <= 0 and self._pinned.get(session_id) is pinned:
+                del self._pinned[session_id]
     
     def get_session(self, session_id: str) -> dict:
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                "conversation_history": [],
+        pinned = self._pinned.get(session_id)
+        if pinned is not None and pinned[0] is not None:
+            return pinned[0]
+        return self._load_session(session_id)
+    
+    def _load_session(self, session_id: str) -> dict:
+        session = self.backend.get(session_id)
+        if session is None:
+            session = {
+                "conversation_history": deque(maxlen=self.MAX_HISTORY),
                 "current_booking": BookingRequest(),
                 "context": ConversationContext(),
                 "last_intent": None,
                 "last_successful_booking": None,
-                "booking_history": []
+                "booking_history": [],
+                "modifying_booking_id": None
             }
-        return self.sessions[session_id]
+            self.backend.put(session_id, session)
+        return session
     
     def save_successful_booking(self, session_id: str, booking: BookingRequest):
         session = self.get_session(session_id)
@@ -45,7 +86,7 @@ class SessionManager:
             time=booking.time,
             party_size=booking.party_size
         )
-        print(f"DEBUG: Saved successful booking: {session['last_successful_booking']}")
+        self.log.debug("Saved successful booking: %s", session["last_successful_booking"], extra={"session_id": session_id})
     
     def restore_booking_for_modification(self, session_id: str):
         session = self.get_session(session_id)
@@ -54,7 +95,7 @@ class SessionManager:
             is_mostly_empty = not all([current.restaurant_name, current.date, current.time, current.party_size])
             
             if is_mostly_empty:
-                print(f"DEBUG: Restoring booking data for modification")
+                self.log.debug("Restoring booking data for modification", extra={"session_id": session_id})
                 session["current_booking"] = BookingRequest(
                     restaurant_name=session["last_successful_booking"].restaurant_name,
                     date=session["last_successful_booking"].date,
@@ -62,7 +103,10 @@ class SessionManager:
                     party_size=session["last_successful_booking"].party_size
                 )
                 session["context"].booking_state = BookingState.MODIFYING
-                print(f"DEBUG: Restored booking: {session['current_booking']}")
+                # The confirmed booking is replaced once the modified one is
+                # booked, and its seats are given back.
+                session["modifying_booking_id"] = session["booking_history"][-1] if session["booking_history"] else None
+                self.log.debug("Restored booking: %s", session["current_booking"], extra={"session_id": session_id})
     
     def update_booking_info(self, session_id: str, new_info: dict, is_modification: bool = False):
         session = self.get_session(session_id)
@@ -72,9 +116,10 @@ class SessionManager:
         
         current_booking = session["current_booking"]
         
-        print(f"DEBUG: {'Modifying' if is_modification else 'Updating'} booking info")
-        print(f"DEBUG: Current booking before update: restaurant={current_booking.restaurant_name}, date={current_booking.date}, time={current_booking.time}, party_size={current_booking.party_size}")
-        print(f"DEBUG: New info to merge: {new_info}")
+        self.log.debug(
+            "%s booking info: before=%s new=%s", "Modifying" if is_modification else "Updating",
+            current_booking, new_info, extra={"session_id": session_id}
+        )
         
         changes_made = []
         
@@ -86,12 +131,12 @@ class SessionManager:
                 if old_value != value:
                     if is_modification and old_value is not None:
                         changes_made.append(f"{key}: {old_value} → {value}")
-                        print(f"DEBUG: Modified {key}: {old_value} → {value}")
+                        self.log.debug("Modified %s: %s → %s", key, old_value, value, extra={"session_id": session_id})
                     else:
                         changes_made.append(f"Added {key}: {value}")
-                        print(f"DEBUG: Added {key}: {value}")
+                        self.log.debug("Added %s: %s", key, value, extra={"session_id": session_id})
         
-        print(f"DEBUG: Booking after update: restaurant={current_booking.restaurant_name}, date={current_booking.date}, time={current_booking.time}, party_size={current_booking.party_size}")
+        self.log.debug("Booking after update: %s", current_booking, extra={"session_id": session_id})
         
         return changes_made
     
@@ -129,28 +174,46 @@ class SessionManager:
     
     def clear_booking(self, session_id: str):
         session = self.get_session(session_id)
-        print(f"DEBUG: Clearing booking - saving current booking first")
+        self.log.debug("Clearing booking - saving current booking first", extra={"session_id": session_id})
         self.save_successful_booking(session_id, session["current_booking"])
         session["current_booking"] = BookingRequest()
         session["context"].booking_state = BookingState.COMPLETED
+        session["modifying_booking_id"] = None
     
     def start_new_booking(self, session_id: str):
         session = self.get_session(session_id)
         session["current_booking"] = BookingRequest()
         session["context"].booking_state = BookingState.INITIAL
         session["last_successful_booking"] = None
-        print(f"DEBUG: Started fresh booking session")
+        session["modifying_booking_id"] = None
+        self.log.debug("Started fresh booking session", extra={"session_id": session_id})
     
     def add_message(self, session_id: str, role: str, message: str):
         session = self.get_session(session_id)
-        session["conversation_history"].append({
+        history = session["conversation_history"]
+        
+        freed = 0
+        if len(history) == history.maxlen:
+            freed = len(history[0]["message"]) + MESSAGE_OVERHEAD_BYTES
+        
+        history.append({
             "role": role,
             "message": message,
-            "timestamp": datetime.now()
+            "timestamp": time.time()
         })
+        self.backend.resize(session_id, len(message) + MESSAGE_OVERHEAD_BYTES - freed)
 
 class AdvancedIntentDetector:
-    def __init__(self):
+    log = logging.getLogger(f"{__name__}.AdvancedIntentDetector")
+    # Only the head of a message is read, so a pasted essay costs no more than
+    # a long sentence; intent matching also gives up after TIME_BUDGET_SECONDS
+    # of its own thread's CPU time.
+    MAX_MESSAGE_CHARS = 2000
+    TIME_BUDGET_SECONDS = 0.05
+    
+    def __init__(self, cache_size: int = 4096):
+        self.cache = ExtractionCache(cache_size)
+        self.budget_exhausted = 0
         self.patterns = {
             "book_reservation": [
                 r"book.*table|make.*reservation|reserve.*table",
@@ -192,235 +255,130 @@ class AdvancedIntentDetector:
             r"update.*to", r"modify.*to", r"let.*make.*it", r"and\s+change"
         ]
         
-        self.restaurant_names = [r.name.lower() for r in get_all_restaurants()]
+        self.contextual_patterns = [
+            r"yes|yeah|yep|confirm|correct|ok|okay",
+            r"\d+\s*(?:people|person|guest|pax)",
+            r"\d+\s*(?:am|pm|:|AM|PM)",
+            r"today|tomorrow|tonight|\d+/\d+|" + DATE_PATTERN
+        ]
+        
+        self._build_matchers()
     
-    def detect_intent_with_context(self, message: str, context: ConversationContext, session_booking: BookingRequest) -> str:
-        message_lower = message.lower().strip()
-        print(f"DEBUG: Analyzing message: '{message_lower}' with context state: {context.booking_state}")
+    def _build_matchers(self):
+        modification_rules = [("modify_booking", pattern) for pattern in self.modification_indicators]
         
-        is_modification = self._is_modification_request(message_lower)
+        self.intent_matcher = CompiledIntentMatcher(
+            modification_rules
+            + [(intent, pattern) for intent, patterns in self.patterns.items() for pattern in patterns],
+            default="general_inquiry"
+        )
+        self.info_matcher = CompiledIntentMatcher([("provide_info", r"\d")], default="general_inquiry")
         
-        if is_modification:
-            print(f"DEBUG: Detected modification request")
-            return "modify_booking"
-        
-        if context.booking_state in [BookingState.GATHERING_INFO, BookingState.MODIFYING]:
-            return self._detect_contextual_intent(message_lower, context, session_booking)
-        
-        for intent, patterns in self.patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    print(f"DEBUG: Found pattern '{pattern}' for intent '{intent}'")
-                    return intent
-        
-        if any(name in message_lower for name in self.restaurant_names):
-            return "provide_info"
-        
-        if re.search(r'\d', message_lower):
-            return "provide_info"
-        
-        print(f"DEBUG: No pattern matched, returning general_inquiry")
-        return "general_inquiry"
-    
-    def _is_modification_request(self, message: str) -> bool:
-        for pattern in self.modification_indicators:
-            if re.search(pattern, message):
-                print(f"DEBUG: Found modification indicator: {pattern}")
-                return True
-        return False
-    
-    def _detect_contextual_intent(self, message: str, context: ConversationContext, booking: BookingRequest) -> str:
-        if re.search(r'yes|yeah|yep|confirm|correct|ok|okay', message):
-            return "confirm_booking"
-        elif any(name in message for name in self.restaurant_names):
-            return "provide_info"
-        elif re.search(r'\d+\s*(?:people|person|guest|pax)', message):
-            return "provide_info"
-        elif re.search(r'\d+\s*(?:am|pm|:|AM|PM)', message):
-            return "provide_info"
-        elif re.search(r'today|tomorrow|tonight|\d+/\d+', message):
-            return "provide_info"
+        confirm_pattern, *info_patterns = self.contextual_patterns
+        self.contextual_matcher = CompiledIntentMatcher(
+            modification_rules + [("confirm_booking", confirm_pattern)],
+            default="continue_booking"
+        )
+        self.contextual_info_matcher = CompiledIntentMatcher(
+            [("provide_info", pattern) for pattern in info_patterns],
+            default="continue_booking"
+        )
+    
+    def classify(self, message_lower: str, contextual: bool, deadline: Optional[float] = None) -> Tuple[str, Optional[str]]:
+        if contextual:
+            head, tail = self.contextual_matcher, self.contextual_info_matcher
+        else:
+            head, tail = self.intent_matcher, self.info_matcher
+        
+        rule = head.match(message_lower, deadline)
+        if rule is None and find_restaurant_in_text(message_lower):
+            rule = ("provide_info", "restaurant name")
+        if rule is None:
+            rule = tail.match(message_lower, deadline)
+        if rule is None:
+            return head.default, None
+        return rule
+    
+    def detect_intent_with_context(self, message: str, context: ConversationContext, session_booking: BookingRequest) -> str:
+        message_lower = self.normalize(message)
+        self.log.debug("Analyzing message: %r with context state: %s", message_lower, context.booking_state)
+        
+        contextual = context.booking_state in [BookingState.GATHERING_INFO, BookingState.MODIFYING]
+        deadline = time.thread_time() + self.TIME_BUDGET_SECONDS
+        try:
+            intent, pattern = self.cache.get(("intent", message_lower, contextual),
+                                             lambda: self.classify(message_lower, contextual, deadline))
+        except MatchTimeout:
+            self.budget_exhausted += 1
+            intent, pattern = (self.contextual_matcher if contextual else self.intent_matcher).default, None
+            self.log.warning("Intent detection ran out of time on a %d character message, using %s",
+                             len(message_lower), intent)
+        
+        if pattern is None:
+            self.log.debug("No pattern matched, returning %s", intent)
         else:
-            return "continue_booking"
+            self.log.debug("Found pattern %r for intent %r", pattern, intent)
+        return intent
     
+    def normalize(self, message: str) -> str:
+        if len(message) > self.MAX_MESSAGE_CHARS:
+            self.log.debug("Reading the first %d of %d characters", self.MAX_MESSAGE_CHARS, len(message))
+            message = message[:self.MAX_MESSAGE_CHARS]
+        return normalize_message(message)
+    
+    # Extraction only looks at the normalized text and the catalog, so results
+    # are memoized; callers get a copy they are free to modify.
     def extract_comprehensive_info(self, message: str) -> dict:
-        info = {}
-        message_lower = message.lower()
-        print(f"DEBUG: Extracting comprehensive info from: '{message}'")
-        
-        restaurant_names = [r.name for r in get_all_restaurants()]
-        for restaurant in restaurant_names:
-            if restaurant.lower() in message_lower:
-                info["restaurant_name"] = restaurant
-                print(f"DEBUG: Found restaurant: {restaurant}")
-                break
-        
-        time_info = self._extract_robust_time(message)
-        if time_info:
-            info["time"] = time_info
-            print(f"DEBUG: Found time: {time_info}")
-        
-        party_size = self._extract_party_size_fixed(message_lower)
-        if party_size:
-            info["party_size"] = party_size
-            print(f"DEBUG: Found party size: {party_size}")
-        
-        date_info = self._extract_date(message_lower)
-        if date_info:
-            info["date"] = date_info
-            print(f"DEBUG: Found date: {date_info}")
-        
-        print(f"DEBUG: Extracted comprehensive info: {info}")
-        return info
+        normalized = self.normalize(message)
+        return dict(self.cache.get(("info", normalized), lambda: self._extract_comprehensive_info(normalized)))
     
     def extract_modification_info(self, message: str) -> dict:
-        info = {}
-        message_lower = message.lower()
-        print(f"DEBUG: Extracting modification info from: '{message}'")
-        
-        modification_patterns = {
-            "party_size": [
-                r"make.*it.*(\d+).*people",
-                r"change.*to.*(\d+).*people",
-                r"actually.*(\d+).*people",
-                r"instead.*(\d+).*people",
-                r"(\d+).*people.*instead",
-                r"(\d+)\s*people"
-            ],
-            "time": [
-                r"make.*it.*at.*(\d{1,2})\s*(am|pm|AM|PM)",
-                r"change.*to.*(\d{1,2})\s*(am|pm|AM|PM)",
-                r"actually.*(\d{1,2})\s*(am|pm|AM|PM)",
-                r"instead.*(\d{1,2})\s*(am|pm|AM|PM)",
-                r"(\d{1,2})\s*(am|pm|AM|PM).*instead",
-                r"change.*time.*to.*(\d{1,2})\s*(am|pm|AM|PM)",
-                r"(\d{1,2}):(\d{2})",
-                r"(\d{1,2})\s*(am|pm|AM|PM)"
-            ],
-            "restaurant_name": [
-                r"make.*it.*(The\s+[\w\s]+|[\w\s]+\s+Bistro|[\w\s]+\s+Garden|Ocean\s+View|[\w\s]+\s+Spoon)",
-                r"change.*to.*(The\s+[\w\s]+|[\w\s]+\s+Bistro|[\w\s]+\s+Garden|Ocean\s+View|[\w\s]+\s+Spoon)",
-                r"actually.*(The\s+[\w\s]+|[\w\s]+\s+Bistro|[\w\s]+\s+Garden|Ocean\s+View|[\w\s]+\s+Spoon)",
-                r"instead.*(The\s+[\w\s]+|[\w\s]+\s+Bistro|[\w\s]+\s+Garden|Ocean\s+View|[\w\s]+\s+Spoon)"
-            ]
-        }
-        
-        for field, patterns in modification_patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, message_lower)
-                if match:
-                    if field == "party_size":
-                        info[field] = int(match.group(1))
-                        print(f"DEBUG: Found modification for {field}: {info[field]}")
-                        break
-                    elif field == "time":
-                        if len(match.groups()) >= 2 and match.group(2):
-                            hour = int(match.group(1))
-                            period = match.group(2).lower()
-                            if period == "pm" and hour != 12:
-                                hour += 12
-                            elif period == "am" and hour == 12:
-                                hour = 0
-                            info[field] = f"{hour:02d}:00"
-                        elif len(match.groups()) >= 2:
-                            info[field] = f"{int(match.group(1)):02d}:{int(match.group(2)):02d}"
-                        else:
-                            hour = int(match.group(1))
-                            info[field] = f"{hour:02d}:00"
-                        print(f"DEBUG: Found modification for {field}: {info[field]}")
-                        break
-                    elif field == "restaurant_name":
-                        potential_name = match.group(1).strip()
-                        restaurant_names = [r.name for r in get_all_restaurants()]
-                        for restaurant in restaurant_names:
-                            if restaurant.lower() in potential_name.lower() or potential_name.lower() in restaurant.lower():
-                                info[field] = restaurant
-                                print(f"DEBUG: Found modification for {field}: {restaurant}")
-                                break
-                        if field in info:
-                            break
-        
-        if not info:
-            print(f"DEBUG: No specific modification patterns found, using general extraction")
-            info = self.extract_comprehensive_info(message)
-        
+        normalized = self.normalize(message)
+        return dict(self.cache.get(("modification", normalized), lambda: self._extract_modification_info(normalized)))
+    
+    def _extract_comprehensive_info(self, message: str) -> dict:
+        self.log.debug("Extracting comprehensive info from: %r", message)
+        info = booking_info(extract_spans(message))
+        self.log.debug("Extracted comprehensive info: %s", info)
+        return info
+    
+    def _extract_modification_info(self, message: str) -> dict:
+        self.log.debug("Extracting modification info from: %r", message)
+        info = modification_info(extract_spans(message))
+        self.log.debug("Extracted modification info: %s", info)
         return info
     
     def _extract_robust_time(self, message: str) -> Optional[str]:
-        print(f"DEBUG: Extracting time from: '{message}'")
-        patterns = [
-            r'(\d{1,2})\s*(?::(\d{2}))?\s*(am|pm|AM|PM)(?!\s*people)',
-            r'(\d{1,2}):(\d{2})(?!\s*people)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, message)
-            if match:
-                hour = int(match.group(1))
-                minute = int(match.group(2)) if match.lastindex >= 2 and match.group(2) else 0
-                period = match.group(match.lastindex) if match.lastindex >= 3 else None
-                
-                print(f"DEBUG: Time extraction - hour: {hour}, minute: {minute}, period: {period}")
-                
-                if period:
-                    period = period.lower()
-                    if period == "pm" and hour != 12:
-                        hour += 12
-                    elif period == "am" and hour == 12:
-                        hour = 0
-                
-                result = f"{hour:02d}:{minute:02d}"
-                print(f"DEBUG: Extracted time result: {result}")
-                return result
-        
-        print(f"DEBUG: No time found")
-        return None
+        return booking_time(extract_spans(message))
     
     def _extract_party_size_fixed(self, message: str) -> Optional[int]:
-        print(f"DEBUG: Extracting party size from: '{message}'")
-        
-        patterns = [
-            r'(?:table\s+for|book.*for|reservation.*for)\s+(\d+)\s+(?:people|person|guest|pax)',
-            r'(?:table\s+for|book.*for|reservation.*for)\s+(\d+)(?!\s*(?:am|pm|:\d+))',
-            r'(\d+)\s+(?:people|person|guest|pax)(?!\s*(?:am|pm|:\d+))',
-            r'party.*of.*(\d+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, message)
-            if match:
-                party_size = int(match.group(1))
-                if 1 <= party_size <= 20:
-                    print(f"DEBUG: Found party size with pattern '{pattern}': {party_size}")
-                    return party_size
-        
-        print(f"DEBUG: No party size found")
-        return None
+        return booking_party_size(extract_spans(message))
     
     def _extract_date(self, message: str) -> Optional[str]:
-        date_keywords = {
-            "today": "today",
-            "tomorrow": "tomorrow", 
-            "tonight": "today",
-            "this evening": "today"
-        }
-        
-        for keyword, date_val in date_keywords.items():
-            if keyword in message:
-                return date_val
-        
-        return None
+        return booking_date(extract_spans(message))
 
 class EnhancedBookingService:
-    def __init__(self):
-        self.bookings = {}
+    log = logging.getLogger(f"{__name__}.EnhancedBookingService")
+    
+    def __init__(self, store: Optional[BookingStore] = None, inventory: Optional[SeatInventory] = None):
+        self.bookings = store if store is not None else InMemoryBookingStore()
+        if inventory is not None:
+            # A shared inventory keeps its own ledger alongside the store.
+            self.inventory = inventory
+            return
+        self.inventory = SeatInventory()
+        
+        for booking in self.bookings.values():
+            restaurant = find_restaurant_by_name(booking.restaurant_name)
+            if restaurant and booking.status == "confirmed":
+                self.inventory.reserve(restaurant, booking.date, booking.time, booking.party_size)
     
-    def create_booking(self, booking_request: BookingRequest) -> Tuple[bool, str, Optional[str]]:
-        print(f"DEBUG: Attempting to create booking with: {booking_request}")
+    def create_booking(self, booking_request: BookingRequest, replaces: Optional[str] = None) -> Tuple[bool, str, Optional[str]]:
+        self.log.debug("Attempting to create booking with: %s", booking_request)
         
         if not self._is_booking_complete(booking_request):
             missing = self._get_missing_fields(booking_request)
-            print(f"DEBUG: Missing fields: {missing}")
+            self.log.debug("Missing fields: %s", missing)
             return False, f"I still need: {', '.join(missing)}", None
         
         restaurant = find_restaurant_by_name(booking_request.restaurant_name)
@@ -429,13 +387,24 @@ class EnhancedBookingService:
             suggestion = f"Restaurant '{booking_request.restaurant_name}' not found. Available restaurants include: {', '.join(available_restaurants)}"
             return False, suggestion, None
         
-        if booking_request.time not in restaurant.available_times:
+        if not restaurant.has_slot(booking_request.time):
             available_times = ", ".join(restaurant.available_times)
-            return False, f"Sorry, {restaurant.name} doesn't have a table available at {booking_request.time}. Available times: {available_times}", None
+            nearest = restaurant.nearest_slot(booking_request.time)
+            closest = f" The closest is {nearest}." if nearest else ""
+            return False, f"Sorry, {restaurant.name} doesn't have a table available at {booking_request.time}.{closest} Available times: {available_times}", None
         
         if booking_request.party_size > restaurant.capacity:
             return False, f"Sorry, {restaurant.name} can accommodate up to {restaurant.capacity} people. Your party size of {booking_request.party_size} is too large.", None
         
+        seats = (restaurant, booking_request.date, booking_request.time, booking_request.party_size)
+        replaced, previous = self._confirmed_booking(replaces)
+        reserved = self.inventory.exchange(previous, *seats) if previous else self.inventory.reserve(*seats)
+        if not reserved:
+            remaining = self.inventory.remaining(restaurant, booking_request.date, booking_request.time)
+            if previous and previous[:3] == seats[:3]:
+                remaining += previous[3]
+            return False, f"Sorry, {restaurant.name} only has {remaining} seats left at {booking_request.time} on {booking_request.date}. Could you try a different time or a smaller party?", None
+        
         booking_id = str(uuid.uuid4())[:8].upper()
         booking = Booking(
             id=booking_id,
@@ -447,9 +416,24 @@ class EnhancedBookingService:
             created_at=datetime.now()
         )
         
-        self.bookings[booking_id] = booking
-        
-        success_message = f"""🎉 Booking Confirmed! 🎉
+        try:
+            self.bookings.add(booking)
+        except OSError:
+            if previous:
+                self.inventory.exchange(seats, *previous)
+            else:
+                self.inventory.release(*seats)
+            raise
+        
+        if replaced is not None:
+            try:
+                self.bookings.add(replaced.model_copy(update={"status": "modified"}))
+            except OSError:
+                # The new booking is stored and the seats are already moved;
+                # after a restart the old booking would only hold seats twice.
+                self.log.exception("Could not mark booking %s as modified", replaced.id, extra={"booking_id": replaced.id})
+        
+        success_message = f"""🎉 Booking {"Updated" if replaced is not None else "Confirmed"}! 🎉
 
 Restaurant: {restaurant.name}
 Date: {booking_request.date}
@@ -459,14 +443,25 @@ Booking ID: {booking_id}
 
 Location: {restaurant.location}
 Your table is reserved! If you need to make changes, just let me know."""
+        if replaced is not None:
+            success_message += f"\nYour previous booking {replaced.id} has been cancelled."
         
-        print(f"DEBUG: Booking created successfully: {booking_id}")
+        self.log.info("Booking created successfully: %s", booking_id, extra={"booking_id": booking_id, "restaurant": restaurant.name})
         return True, success_message, booking_id
     
+    def _confirmed_booking(self, booking_id: Optional[str]) -> Tuple[Optional[Booking], Optional[tuple]]:
+        booking = self.bookings.get(booking_id) if booking_id else None
+        if booking is None or booking.status != "confirmed":
+            return None, None
+        restaurant = find_restaurant_by_name(booking.restaurant_name)
+        if restaurant is None:
+            return booking, None
+        return booking, (restaurant, booking.date, booking.time, booking.party_size)
+    
     def _is_booking_complete(self, booking: BookingRequest) -> bool:
         required_fields = [booking.restaurant_name, booking.date, booking.time, booking.party_size]
         complete = all(field is not None for field in required_fields)
-        print(f"DEBUG: Booking complete check: {complete} (restaurant: {booking.restaurant_name}, date: {booking.date}, time: {booking.time}, party_size: {booking.party_size})")
+        self.log.debug("Booking complete check: %s (%s)", complete, booking)
         return complete
     
     def _get_missing_fields(self, booking: BookingRequest) -> List[str]:
@@ -482,13 +477,38 @@ Your table is reserved! If you need to make changes, just let me know."""
         return missing
 
 class ContextSwitchChatService:
-    def __init__(self):
-        self.session_manager = SessionManager()
-        self.intent_detector = AdvancedIntentDetector()
-        self.booking_service = EnhancedBookingService()
+    log = logging.getLogger(f"{__name__}.ContextSwitchChatService")
     
-    def process_message(self, message: str, session_id: str) -> dict:
-        print(f"\nDEBUG: Processing message: '{message}' for session: {session_id}")
+    def __init__(self, session_backend: Optional[SessionBackend] = None, booking_store: Optional[BookingStore] = None,
+                 metrics: Optional[ChatMetrics] = None, inventory: Optional[SeatInventory] = None,
+                 cache_size: int = 4096):
+        self.session_manager = SessionManager(session_backend)
+        self.intent_detector = AdvancedIntentDetector(cache_size)
+        self.booking_service = EnhancedBookingService(booking_store, inventory)
+        self.recommendation_engine = RecommendationEngine()
+        self.metrics = metrics if metrics is not None else ChatMetrics()
+    
+    def process_message(self, message: str, session_id: str, on_intent: Optional[Callable[[str], None]] = None) -> dict:
+        started = self.metrics.begin_turn()
+        try:
+            with self.metrics.stage("session_lookup"):
+                self.session_manager.pin(session_id)
+            try:
+                intent, result = self._process_message(message, session_id, on_intent)
+            finally:
+                with self.metrics.stage("session_save"):
+                    self.session_manager.release(session_id)
+        except Exception:
+            self.metrics.errors.inc()
+            raise
+        
+        self.metrics.requests.labels(intent).inc()
+        self.metrics.request_seconds.observe(time.perf_counter() - started)
+        return result
+    
+    def _process_message(self, message: str, session_id: str,
+                         on_intent: Optional[Callable[[str], None]] = None) -> Tuple[str, dict]:
+        self.log.debug("Processing message: %r", message, extra={"session_id": session_id})
         
         session = self.session_manager.get_session(session_id)
         context = session["context"]
@@ -496,14 +516,30 @@ class ContextSwitchChatService:
         
         self.session_manager.add_message(session_id, "user", message)
         
-        intent = self.intent_detector.detect_intent_with_context(message, context, current_booking)
+        with self.metrics.stage("intent_detection"):
+            intent = self.intent_detector.detect_intent_with_context(message, context, current_booking)
         
-        print(f"DEBUG: Detected intent: {intent}")
-        print(f"DEBUG: Current booking context: {self.session_manager.get_booking_context(session_id)}")
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                "Detected intent: %s, current booking context: %s", intent,
+                self.session_manager.get_booking_context(session_id), extra={"session_id": session_id, "intent": intent}
+            )
         
         context.last_intent = intent
         session["last_intent"] = intent
-        
+        if on_intent is not None:
+            on_intent(intent)
+        
+        # Whatever the handler spends outside the timed extraction and
+        # validation stages is building the reply.
+        handler_started = time.perf_counter()
+        stages_before = self.metrics.stage_time_this_turn()
+        result = self._dispatch(intent, message, session_id, context)
+        rendering = time.perf_counter() - handler_started - (self.metrics.stage_time_this_turn() - stages_before)
+        self.metrics.stages["response_rendering"].observe(rendering)
+        return intent, result
+    
+    def _dispatch(self, intent: str, message: str, session_id: str, context: ConversationContext) -> dict:
         if intent == "book_reservation":
             context.booking_state = BookingState.GATHERING_INFO
             return self._handle_booking_request(message, session_id)
@@ -524,15 +560,18 @@ class ContextSwitchChatService:
             return self._handle_general(message, session_id)
     
     def _handle_booking_request(self, message: str, session_id: str) -> dict:
-        extracted_info = self.intent_detector.extract_comprehensive_info(message)
+        self.session_manager.get_session(session_id)["modifying_booking_id"] = None
+        with self.metrics.stage("entity_extraction"):
+            extracted_info = self.intent_detector.extract_comprehensive_info(message)
         self.session_manager.update_booking_info(session_id, extracted_info, is_modification=False)
         
         return self._attempt_booking_or_continue(session_id)
     
     def _handle_booking_modification(self, message: str, session_id: str) -> dict:
-        print(f"DEBUG: Handling booking modification")
+        self.log.debug("Handling booking modification", extra={"session_id": session_id})
         
-        modification_info = self.intent_detector.extract_modification_info(message)
+        with self.metrics.stage("entity_extraction"):
+            modification_info = self.intent_detector.extract_modification_info(message)
         changes = self.session_manager.update_booking_info(session_id, modification_info, is_modification=True)
         
         if changes:
@@ -548,7 +587,8 @@ class ContextSwitchChatService:
             }
     
     def _handle_booking_info_provision(self, message: str, session_id: str) -> dict:
-        extracted_info = self.intent_detector.extract_comprehensive_info(message)
+        with self.metrics.stage("entity_extraction"):
+            extracted_info = self.intent_detector.extract_comprehensive_info(message)
         self.session_manager.update_booking_info(session_id, extracted_info, is_modification=False)
         
         return self._attempt_booking_or_continue(session_id)
@@ -557,15 +597,22 @@ class ContextSwitchChatService:
         session = self.session_manager.get_session(session_id)
         current_booking = session["current_booking"]
         
-        success, response_message, booking_id = self.booking_service.create_booking(current_booking)
+        replaces = session.get("modifying_booking_id")
+        with self.metrics.stage("booking_validation"):
+            success, response_message, booking_id = self.booking_service.create_booking(current_booking, replaces)
         
         if success:
             session["context"].booking_state = BookingState.COMPLETED
             self.session_manager.clear_booking(session_id)
+            data = {"booking_id": booking_id}
+            if replaces in session["booking_history"]:
+                session["booking_history"].remove(replaces)
+                data["replaced_booking_id"] = replaces
+            session["booking_history"].append(booking_id)
             return {
                 "response": response_message,
                 "intent": "book_reservation",
-                "data": {"booking_id": booking_id}
+                "data": data
             }
         else:
             missing_fields = self.session_manager.get_missing_fields(session_id)
@@ -576,7 +623,8 @@ class ContextSwitchChatService:
                     follow_up = self._generate_follow_up(missing_fields)
                     full_response = f"{custom_message}\n\n{follow_up}"
                 else:
-                    full_response = custom_message
+                    # Everything is filled in, so the booking itself failed.
+                    full_response = response_message
             else:
                 if current_context != "No booking details yet":
                     if missing_fields:
@@ -598,13 +646,55 @@ class ContextSwitchChatService:
         return self._attempt_booking_or_continue(session_id)
     
     def _handle_recommendations(self, message: str, session_id: str) -> dict:
-        response = "I can help you find great restaurants! What type of cuisine are you looking for?"
+        with self.metrics.stage("entity_extraction"):
+            constraints = self.recommendation_engine.extract_constraints(message)
+        applied, recommendations = self.recommendation_engine.recommend_with_constraints(constraints)
+        
+        if not recommendations:
+            return {
+                "response": "I can help you find great restaurants! What type of cuisine are you looking for?",
+                "intent": "get_recommendations",
+                "data": None
+            }
+        
+        if (applied.cuisine, applied.location) == (constraints.cuisine, constraints.location):
+            heading = f"Here are my top picks for {self._describe_places(applied, 'restaurants')}:"
+        elif applied.cuisine:
+            heading = (f"No {self._describe_places(constraints, 'places')}; "
+                       f"here are {applied.cuisine.title()} picks elsewhere:")
+        else:
+            heading = f"No {self._describe_places(constraints, 'places')}; here are my top picks overall:"
+        
+        lines = [heading, ""]
+        for position, (score, restaurant) in enumerate(recommendations, 1):
+            lines.append(f"{position}. **{restaurant.name}** ({restaurant.cuisine}, {restaurant.location}, {restaurant.price_range}) - ⭐ {restaurant.rating}")
+            lines.append(f"   {', '.join(restaurant.features)}")
+        lines.append("")
+        if constraints.is_empty():
+            lines.append("Tell me a cuisine, area or budget and I'll narrow it down, or I can book one of these for you!")
+        else:
+            lines.append("Would you like me to book a table at one of these?")
+        
         return {
-            "response": response,
+            "response": "\n".join(lines),
             "intent": "get_recommendations",
-            "data": None
+            "data": {
+                "filters": applied.to_dict(),
+                "restaurants": [
+                    {"name": restaurant.name, "score": round(score, 3)}
+                    for score, restaurant in recommendations
+                ]
+            }
         }
     
+    def _describe_places(self, constraints, noun: str) -> str:
+        description = noun
+        if constraints.cuisine:
+            description = f"{constraints.cuisine.title()} {description}"
+        if constraints.location:
+            description = f"{description} in {constraints.location.title()}"
+        return description
+    
     def _handle_general(self, message: str, session_id: str) -> dict:
         response = """Hello! I'm your FoodieSpot AI assistant. I can help you with:
 
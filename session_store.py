@@ -0,0 +1,325 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Optional
+
+from models import BookingRequest, BookingState, ConversationContext
+
+SESSION_BASE_BYTES = 2048
+MAX_HISTORY = 50
+MESSAGE_OVERHEAD_BYTES = 200
+
+
+class SessionStore:
+    # Sessions are kept in an OrderedDict in least-recently-used order. Idle
+    # sessions therefore always sit at the front, so both LRU/memory eviction
+    # and TTL sweeps pop from the front and cost amortized O(1) per session.
+    def __init__(self, ttl_seconds: float = 1800, max_sessions: int = 10000,
+                 max_bytes: int = 64 * 1024 * 1024, sweep_interval: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = clock()
+        self._lock = threading.RLock()
+
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            now = self.clock()
+            self._maybe_sweep(now)
+
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if now - entry[1] > self.ttl_seconds:
+                self._drop(session_id)
+                self.expirations += 1
+                return None
+
+            entry[1] = now
+            self._entries.move_to_end(session_id)
+            return entry[0]
+
+    def put(self, session_id: str, session: dict):
+        with self._lock:
+            now = self.clock()
+            self._maybe_sweep(now)
+
+            if session_id in self._entries:
+                self._drop(session_id)
+            self._entries[session_id] = [session, now, SESSION_BASE_BYTES]
+            self._bytes += SESSION_BASE_BYTES
+            self._enforce_limits(keep=session_id)
+
+    def resize(self, session_id: str, delta: int):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return
+            entry[2] += delta
+            self._bytes += delta
+            self._enforce_limits(keep=session_id)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            if session_id in self._entries:
+                self._drop(session_id)
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep(self.clock())
+
+    def stats(self) -> dict:
+        return {
+            "live_sessions": len(self._entries),
+            "estimated_bytes": self._bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def _drop(self, session_id: str):
+        entry = self._entries.pop(session_id)
+        self._bytes -= entry[2]
+
+    def _maybe_sweep(self, now: float):
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> int:
+        self._last_sweep = now
+        expired = 0
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if now - entry[1] <= self.ttl_seconds:
+                break
+            self._drop(session_id)
+            expired += 1
+        self.expirations += expired
+        return expired
+
+    def _enforce_limits(self, keep: str):
+        while len(self._entries) > 1 and (len(self._entries) > self.max_sessions or self._bytes > self.max_bytes):
+            session_id = next(iter(self._entries))
+            if session_id == keep:
+                self._entries.move_to_end(session_id)
+                continue
+            self._drop(session_id)
+            self.evictions += 1
+
+
+HISTORY_ROLES = ("user", "assistant")
+
+
+def _encode_booking(booking: Optional[BookingRequest]) -> Optional[list]:
+    if booking is None:
+        return None
+    return [booking.restaurant_name, booking.date, booking.time, booking.party_size]
+
+
+def _decode_booking(values: Optional[list]) -> Optional[BookingRequest]:
+    if values is None:
+        return None
+    restaurant_name, date, time_, party_size = values
+    return BookingRequest(restaurant_name=restaurant_name, date=date, time=time_, party_size=party_size)
+
+
+def encode_session(session: dict) -> bytes:
+    context = session["context"]
+    payload = [
+        [[HISTORY_ROLES.index(entry["role"]) if entry["role"] in HISTORY_ROLES else entry["role"],
+          entry["message"], round(entry["timestamp"], 3)]
+         for entry in session["conversation_history"]],
+        _encode_booking(session["current_booking"]),
+        [context.booking_state.value, context.last_intent, context.last_modification_type, context.modification_count],
+        session["last_intent"],
+        _encode_booking(session["last_successful_booking"]),
+        session["booking_history"],
+        session.get("modifying_booking_id")
+    ]
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def decode_session(data: bytes, max_history: Optional[int] = None) -> dict:
+    # Sessions written before modifying_booking_id existed have six fields.
+    history, current_booking, context_values, last_intent, last_successful_booking, booking_history, *rest = json.loads(data)
+
+    context = ConversationContext()
+    context.booking_state = BookingState(context_values[0])
+    context.last_intent, context.last_modification_type, context.modification_count = context_values[1:]
+
+    return {
+        "conversation_history": deque(
+            ({"role": HISTORY_ROLES[role] if isinstance(role, int) else role, "message": message, "timestamp": timestamp}
+             for role, message, timestamp in history),
+            maxlen=max_history
+        ),
+        "current_booking": _decode_booking(current_booking),
+        "context": context,
+        "last_intent": last_intent,
+        "last_successful_booking": _decode_booking(last_successful_booking),
+        "booking_history": booking_history,
+        "modifying_booking_id": rest[0] if rest else None
+    }
+
+
+class SessionBackend:
+    shared = False
+
+    def get(self, session_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def put(self, session_id: str, session: dict):
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def resize(self, session_id: str, delta: int):
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+    def close(self):
+        pass
+
+
+class InMemorySessionBackend(SessionBackend):
+    def __init__(self, store: Optional[SessionStore] = None):
+        self.store = store if store is not None else SessionStore()
+
+    def get(self, session_id: str) -> Optional[dict]:
+        return self.store.get(session_id)
+
+    def put(self, session_id: str, session: dict):
+        # Sessions are mutated in place, so only a new object needs storing.
+        if self.store.get(session_id) is not session:
+            self.store.put(session_id, session)
+
+    def delete(self, session_id: str):
+        self.store.delete(session_id)
+
+    def resize(self, session_id: str, delta: int):
+        self.store.resize(session_id, delta)
+
+    def stats(self) -> dict:
+        return self.store.stats()
+
+
+class SQLiteSessionBackend(SessionBackend):
+    # Sessions shared between worker processes on one host through a SQLite
+    # database in WAL mode. Each worker keeps decoded sessions in a local
+    # SessionStore and only re-reads the blob when another worker has bumped
+    # the row's version.
+    shared = True
+
+    def __init__(self, path: str, ttl_seconds: float = 1800, max_history: Optional[int] = MAX_HISTORY,
+                 cache: Optional[SessionStore] = None, sweep_interval: float = 60):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_history = max_history
+        self.sweep_interval = sweep_interval
+        self.cache = cache if cache is not None else SessionStore(ttl_seconds=ttl_seconds)
+        self._local = threading.local()
+        self._last_sweep = time.time()
+
+        self.reads = 0
+        self.writes = 0
+
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, version INTEGER NOT NULL, updated_at REAL NOT NULL, data BLOB NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def get(self, session_id: str) -> Optional[dict]:
+        now = time.time()
+        connection = self._connection()
+        self._maybe_sweep(connection, now)
+
+        cached = self.cache.get(session_id)
+        cached_version = cached[0] if cached is not None else 0
+        row = connection.execute(
+            "SELECT version, updated_at, CASE WHEN version != ? THEN data END FROM sessions WHERE id = ?",
+            (cached_version, session_id)
+        ).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            self.cache.delete(session_id)
+            return None
+        if row[2] is None:
+            return cached[1]
+
+        self.reads += 1
+        session = decode_session(row[2], self.max_history)
+        self.cache.put(session_id, (row[0], session))
+        return session
+
+    def put(self, session_id: str, session: dict):
+        row = self._connection().execute(
+            "INSERT INTO sessions (id, version, updated_at, data) VALUES (?, 1, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at, data = excluded.data "
+            "RETURNING version",
+            (session_id, time.time(), encode_session(session))
+        ).fetchone()
+        self.writes += 1
+        self.cache.put(session_id, (row[0], session))
+
+    def delete(self, session_id: str):
+        self._connection().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        self.cache.delete(session_id)
+
+    def sweep(self) -> int:
+        return self._sweep(self._connection(), time.time())
+
+    def stats(self) -> dict:
+        live = self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE updated_at >= ?", (time.time() - self.ttl_seconds,)
+        ).fetchone()[0]
+        return {
+            "live_sessions": live,
+            "cached_sessions": len(self.cache),
+            "reads": self.reads,
+            "writes": self.writes,
+            "evictions": self.cache.evictions,
+            "expirations": self.cache.expirations
+        }
+
+    def _maybe_sweep(self, connection: sqlite3.Connection, now: float):
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(connection, now)
+
+    def _sweep(self, connection: sqlite3.Connection, now: float) -> int:
+        self._last_sweep = now
+        return connection.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl_seconds,)).rowcount
@@ -0,0 +1,45 @@
+import json
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+_WORD = re.compile(r"\S+\s*|\s+")
+
+
+def chunk_text(text: str, size: int = 32) -> List[str]:
+    # Splits on word boundaries so a chunk never ends mid-word; a single word
+    # longer than size becomes its own chunk. Joining the chunks gives back
+    # the original text, whitespace and newlines included.
+    chunks = []
+    current = ""
+    for word in _WORD.findall(text):
+        if current and len(current) + len(word) > size:
+            chunks.append(current)
+            current = ""
+        current += word
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def sse_event(event: str, data) -> bytes:
+    # JSON keeps newlines in the payload from ending the event early.
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def parse_sse(lines: Iterable[str]) -> Iterator[Tuple[str, object]]:
+    event = "message"
+    data = []
+    for line in lines:
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event = "message"
+            data = []
+        elif line.startswith(":"):
+            continue
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+    if data:
+        yield event, json.loads("\n".join(data))
@@ -0,0 +1,111 @@
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+import booking_store
+from booking_store import BookingStoreUnavailable, DurableBookingStore
+from models import Booking, BookingRequest
+from services import EnhancedBookingService
+
+
+def make_booking(index: int) -> Booking:
+    return Booking(
+        id=f"B{index:06d}", restaurant_name="Ocean View", date="tomorrow", time="19:00",
+        party_size=2, status="confirmed", created_at=datetime(2024, 1, 1, 19, 0)
+    )
+
+
+def reopen(path) -> DurableBookingStore:
+    # Reads what a restarted process would recover, then releases the
+    # directory lock.
+    store = DurableBookingStore(str(path))
+    store.close()
+    return store
+
+
+def test_bookings_survive_restart_with_snapshot_and_log(tmp_path):
+    store = DurableBookingStore(str(tmp_path), snapshot_every=5)
+    for index in range(12):
+        store.add(make_booking(index))
+    assert store.snapshots == 2
+    store.close()
+
+    recovered = DurableBookingStore(str(tmp_path), snapshot_every=5)
+    assert len(recovered) == 12
+    assert recovered.get("B000011") == make_booking(11)
+    recovered.close()
+
+
+def test_torn_log_tail_is_discarded(tmp_path):
+    store = DurableBookingStore(str(tmp_path))
+    store.add(make_booking(1))
+    store.close()
+    with open(tmp_path / DurableBookingStore.LOG_NAME, "ab") as log:
+        log.write(b'{"id": "B0000')
+
+    recovered = DurableBookingStore(str(tmp_path))
+    recovered.add(make_booking(2))
+    recovered.close()
+
+    assert sorted(reopen(tmp_path).rows) == ["B000001", "B000002"]
+
+
+def test_concurrent_writes_share_fsyncs(tmp_path):
+    store = DurableBookingStore(str(tmp_path))
+    threads = [
+        threading.Thread(target=lambda start=start: [store.add(make_booking(start + i)) for i in range(20)])
+        for start in range(0, 400, 20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+
+    assert store.commits == 400
+    assert store.fsyncs < store.commits
+
+
+def test_inventory_is_rebuilt_from_recovered_bookings(tmp_path):
+    service = EnhancedBookingService(DurableBookingStore(str(tmp_path)))
+    request = BookingRequest(restaurant_name="Zen Garden", date="today", time="19:00", party_size=25)
+    assert service.create_booking(request)[0]
+    service.bookings.close()
+
+    restarted = EnhancedBookingService(DurableBookingStore(str(tmp_path)))
+    success, message, _ = restarted.create_booking(request)
+    restarted.bookings.close()
+    assert not success
+    assert "5 seats left" in message
+
+
+def test_failed_snapshot_keeps_the_log_and_is_retried(tmp_path, monkeypatch):
+    store = DurableBookingStore(str(tmp_path), snapshot_every=3)
+    real_replace = os.replace
+    failures = [OSError("disk full")]
+
+    def flaky_replace(source, destination):
+        if failures:
+            raise failures.pop()
+        real_replace(source, destination)
+
+    monkeypatch.setattr(booking_store.os, "replace", flaky_replace)
+    for index in range(6):
+        store.add(make_booking(index))
+    store.close()
+    assert (store.snapshot_failures, store.snapshots) == (1, 1)
+
+    assert len(reopen(tmp_path)) == 6
+
+
+def test_closed_store_rejects_writes_and_directories_have_one_writer(tmp_path):
+    store = DurableBookingStore(str(tmp_path))
+    with pytest.raises(BookingStoreUnavailable):
+        DurableBookingStore(str(tmp_path))
+
+    store.close()
+    with pytest.raises(BookingStoreUnavailable):
+        store.add(make_booking(1))
+    DurableBookingStore(str(tmp_path)).close()
@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from columnar import ColumnarRestaurantStore, get_columnar_store
+from data import CATALOG, RESTAURANTS, RestaurantCatalog
+
+
+def test_query_filters_and_sorts_like_python():
+    store = ColumnarRestaurantStore(CATALOG.restaurants)
+
+    top = store.query(sort_by="rating", limit=3)
+    assert top == sorted(CATALOG.restaurants, key=lambda r: -r.rating)[:3]
+
+    cheap = store.query(max_price_tier=1, sort_by="capacity")
+    assert [r.name for r in cheap] == ["Taco Libre", "Spice Garden", "Noodle Express"]
+
+    assert store.query(cuisine="american", min_rating=4.5) == [CATALOG.find_by_name("The Steakhouse")]
+    assert store.query(cuisine="klingon") == []
+
+
+def test_store_is_rebuilt_when_catalog_changes():
+    store = get_columnar_store()
+    extra = RESTAURANTS[0].model_copy(update={"id": 501, "name": "Columnar Test Kitchen", "rating": 5.0})
+
+    record = CATALOG.add(extra)
+    try:
+        rebuilt = get_columnar_store()
+        assert rebuilt is not store
+        assert rebuilt.query(sort_by="rating", limit=1) == [record]
+    finally:
+        CATALOG.remove(extra.name)
+
+
+def test_limit_breaks_ties_like_the_full_order():
+    records = [record for record in CATALOG.restaurants for _ in range(50)]
+    store = ColumnarRestaurantStore(records)
+    for sort_by in ("rating", "price_tier"):
+        for limit in (1, 7, 60, 333):
+            assert store.query(sort_by=sort_by, limit=limit) == store.query(sort_by=sort_by)[:limit]
+            assert store.query(sort_by=sort_by, descending=False, limit=limit) == \
+                store.query(sort_by=sort_by, descending=False)[:limit]
+
+
+def test_search_and_recommendations_filter_on_the_column_store():
+    from data import search_restaurants
+    from recommendations import RecommendationConstraints, RecommendationEngine
+
+    assert search_restaurants(cuisine="american") == CATALOG.search(cuisine="american")
+    assert search_restaurants(location="downtown", price_range="$") == [CATALOG.find_by_name("Taco Libre")]
+
+    catalog = RestaurantCatalog(RESTAURANTS)
+    top = RecommendationEngine(catalog).recommend(RecommendationConstraints(cuisine="american"))
+    assert [r.name for _, r in top] == ["The Steakhouse", "Farm Table"]
+    assert get_columnar_store(catalog).version == catalog.version
@@ -0,0 +1,34 @@
+import pytest
+
+from data import RESTAURANTS, RestaurantCatalog
+
+
+def test_search_intersects_criteria_in_catalog_order():
+    catalog = RestaurantCatalog(list(RESTAURANTS))
+    assert [r.name for r in catalog.search(cuisine="american")] == ["The Steakhouse", "Farm Table"]
+    assert [r.name for r in catalog.search(location="downtown", price_range="$")] == ["Taco Libre"]
+    assert catalog.search(cuisine="Italian", location="Uptown") == []
+    assert catalog.search() == catalog.restaurants
+
+
+def test_add_and_remove_keep_indexes_in_sync():
+    catalog = RestaurantCatalog(list(RESTAURANTS))
+    extra = RESTAURANTS[0].model_copy(update={"id": 99, "name": "Golden Spoon Annex"})
+
+    record = catalog.add(extra)
+    assert record.to_model() == extra
+    assert catalog.find_by_name("golden spoon annex") is record
+    assert catalog.find_in_text("a table at golden spoon annex") == "Golden Spoon Annex"
+    assert record in catalog.search(cuisine="Italian", location="Downtown")
+
+    assert catalog.remove("Golden Spoon Annex") is record
+    assert catalog.find_by_name("Golden Spoon Annex") is None
+    assert catalog.find_in_text("a table at golden spoon annex") is None
+    assert record not in catalog.search(cuisine="Italian")
+
+
+def test_duplicate_ids_are_rejected():
+    catalog = RestaurantCatalog(list(RESTAURANTS))
+    with pytest.raises(ValueError):
+        catalog.add(RESTAURANTS[0])
+    assert len(catalog.restaurants) == len(RESTAURANTS)
@@ -0,0 +1,27 @@
+from datetime import date, datetime
+
+from date_resolver import DateResolver, build_table
+
+
+def test_table_maps_phrases_within_the_horizon():
+    table = build_table(date(2026, 10, 18), horizon_days=90)  # a Sunday
+    assert table["today"] == table["sunday"] == table["this sunday"] == "2026-10-18"
+    assert table["next sunday"] == "2026-10-25"
+    assert table["friday"] == table["next friday"] == "2026-10-23"
+    assert table["in 3 days"] == table["10/21"] == table["october 21st"] == "2026-10-21"
+    assert table["in 2 weeks"] == table["11/01/2026"] == table["1st of nov"] == "2026-11-01"
+    assert table["1/15"] == table["2027-01-15"] == "2027-01-15"
+    assert "1/16" not in table and "10/17" not in table and "2026-10-17" not in table
+
+
+def test_resolver_rebuilds_its_table_at_midnight():
+    now = [datetime(2026, 10, 18, 23, 59).timestamp()]
+    resolver = DateResolver(clock=lambda: now[0])
+    assert resolver.resolve("Tomorrow") == "2026-10-19"
+    assert resolver.resolve("next  Friday") == "2026-10-23"
+    assert resolver.resolve("someday") is None
+
+    now[0] += 120
+    assert resolver.resolve("tomorrow") == "2026-10-20"
+    assert resolver.current_day() == date(2026, 10, 19)
+    assert resolver.rebuilds == 2
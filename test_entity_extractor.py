@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+
+import date_resolver
+from date_resolver import DateResolver
+from entity_extractor import booking_info, extract_spans, modification_info
+
+# Sunday 18 October 2026, noon.
+NOW = datetime(2026, 10, 18, 12).timestamp()
+
+
+@pytest.fixture(autouse=True)
+def fixed_day(monkeypatch):
+    monkeypatch.setattr(date_resolver, "RESOLVER", DateResolver(clock=lambda: NOW))
+
+
+def test_spans_cover_every_entity_in_one_message():
+    spans = extract_spans("Book table for 4 at Ocean View tomorrow 7PM")
+    assert {(span.kind, span.value) for span in spans} == {
+        ("party_size", 4), ("restaurant_name", "Ocean View"), ("date", "2026-10-19"), ("time", "19:00")
+    }
+    assert booking_info(spans) == {"restaurant_name": "Ocean View", "time": "19:00", "party_size": 4, "date": "2026-10-19"}
+
+
+def test_booking_info_ranks_times_party_sizes_and_dates():
+    assert booking_info(extract_spans("Can I get a table for 4 at 8:30 PM?")) == {"time": "20:30", "party_size": 4}
+    assert booking_info(extract_spans("at 19:30 or 7pm")) == {"time": "19:00"}
+    assert booking_info(extract_spans("table for 7pm")) == {"time": "19:00"}
+    assert booking_info(extract_spans("party of 12")) == {"party_size": 12}
+    assert booking_info(extract_spans("table for 25 people")) == {}
+    assert booking_info(extract_spans("tomorrow, or today")) == {"date": "2026-10-18"}
+    assert booking_info(extract_spans("this evening at 25:00 or 13pm")) == {"date": "2026-10-18"}
+    assert booking_info(extract_spans("next friday or in 3 days")) == {"date": "2026-10-23"}
+    assert booking_info(extract_spans("may 4 people come on oct 24th")) == {"party_size": 4, "date": "2026-10-24"}
+    assert booking_info(extract_spans("table for 2 on 10/30 at 8pm")) == {"time": "20:00", "party_size": 2, "date": "2026-10-30"}
+    assert booking_info(extract_spans("on 10/17 or 2027-03-01")) == {}
+
+
+def test_modification_prefers_values_after_the_cue():
+    assert modification_info(extract_spans("Actually, make it 6 people")) == {"party_size": 6}
+    assert modification_info(extract_spans("And change the time to 8PM")) == {"time": "20:00"}
+    assert modification_info(extract_spans("7pm is too late, make it 8:30pm")) == {"time": "20:30"}
+    assert modification_info(extract_spans("make it 50 people")) == {"party_size": 50}
+    assert modification_info(extract_spans("switch to taco libre at 8pm")) == {"restaurant_name": "Taco Libre", "time": "20:00"}
+    assert modification_info(extract_spans("tomorrow is busy, make it saturday")) == {"date": "2026-10-24"}
+
+
+def test_modification_skips_negated_values():
+    assert modification_info(extract_spans("make it 8pm not 7pm")) == {"time": "20:00"}
+    assert modification_info(extract_spans("Actually 6 people, not 4")) == {"party_size": 6}
+    assert modification_info(extract_spans("instead of 7pm, make it 8pm")) == {"time": "20:00"}
+    assert modification_info(extract_spans("make it saturday instead of tomorrow")) == {"date": "2026-10-24"}
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+import pytest
+
+from executor import BoundedExecutor, ExecutorOverloaded, SessionSerializer
+
+
+def test_runs_blocking_calls_off_the_event_loop():
+    executor = BoundedExecutor(max_workers=2, max_queue=0)
+
+    async def main():
+        return await executor.run(threading.current_thread)
+
+    try:
+        assert asyncio.run(main()) is not threading.main_thread()
+    finally:
+        executor.shutdown()
+
+
+def test_rejects_work_beyond_capacity_and_frees_slots_when_done():
+    executor = BoundedExecutor(max_workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(executor.run(gate.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert executor.in_flight == 2
+        assert executor.queued == 1
+
+        with pytest.raises(ExecutorOverloaded):
+            await executor.run(gate.wait)
+        assert executor.rejected == 1
+
+        gate.set()
+        await asyncio.gather(*running)
+        await asyncio.sleep(0)
+        assert executor.in_flight == 0
+        return await executor.run(lambda: "accepted")
+
+    try:
+        assert asyncio.run(main()) == "accepted"
+    finally:
+        executor.shutdown()
+
+
+def test_turns_of_one_session_run_in_order_while_sessions_run_in_parallel():
+    serializer = SessionSerializer()
+    events = []
+
+    def turn(session_id, message, delay):
+        async def run():
+            events.append(("start", session_id, message))
+            await asyncio.sleep(delay)
+            events.append(("end", session_id, message))
+            return message
+        return run
+
+    async def main():
+        return await asyncio.gather(
+            serializer.submit("a", "first", turn("a", "first", 0.02)),
+            serializer.submit("a", "second", turn("a", "second", 0)),
+            serializer.submit("b", "other", turn("b", "other", 0)),
+        )
+
+    assert asyncio.run(main()) == ["first", "second", "other"]
+    assert events.index(("end", "a", "first")) < events.index(("start", "a", "second"))
+    assert events.index(("end", "b", "other")) < events.index(("end", "a", "first"))
+    assert serializer.active_sessions() == 0
+
+
+def test_identical_in_flight_messages_run_once():
+    serializer = SessionSerializer()
+    calls = []
+
+    async def turn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"intent": "book_reservation"}
+
+    async def main():
+        results = await asyncio.gather(*(serializer.submit("a", "book it", turn) for _ in range(3)))
+        again = await serializer.submit("a", "book it", turn)
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert results[0] is results[1] is results[2]
+    assert again == results[0]
+    assert len(calls) == 2
+    assert serializer.coalesced == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_turn():
+    serializer = SessionSerializer()
+    finished = []
+
+    async def turn():
+        await asyncio.sleep(0.01)
+        finished.append(1)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(serializer.submit("a", "hi", turn))
+        second = asyncio.ensure_future(serializer.submit("a", "hi", turn))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+    assert finished == [1]
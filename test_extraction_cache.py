@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import data
+import date_resolver
+from data import add_restaurant, remove_restaurant
+from date_resolver import DateResolver
+from extraction_cache import ExtractionCache, normalize_message
+from models import Restaurant
+from services import AdvancedIntentDetector
+
+
+def test_lru_counts_hits_and_evicts_oldest():
+    cache = ExtractionCache(max_entries=2)
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    assert cache.get("a", lambda: compute(1)) == 1
+    assert cache.get("a", lambda: compute(2)) == 1
+    cache.get("b", lambda: compute(3))
+    cache.get("a", lambda: compute(4))
+    cache.get("c", lambda: compute(5))
+    assert cache.get("b", lambda: compute(6)) == 6
+    assert calls == [1, 3, 5, 6]
+    assert (cache.hits, cache.misses, len(cache)) == (2, 4, 2)
+    assert cache.hit_rate == 2 / 6
+
+
+def test_normalized_messages_share_entries_and_results_are_copies():
+    detector = AdvancedIntentDetector()
+    assert normalize_message("  Table for 4   at 7PM ") == "table for 4 at 7pm"
+    assert normalize_message("Book a\n\n  TABLE  \r\n") == "book a\ntable"
+
+    first = detector.extract_comprehensive_info("Table for 4 at Ocean View tomorrow 7PM")
+    first["party_size"] = 99
+    second = detector.extract_comprehensive_info("table for 4 at  ocean view tomorrow 7pm")
+    tomorrow = (date_resolver.RESOLVER.current_day() + timedelta(days=1)).isoformat()
+    assert second == {"restaurant_name": "Ocean View", "time": "19:00", "party_size": 4, "date": tomorrow}
+    assert detector.cache.hits == 1
+
+
+def test_catalog_changes_invalidate_cached_results():
+    detector = AdvancedIntentDetector()
+    message = "book a table at moonlight diner for 2"
+    assert "restaurant_name" not in detector.extract_comprehensive_info(message)
+
+    add_restaurant(Restaurant(
+        id=9001, name="Moonlight Diner", cuisine="American", location="Downtown", price_range="$",
+        rating=4.0, capacity=20, available_times=["19:00"], features=[]
+    ))
+    try:
+        assert detector.extract_comprehensive_info(message)["restaurant_name"] == "Moonlight Diner"
+        assert detector.cache.invalidations == 1
+    finally:
+        remove_restaurant("Moonlight Diner")
+    assert "restaurant_name" not in detector.extract_comprehensive_info(message)
+    assert data.CATALOG.find_by_name("Moonlight Diner") is None
+
+
+def test_day_change_invalidates_resolved_dates(monkeypatch):
+    now = [1_792_000_000.0]
+    monkeypatch.setattr(date_resolver, "RESOLVER", DateResolver(clock=lambda: now[0]))
+    detector = AdvancedIntentDetector()
+    today = date_resolver.RESOLVER.current_day()
+
+    assert detector.extract_comprehensive_info("tomorrow")["date"] == (today + timedelta(days=1)).isoformat()
+    now[0] += 86_400
+    assert detector.extract_comprehensive_info("tomorrow")["date"] == (today + timedelta(days=2)).isoformat()
+    assert detector.cache.invalidations == 1
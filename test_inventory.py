@@ -0,0 +1,97 @@
+import threading
+
+from data import find_restaurant_by_name
+from inventory import SeatInventory
+from models import BookingRequest
+from services import EnhancedBookingService
+
+
+def test_reserve_decrements_until_slot_is_full():
+    inventory = SeatInventory()
+    restaurant = find_restaurant_by_name("Zen Garden")
+
+    assert inventory.remaining(restaurant, "tomorrow", "19:00") == restaurant.capacity
+    assert inventory.reserve(restaurant, "tomorrow", "19:00", 20)
+    assert not inventory.reserve(restaurant, "tomorrow", "19:00", 11)
+    assert inventory.reserve(restaurant, "tomorrow", "19:00", 10)
+    assert inventory.remaining(restaurant, "tomorrow", "19:00") == 0
+    assert inventory.remaining(restaurant, "tomorrow", "20:00") == restaurant.capacity
+    assert inventory.remaining(restaurant, "today", "19:00") == restaurant.capacity
+
+    inventory.release(restaurant, "tomorrow", "19:00", 4)
+    assert inventory.remaining(restaurant, "tomorrow", "19:00") == 4
+    assert not inventory.reserve(restaurant, "tomorrow", "04:00", 1)
+
+
+def test_concurrent_reservations_never_oversell():
+    inventory = SeatInventory()
+    restaurant = find_restaurant_by_name("Noodle Express")
+    results = []
+
+    def book():
+        results.append(inventory.reserve(restaurant, "today", "18:00", 2))
+
+    threads = [threading.Thread(target=book) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(results) == restaurant.capacity // 2
+    assert inventory.remaining(restaurant, "today", "18:00") == restaurant.capacity % 2
+
+
+def test_booking_service_rejects_oversold_slot():
+    service = EnhancedBookingService()
+    request = BookingRequest(restaurant_name="Zen Garden", date="today", time="19:00", party_size=20)
+
+    assert service.create_booking(request)[0]
+    success, message, booking_id = service.create_booking(request)
+    assert not success and booking_id is None
+    assert "10 seats left" in message
+
+
+def test_modifying_a_booking_moves_its_seats():
+    from services import ContextSwitchChatService
+
+    service = ContextSwitchChatService()
+    booked = service.process_message("Book Zen Garden for 20 people tomorrow at 7pm", "modify")
+    original = booked["data"]["booking_id"]
+    assert service.process_message("Book Zen Garden for 5 people tomorrow at 7pm", "other")["data"]
+
+    full = service.process_message("Actually make it 30 people", "modify")
+    assert full["data"] is None
+    assert full["response"].startswith("Sorry, Zen Garden only has 25 seats left")
+    assert service.booking_service.bookings.get(original).status == "confirmed"
+
+    moved = service.process_message("Actually make it 25 people", "modify")
+    assert moved["data"]["replaced_booking_id"] == original
+    assert service.booking_service.bookings.get(original).status == "modified"
+    restaurant = find_restaurant_by_name("Zen Garden")
+    date = service.booking_service.bookings.get(moved["data"]["booking_id"]).date
+    assert service.booking_service.inventory.remaining(restaurant, date, "19:00") == 0
+
+
+def test_workers_sharing_a_database_never_oversell(tmp_path):
+    from booking_store import SQLiteBookingStore
+    from inventory import SQLiteSeatInventory
+    from session_store import SQLiteSessionBackend
+    from services import ContextSwitchChatService
+
+    path = str(tmp_path / "shared.db")
+    workers = [
+        ContextSwitchChatService(SQLiteSessionBackend(path), SQLiteBookingStore(path), inventory=SQLiteSeatInventory(path))
+        for _ in range(2)
+    ]
+    first = workers[0].process_message("Book Zen Garden for 20 people tomorrow at 7pm", "a")
+    second = workers[1].process_message("Book Zen Garden for 20 people tomorrow at 7pm", "b")
+
+    assert first["data"] and second["data"] is None
+    assert "10 seats left" in second["response"]
+    assert workers[1].booking_service.bookings.get(first["data"]["booking_id"]).party_size == 20
+
+    moved = workers[1].process_message("Actually make it 30 people", "a")
+    assert moved["data"]["replaced_booking_id"] == first["data"]["booking_id"]
+    restaurant = find_restaurant_by_name("Zen Garden")
+    date = workers[0].booking_service.bookings.get(moved["data"]["booking_id"]).date
+    assert workers[0].booking_service.inventory.remaining(restaurant, date, "19:00") == 0
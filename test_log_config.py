@@ -0,0 +1,38 @@
+import io
+import logging
+
+from log_config import configure_logging
+from services import ContextSwitchChatService
+
+
+class Expensive:
+    formatted = 0
+
+    def __str__(self):
+        Expensive.formatted += 1
+        return "expensive"
+
+
+def test_disabled_debug_logging_never_formats_arguments():
+    configure_logging(level="INFO", stream=io.StringIO())
+    logging.getLogger("services.test").debug("value: %s", Expensive())
+    assert Expensive.formatted == 0
+
+
+def test_structured_lines_include_extra_fields():
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", stream=stream)
+    ContextSwitchChatService().process_message("Book a table for 2 at Ocean View", "log-session")
+
+    lines = stream.getvalue().splitlines()
+    assert any("logger=services.ContextSwitchChatService" in line and "session_id=log-session" in line for line in lines)
+    assert all(line.startswith("ts=") for line in lines)
+
+
+def test_async_handler_writes_from_background_thread():
+    stream = io.StringIO()
+    configure_logging(level="INFO", async_handler=True, stream=stream)
+    logging.getLogger("services.test").info("queued %s", "record", extra={"booking_id": "ABC"})
+    configure_logging(level="WARNING", stream=io.StringIO())
+
+    assert 'msg="queued record" booking_id=ABC' in stream.getvalue()
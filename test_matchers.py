@@ -0,0 +1,84 @@
+import re
+import time
+
+import pytest
+
+from matchers import CompiledIntentMatcher, MatchTimeout, RestaurantNameMatcher, split_alternatives, split_wildcards
+from models import BookingRequest, ConversationContext
+from services import AdvancedIntentDetector
+
+
+def test_split_alternatives_ignores_nested_and_class_bars():
+    assert split_alternatives(r"a.*b|c(?:d|e)|[|x]y") == ["a.*b", "c(?:d|e)", "[|x]y"]
+
+
+def test_priority_beats_position():
+    matcher = CompiledIntentMatcher([("first", r"table"), ("second", r"book")], default="none")
+    assert matcher.detect("book a table") == "first"
+    assert matcher.detect("book a seat") == "second"
+    assert matcher.detect("hello") == "none"
+
+
+def test_matches_sequential_search():
+    rules = [
+        ("modify", r"actually|change.*to"),
+        ("book", r"book.*table|table.*for"),
+        ("info", r"^[A-Za-z\s]+$"),
+        ("digits", r"\d"),
+    ]
+    matcher = CompiledIntentMatcher(rules, default="general")
+    messages = [
+        "book a table for 4", "actually make it 6", "tomorrow", "7pm",
+        "table for two, actually", "change the booking to friday", "?!",
+        "book\ntable", "table\nfor 2\nbook a table", "1" * 50 + "x",
+    ]
+    for message in messages:
+        expected = next((label for label, pattern in rules if re.search(pattern, message)), "general")
+        assert matcher.detect(message) == expected
+
+
+def test_wildcards_are_matched_without_backtracking():
+    assert split_wildcards(r"let.*make.*it") == ["let", "make", "it"]
+    matcher = CompiledIntentMatcher([("modify", r"let.*make.*it"), ("party", r"\d+\s*people")], default="none")
+    assert matcher.detect("let us make it 4") == "modify"
+    assert matcher.detect("let " * 2000 + "make " * 2000) == "none"
+    assert matcher.detect("1" * 20000 + " people") == "party"
+
+    with pytest.raises(MatchTimeout):
+        matcher.match("let make", deadline=time.thread_time() - 1)
+    with pytest.raises(ValueError):
+        CompiledIntentMatcher([("bad", r"\d+.*people")], default="none")
+    with pytest.raises(ValueError):
+        CompiledIntentMatcher([("bad", r"(a.*b)")], default="none")
+
+
+def test_detector_reads_a_bounded_head_and_falls_back_when_out_of_time():
+    detector = AdvancedIntentDetector(cache_size=0)
+    padding = "x" * detector.MAX_MESSAGE_CHARS
+    assert detector.extract_comprehensive_info("table for 4 " + padding) == {"party_size": 4}
+    assert detector.extract_comprehensive_info(padding + " table for 4") == {}
+
+    detector.TIME_BUDGET_SECONDS = -1
+    intent = detector.detect_intent_with_context("recommend a place", ConversationContext(), BookingRequest())
+    assert intent == "general_inquiry"
+    assert detector.budget_exhausted == 1
+
+
+def test_name_matcher_prefers_longest_name():
+    matcher = RestaurantNameMatcher(["Zen Garden", "Garden", "The Golden Spoon"])
+    assert matcher.longest_match("a table at zen garden please") == "Zen Garden"
+    assert matcher.longest_match("the garden at 7pm") == "Garden"
+    assert matcher.longest_match("The Golden Spoon") == "The Golden Spoon"
+    assert matcher.longest_match("somewhere else") is None
+
+
+def test_name_matcher_updates_incrementally():
+    matcher = RestaurantNameMatcher(["Ocean View"])
+    assert matcher.longest_match("sea view") is None
+
+    matcher.add("Sea View")
+    assert matcher.longest_match("sea view") == "Sea View"
+
+    matcher.remove("Ocean View")
+    assert matcher.longest_match("ocean view") is None
+    assert matcher.longest_match("sea view") == "Sea View"
@@ -0,0 +1,63 @@
+import pytest
+
+from metrics import ChatMetrics, Registry
+from services import ContextSwitchChatService
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.labels("parse").observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{stage="parse"} 4' in lines
+
+
+def test_gauges_read_their_callback_at_render_time():
+    registry = Registry()
+    sessions = []
+    registry.gauge("live_sessions", "Live sessions.", lambda: len(sessions))
+    sessions.append("a")
+
+    assert registry.render().splitlines() == ["# HELP live_sessions Live sessions.", "# TYPE live_sessions gauge", "live_sessions 1"]
+
+
+def test_callback_counters_export_totals_as_counters():
+    registry = Registry()
+    hits = [3]
+    registry.callback_counter("cache_hits_total", "Cache hits.", lambda: hits[0])
+
+    assert registry.render().splitlines() == ["# HELP cache_hits_total Cache hits.", "# TYPE cache_hits_total counter", "cache_hits_total 3"]
+
+
+def test_chat_turns_record_every_stage_and_intent():
+    registry = Registry()
+    service = ContextSwitchChatService(metrics=ChatMetrics(registry))
+    service.process_message("Book a table for 4 at Ocean View tomorrow 7pm", "metrics")
+    service.process_message("Can you recommend some Italian restaurants?", "metrics")
+    service.process_message("Actually make it 6 people", "metrics")
+
+    rendered = registry.render()
+    for stage in ("session_lookup", "intent_detection", "entity_extraction", "booking_validation",
+                  "response_rendering", "session_save"):
+        assert f'foodiespot_chat_stage_seconds_count{{stage="{stage}"}}' in rendered
+    assert 'foodiespot_chat_requests_total{intent="book_reservation"} 1' in rendered
+    assert 'foodiespot_chat_requests_total{intent="get_recommendations"} 1' in rendered
+    assert 'foodiespot_chat_requests_total{intent="modify_booking"} 1' in rendered
+    assert "foodiespot_chat_request_seconds_count 3" in rendered
+    assert "foodiespot_chat_errors_total 0" in rendered
+
+
+def test_failed_turns_are_counted():
+    registry = Registry()
+    service = ContextSwitchChatService(metrics=ChatMetrics(registry))
+    service.intent_detector = None
+
+    with pytest.raises(AttributeError):
+        service.process_message("Hello", "broken")
+    assert "foodiespot_chat_errors_total 1" in registry.render()
@@ -0,0 +1,42 @@
+from data import CATALOG
+from recommendations import RecommendationConstraints, RecommendationEngine
+
+
+def test_extracts_constraints_from_message():
+    engine = RecommendationEngine()
+    constraints = engine.extract_constraints("Cheap Mexican place in Downtown with live music")
+    assert constraints.cuisine == "mexican"
+    assert constraints.location == "downtown"
+    assert constraints.price_range == "$"
+    assert constraints.features == {"live music"}
+
+
+def test_top_k_matches_full_sort():
+    engine = RecommendationEngine(top_k=4)
+    constraints = RecommendationConstraints(price_range="$$$", features={"sushi bar"})
+    top = engine.recommend(constraints)
+
+    expected = sorted(CATALOG.restaurants, key=lambda r: -engine.score(r, constraints))[:4]
+    assert [r.name for _, r in top] == [r.name for r in expected]
+    assert top[0][1].name == "Zen Garden"
+
+
+def test_weights_are_configurable():
+    rating_only = RecommendationEngine(weights={"rating": 1.0, "price": 0.0, "features": 0.0}, top_k=1)
+    assert rating_only.recommend(RecommendationConstraints(price_range="$"))[0][1].name == "Ocean View"
+
+    price_only = RecommendationEngine(weights={"rating": 0.0, "price": 1.0, "features": 0.0}, top_k=1)
+    assert price_only.recommend(RecommendationConstraints(price_range="$"))[0][1].price_range == "$"
+
+
+def test_relaxed_constraints_are_reported():
+    from services import ContextSwitchChatService
+
+    engine = RecommendationEngine()
+    applied, top = engine.recommend_with_constraints(RecommendationConstraints(cuisine="italian", location="waterfront"))
+    assert (applied.cuisine, applied.location) == ("italian", None)
+    assert {r.cuisine for _, r in top} == {"Italian"}
+
+    result = ContextSwitchChatService().process_message("Recommend Italian food in Waterfront", "relaxed")
+    assert result["response"].startswith("No Italian places in Waterfront; here are Italian picks elsewhere:")
+    assert result["data"]["filters"]["location"] is None
@@ -0,0 +1,72 @@
+import gzip
+import json
+
+import pytest
+
+from data import CATALOG, RESTAURANTS
+from restaurant_listing import InvalidListingQuery, RestaurantListing, etag_matches, get_restaurant_listing
+
+
+def test_full_listing_matches_model_dump():
+    listing = RestaurantListing(CATALOG)
+    body = json.loads(listing.body(listing.query()))
+
+    assert body["restaurants"] == [restaurant.model_dump() for restaurant in sorted(RESTAURANTS, key=lambda r: r.id)]
+    assert body["count"] == body["total"] == len(RESTAURANTS)
+    assert body["next_cursor"] is None
+
+
+def test_cursor_pages_cover_the_catalog_with_projection():
+    listing = RestaurantListing(CATALOG)
+    seen = []
+    cursor = None
+    while True:
+        page = json.loads(listing.body(listing.query("name,cuisine,rating", cursor, 4)))
+        seen.extend(page["restaurants"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [
+        {"name": r.name, "cuisine": r.cuisine, "rating": r.rating} for r in sorted(RESTAURANTS, key=lambda r: r.id)
+    ]
+
+
+def test_invalid_queries_are_rejected():
+    listing = RestaurantListing(CATALOG)
+    with pytest.raises(InvalidListingQuery):
+        listing.query(fields="name,secret")
+    with pytest.raises(InvalidListingQuery):
+        listing.query(cursor="not a cursor!")
+    with pytest.raises(InvalidListingQuery):
+        listing.query(limit=0)
+
+
+def test_etag_depends_on_query_and_catalog_content():
+    listing = get_restaurant_listing()
+    full = listing.etag(listing.query())
+    projected = listing.etag(listing.query("name"))
+    assert full != projected
+    assert etag_matches(f'W/{full}, "other"', full)
+    assert not etag_matches('"other"', full)
+
+    extra = RESTAURANTS[0].model_copy(update={"id": 601, "name": "Listing Test Kitchen"})
+    CATALOG.add(extra)
+    try:
+        rebuilt = get_restaurant_listing()
+        assert rebuilt is not listing
+        assert rebuilt.etag(rebuilt.query()) != full
+        assert json.loads(rebuilt.body(rebuilt.query("name")))["restaurants"][-1] == {"name": "Listing Test Kitchen"}
+    finally:
+        CATALOG.remove("Listing Test Kitchen")
+    assert get_restaurant_listing().etag(get_restaurant_listing().query()) == full
+
+
+def test_compressed_bodies_are_cached_per_encoding():
+    listing = RestaurantListing(CATALOG)
+    query = listing.query()
+
+    compressed = listing.body(query, "gzip")
+    assert gzip.decompress(compressed) == listing.body(query)
+    assert listing.body(query, "gzip") is compressed
+    assert listing.etag(query, "gzip") != listing.etag(query)
@@ -0,0 +1,30 @@
+import pytest
+
+from data import RESTAURANTS
+from restaurant_record import RestaurantRecord, format_minutes, to_minutes
+
+
+def test_record_round_trips_the_model_and_shares_common_values():
+    golden_spoon, other = RESTAURANTS[0], RESTAURANTS[1]
+    record = RestaurantRecord.from_model(golden_spoon)
+    assert record.slots == (720, 780, 840, 1080, 1140, 1200)
+    assert record.available_times == golden_spoon.available_times
+    assert record.to_model() == golden_spoon
+
+    twin = RestaurantRecord.from_model(other.model_copy(update={"available_times": list(reversed(golden_spoon.available_times))}))
+    assert twin.slots is record.slots
+    assert not hasattr(record, "__dict__")
+
+
+def test_slot_lookups_bisect_minutes():
+    record = RestaurantRecord.from_model(RESTAURANTS[0])
+    assert (to_minutes("19:00"), format_minutes(1170)) == (1140, "19:30")
+    assert record.slot_index("19:00") == 4 and record.has_slot("12:00")
+    assert not record.has_slot("19:30") and not record.has_slot("7:00") and not record.has_slot("25:00")
+    assert record.nearest_slot("16:00") == "14:00"
+    assert record.nearest_slot("17:00") == "18:00"
+    assert record.nearest_slot("23:59") == "20:00"
+    assert record.nearest_slot("00:00") == "12:00"
+
+    with pytest.raises(ValueError):
+        RestaurantRecord.from_model(RESTAURANTS[0].model_copy(update={"available_times": ["7pm"]}))
@@ -0,0 +1,65 @@
+import asyncio
+import gzip
+import json
+
+from starlette.responses import JSONResponse, StreamingResponse
+
+from serialization import CompressionMiddleware, FastJSONResponse, brotli, negotiate_encoding
+
+
+def call(app, accept_encoding=None):
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    messages = []
+
+    requests = [{"type": "http.request", "body": b""}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start_headers = {key.decode(): value.decode() for key, value in messages[0]["headers"]}
+    return start_headers, b"".join(message.get("body", b"") for message in messages[1:])
+
+
+def test_negotiation_honours_q_values():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+    assert negotiate_encoding("*") == ("br" if brotli is not None else "gzip")
+
+
+def test_large_json_is_compressed_and_small_json_is_not():
+    payload = {"restaurants": [{"name": f"Restaurant {index}"} for index in range(200)]}
+
+    headers, body = call(CompressionMiddleware(FastJSONResponse(payload), minimum_size=1024), "gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == payload
+
+    headers, body = call(CompressionMiddleware(JSONResponse({"ok": True}), minimum_size=1024), "gzip")
+    assert "content-encoding" not in headers
+    assert json.loads(body) == {"ok": True}
+
+    headers, body = call(CompressionMiddleware(FastJSONResponse(payload), minimum_size=1024))
+    assert "content-encoding" not in headers
+    assert json.loads(body) == payload
+
+
+def test_streaming_responses_pass_through():
+    async def events():
+        yield b"event: delta\ndata: {}\n\n" * 100
+        yield b"event: done\ndata: {}\n\n"
+
+    app = CompressionMiddleware(StreamingResponse(events(), media_type="text/event-stream"), minimum_size=10)
+    headers, body = call(app, "gzip")
+    assert "content-encoding" not in headers
+    assert body.endswith(b"event: done\ndata: {}\n\n")
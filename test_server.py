@@ -0,0 +1,178 @@
+import json
+import threading
+import time
+import uuid
+
+import pytest
+import requests
+import uvicorn
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.client import connect
+
+import server
+from executor import ExecutorOverloaded
+from streaming import parse_sse
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    instance = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=instance.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not instance.started:
+        assert thread.is_alive() and time.monotonic() < deadline
+        time.sleep(0.01)
+    port = instance.servers[0].sockets[0].getsockname()[1]
+    yield f"127.0.0.1:{port}"
+    instance.should_exit = True
+    thread.join(10)
+
+
+def open_ws(base_url: str, session_id: str):
+    websocket = connect(f"ws://{base_url}/ws?session_id={session_id}", open_timeout=5)
+    return websocket, json.loads(websocket.recv(timeout=5))
+
+
+def receive(websocket) -> dict:
+    return json.loads(websocket.recv(timeout=5))
+
+
+def test_ws_handshake_answers_pings_and_rejects_bad_frames(base_url):
+    session_id = str(uuid.uuid4())
+    websocket, hello = open_ws(base_url, session_id)
+    with websocket:
+        assert hello == {"type": "session", "session_id": session_id, "resumed": False, "last_message_id": None}
+
+        websocket.send("{not json")
+        assert receive(websocket) == {"type": "error", "status": 400, "detail": "frame is not valid JSON"}
+        websocket.send(json.dumps({"type": "bogus"}))
+        assert receive(websocket)["status"] == 400
+        websocket.send(json.dumps({"type": "ping"}))
+        assert receive(websocket) == {"type": "pong"}
+
+
+def test_ws_streams_deltas_and_replays_cached_reply_on_resume(base_url):
+    session_id = str(uuid.uuid4())
+    websocket, _ = open_ws(base_url, session_id)
+    with websocket:
+        websocket.send(json.dumps({"type": "message", "id": 1, "message": "Recommend Italian food"}))
+        deltas = []
+        frame = receive(websocket)
+        while frame["type"] == "delta":
+            deltas.append(frame["text"])
+            frame = receive(websocket)
+    assert frame["type"] == "reply" and frame["id"] == 1
+    assert len(deltas) > 1
+    assert "".join(deltas) == frame["response"]
+    history = len(server.chat_service.session_manager.get_session(session_id)["conversation_history"])
+
+    websocket, hello = open_ws(base_url, session_id)
+    with websocket:
+        assert hello["resumed"] and hello["last_message_id"] == 1
+        websocket.send(json.dumps({"type": "message", "id": 1, "message": "Recommend Italian food"}))
+        assert receive(websocket) == frame
+    assert len(server.chat_service.session_manager.get_session(session_id)["conversation_history"]) == history
+
+
+def test_idle_ws_is_closed(base_url, monkeypatch):
+    monkeypatch.setattr(server, "WS_IDLE_TIMEOUT", 0.2)
+    websocket, _ = open_ws(base_url, str(uuid.uuid4()))
+    with websocket:
+        with pytest.raises(ConnectionClosed) as closed:
+            websocket.recv(timeout=5)
+    assert (closed.value.rcvd.code, closed.value.rcvd.reason) == (1000, "idle")
+
+
+def post_batch(base_url: str, messages: list) -> list:
+    response = requests.post(f"http://{base_url}/chat/batch", json={"messages": messages}, timeout=10)
+    assert response.status_code == 200
+    return response.json()["results"]
+
+
+def test_batch_results_follow_input_order_and_session_turn_order(base_url):
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+    messages = [
+        {"session_id": first, "message": "I want to make a reservation"},
+        {"session_id": second, "message": "Recommend Italian food"},
+        {"session_id": first, "message": "The Golden Spoon for 4 people"},
+        {"session_id": second, "message": "hello"},
+        {"session_id": first, "message": "tomorrow at 7pm"},
+    ]
+    results = post_batch(base_url, messages)
+
+    assert [result["session_id"] for result in results] == [item["session_id"] for item in messages]
+    assert results[1]["intent"] == "get_recommendations"
+    assert all(result["error"] is None for result in results)
+    history = server.chat_service.session_manager.get_session(first)["conversation_history"]
+    user_turns = [entry["message"] for entry in history if entry["role"] == "user"]
+    assert user_turns == [item["message"] for item in messages if item["session_id"] == first]
+
+
+def test_batch_isolates_failing_items(base_url, monkeypatch):
+    process_message = server.chat_service.process_message
+
+    def flaky(message, session_id):
+        if message == "boom":
+            raise RuntimeError("boom")
+        return process_message(message, session_id)
+
+    monkeypatch.setattr(server.chat_service, "process_message", flaky)
+    session_id = str(uuid.uuid4())
+    results = post_batch(base_url, [
+        {"session_id": session_id, "message": "boom"},
+        {"session_id": session_id, "message": "Recommend Italian food"},
+        {"session_id": str(uuid.uuid4()), "message": "boom"},
+    ])
+
+    assert [result["error"] for result in results] == [server.BATCH_ERROR, None, server.BATCH_ERROR]
+    assert results[1]["intent"] == "get_recommendations"
+
+
+def test_batch_marks_rejected_sessions_busy(base_url, monkeypatch):
+    async def overloaded(*args):
+        raise ExecutorOverloaded("queue full")
+
+    monkeypatch.setattr(server.chat_executor, "run", overloaded)
+    rejected = server.chat_rejections.labels().value
+    results = post_batch(base_url, [
+        {"session_id": "busy-a", "message": "hello"},
+        {"session_id": "busy-b", "message": "hello"},
+        {"session_id": "busy-a", "message": "hello again"},
+    ])
+
+    assert [result["error"] for result in results] == [server.BATCH_BUSY] * 3
+    assert [result["session_id"] for result in results] == ["busy-a", "busy-b", "busy-a"]
+    assert server.chat_rejections.labels().value == rejected + 3
+
+
+def test_stream_sends_meta_before_the_reply_is_built(base_url, monkeypatch):
+    dispatch = server.chat_service._dispatch
+    building = threading.Event()
+    release = threading.Event()
+
+    def slow_dispatch(*args):
+        building.set()
+        assert release.wait(5)
+        return dispatch(*args)
+
+    monkeypatch.setattr(server.chat_service, "_dispatch", slow_dispatch)
+    with requests.post(f"http://{base_url}/chat/stream", stream=True, timeout=10,
+                       json={"message": "Recommend Italian food", "session_id": str(uuid.uuid4())}) as response:
+        events = parse_sse(response.iter_lines(decode_unicode=True))
+        assert next(events) == ("meta", {"intent": "get_recommendations"})
+        assert building.is_set() and not release.is_set()
+        release.set()
+        rest = list(events)
+
+    assert rest[0] == ("meta", {"intent": "get_recommendations", "data": rest[0][1]["data"]})
+    assert rest[0][1]["data"]["restaurants"]
+    assert {event for event, _ in rest[1:-1]} == {"delta"}
+    assert rest[-1] == ("done", {})
+    assert "Italian" in "".join(data["text"] for _, data in rest[1:-1])
+
+
+def test_metrics_export_cache_totals_as_counters(base_url):
+    lines = requests.get(f"http://{base_url}/metrics", timeout=10).text.splitlines()
+    assert "# TYPE foodiespot_extraction_cache_hits_total counter" in lines
+    assert "# TYPE foodiespot_extraction_cache_misses_total counter" in lines
@@ -0,0 +1,131 @@
+from services import SessionManager
+from session_store import SESSION_BASE_BYTES, InMemorySessionBackend, SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_idle_sessions_expire_lazily_and_on_sweep():
+    clock = FakeClock()
+    store = SessionStore(ttl_seconds=10, sweep_interval=1000, clock=clock)
+    store.put("a", {})
+    store.put("b", {})
+
+    clock.now = 8
+    assert store.get("a") is not None
+
+    clock.now = 15
+    assert store.get("b") is None
+    assert store.sweep() == 0
+    assert len(store) == 1
+
+    clock.now = 30
+    assert store.sweep() == 1
+    assert store.stats()["expirations"] == 2
+    assert store.stats()["live_sessions"] == 0
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStore(max_sessions=2)
+    store.put("a", {})
+    store.put("b", {})
+    store.get("a")
+    store.put("c", {})
+
+    assert "b" not in store
+    assert "a" in store and "c" in store
+    assert store.evictions == 1
+
+
+def test_memory_budget_evicts_oldest_sessions():
+    store = SessionStore(max_bytes=3 * SESSION_BASE_BYTES)
+    for session_id in "abc":
+        store.put(session_id, {})
+
+    store.resize("c", SESSION_BASE_BYTES)
+
+    assert "a" not in store
+    assert store.stats()["estimated_bytes"] <= 3 * SESSION_BASE_BYTES
+
+
+def test_session_history_is_bounded():
+    manager = SessionManager(InMemorySessionBackend(SessionStore()))
+    for index in range(SessionManager.MAX_HISTORY + 10):
+        manager.add_message("s", "user", f"message {index}")
+
+    history = manager.get_session("s")["conversation_history"]
+    assert len(history) == SessionManager.MAX_HISTORY
+    assert history[0]["message"] == "message 10"
+
+
+def test_sqlite_backend_shares_sessions_between_workers(tmp_path):
+    from services import ContextSwitchChatService
+    from session_store import SQLiteSessionBackend
+
+    path = str(tmp_path / "sessions.db")
+    first = ContextSwitchChatService(SQLiteSessionBackend(path))
+    second = ContextSwitchChatService(SQLiteSessionBackend(path))
+
+    first.process_message("I want to make a reservation", "shared")
+    second.process_message("The Golden Spoon for 4 people", "shared")
+    booking = first.session_manager.get_session("shared")["current_booking"]
+
+    assert booking.restaurant_name == "The Golden Spoon"
+    assert booking.party_size == 4
+    assert len(first.session_manager.get_session("shared")["conversation_history"]) == 2
+
+
+def test_session_codec_round_trip():
+    from models import BookingRequest, BookingState
+    from session_store import decode_session, encode_session
+
+    manager = SessionManager()
+    session = manager.get_session("s")
+    manager.add_message("s", "user", "Book Ocean View ☀")
+    session["current_booking"] = BookingRequest(restaurant_name="Ocean View", party_size=2)
+    session["context"].booking_state = BookingState.GATHERING_INFO
+
+    decoded = decode_session(encode_session(session), SessionManager.MAX_HISTORY)
+    assert decoded["current_booking"] == session["current_booking"]
+    assert decoded["context"].booking_state is BookingState.GATHERING_INFO
+    assert list(decoded["conversation_history"]) == [
+        {**entry, "timestamp": round(entry["timestamp"], 3)} for entry in session["conversation_history"]
+    ]
+
+
+def test_slow_backend_io_does_not_block_other_sessions():
+    import threading
+
+    class SlowBackend(InMemorySessionBackend):
+        def __init__(self):
+            super().__init__()
+            self.entered = threading.Event()
+            self.unblock = threading.Event()
+
+        def get(self, session_id):
+            if session_id == "slow":
+                self.entered.set()
+                self.unblock.wait(5)
+            return super().get(session_id)
+
+    backend = SlowBackend()
+    manager = SessionManager(backend)
+    slow = threading.Thread(target=manager.pin, args=("slow",))
+    slow.start()
+    assert backend.entered.wait(5)
+
+    manager.pin("fast")
+    manager.add_message("fast", "user", "hello")
+    manager.release("fast")
+    assert slow.is_alive()
+    assert len(backend.get("fast")["conversation_history"]) == 1
+
+    backend.unblock.set()
+    slow.join()
+    manager.release("slow")
+    assert "slow" not in manager._pinned
@@ -0,0 +1,25 @@
+from streaming import chunk_text, parse_sse, sse_event
+
+
+def test_chunks_rejoin_to_the_original_text_on_word_boundaries():
+    text = "🎉 Booking Confirmed! 🎉\n\nRestaurant: Ocean View\nDate: tomorrow\nBooking ID: DA6C9E44 " + "x" * 50
+    chunks = chunk_text(text, size=16)
+
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 16 or " " not in chunk.strip() for chunk in chunks)
+    assert chunks[-1] == "x" * 50
+
+
+def test_events_round_trip_through_the_parser():
+    body = b"".join([
+        sse_event("meta", {"intent": "book_reservation", "data": {"booking_id": "AB12"}}),
+        sse_event("delta", {"text": "line one\nline two"}),
+        b": keep-alive\n\n",
+        sse_event("done", {}),
+    ]).decode("utf-8")
+
+    assert list(parse_sse(body.split("\n"))) == [
+        ("meta", {"intent": "book_reservation", "data": {"booking_id": "AB12"}}),
+        ("delta", {"text": "line one\nline two"}),
+        ("done", {}),
+    ]